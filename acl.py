@@ -0,0 +1,248 @@
+# acl.py
+#
+# ACL 최적화 pass (semantic model → 백엔드 사이)
+#
+#   1) 중복 제거      : 앞에 똑같은 규칙이 있으면 버린다
+#   2) shadow 제거    : 앞의 더 넓은 규칙 (예: deny icmp any any) 에 완전히
+#                       덮이는 규칙은 절대 매치되지 않으므로 버린다
+#   3) 묶기           : action/protocol 이 같고 출발지 (또는 목적지) 가 같은
+#                       규칙들을 주소 집합 하나로 묶는다
+#                       (Linux ipset, Cisco object-group, P4 ternary)
+#
+# 규칙은 위에서부터 처음 매치되는 것이 적용된다 (iptables -A, ACE 순서).
+# 묶으면 뒤의 규칙이 그룹의 첫 규칙 위치로 올라가므로, 그 사이에 겹치는
+# 반대 action 규칙이 있으면 묶지 않는다 (결과가 달라지지 않게).
+#
+# "allow tcp from @web to ..." 는 펼치지 않고 ir.GroupRef 를 주소 자리에
+# 그대로 둔다 (백엔드가 ipset / object-group 하나로 낸다). 그룹 자리는 겹침
+# 판단에서 any 로 본다.
+
+import ir
+
+ALLOW = "allow"
+DENY = "deny"
+
+_ANY = object()  # 색인 키에서 "아무 값" 자리
+
+
+class Rule:
+    """ACL 문장 하나. src/dst 가 None 이면 any, ir.GroupRef 이면 그룹."""
+
+    __slots__ = ("index", "action", "protocol", "src", "dst")
+
+    def __init__(self, index, action, protocol, src=None, dst=None):
+        self.index = index
+        self.action = action
+        self.protocol = protocol
+        self.src = src
+        self.dst = dst
+
+    def key(self):
+        return (self.action, self.protocol, self.src, self.dst)
+
+    def __repr__(self):
+        return f"Rule({self.index}, {self.action} {self.protocol} {self.src} -> {self.dst})"
+
+
+class AclGroup:
+    """srcs × dsts 에 대한 규칙 하나 (한쪽은 항상 원소 하나). None = any"""
+
+    __slots__ = ("index", "action", "protocol", "srcs", "dsts")
+
+    def __init__(self, index, action, protocol, srcs, dsts):
+        self.index = index
+        self.action = action
+        self.protocol = protocol
+        self.srcs = srcs
+        self.dsts = dsts
+
+    def __len__(self):
+        return len(self.srcs) * len(self.dsts)
+
+    def __repr__(self):
+        return f"AclGroup({self.index}, {self.action} {self.protocol} {self.srcs} -> {self.dsts})"
+
+
+class AclPlan:
+    """
+    groups    : 최적화된 규칙 (원래 순서대로)
+    duplicates: 앞에 같은 규칙이 있어서 버린 규칙
+    shadowed  : (버린 규칙, 그것을 덮는 앞 규칙)
+    """
+
+    def __init__(self, before, groups, duplicates, shadowed):
+        self.before = before
+        self.groups = groups
+        self.duplicates = duplicates
+        self.shadowed = shadowed
+
+    def stats(self) -> dict:
+        return {
+            "acl_rules": self.before,
+            "duplicates": len(self.duplicates),
+            "shadowed": len(self.shadowed),
+            "acl_groups": len(self.groups),
+            "grouped": sum(1 for g in self.groups if len(g) > 1),
+        }
+
+
+def rules_from(models) -> list:
+    """model 목록에서 ACL 문장만 Rule 로 (index 는 model 목록 안의 위치)"""
+    rules = []
+    for i, model in enumerate(models):
+        if type(model) in (ir.Allow, ir.GroupAllow):
+            rules.append(Rule(i, ALLOW, str(model.protocol), model.src, model.dst))
+        elif type(model) is ir.Block:
+            rules.append(Rule(i, DENY, str(model.protocol)))
+    return rules
+
+
+def is_acl(model) -> bool:
+    return type(model) in (ir.Allow, ir.Block, ir.GroupAllow)
+
+
+# -----------------------------
+# 1) 2) 중복 / shadow
+# -----------------------------
+def _covering_keys(rule):
+    # rule 을 완전히 덮는 규칙의 (protocol, src, dst): 각 자리는 같은 값 또는 any
+    srcs = (rule.src, None) if rule.src is not None else (None,)
+    dsts = (rule.dst, None) if rule.dst is not None else (None,)
+    return [(rule.protocol, s, d) for s in srcs for d in dsts]
+
+
+def remove_redundant(rules):
+    """(남은 규칙, 중복, [(shadow 된 규칙, 덮는 규칙)]) — 규칙 수에 선형"""
+    seen = {}  # (protocol, src, dst) -> 처음 나온 규칙
+    kept, duplicates, shadowed = [], [], []
+    for rule in rules:
+        cover = None
+        for key in _covering_keys(rule):
+            cover = seen.get(key)
+            if cover is not None:
+                break
+        if cover is None:
+            seen[(rule.protocol, rule.src, rule.dst)] = rule
+            kept.append(rule)
+        elif cover.key() == rule.key():
+            duplicates.append(rule)
+        else:
+            shadowed.append((rule, cover))
+    return kept, duplicates, shadowed
+
+
+# -----------------------------
+# 3) 묶기
+# -----------------------------
+class _Barriers:
+    """action 별로, 어떤 규칙과 겹치는 가장 늦은 규칙 위치를 찾는 색인"""
+
+    def __init__(self, rules):
+        self._last = {ALLOW: {}, DENY: {}}
+        for rule in rules:
+            last = self._last[rule.action]
+            p, s, d = rule.protocol, _indexed(rule.src), _indexed(rule.dst)
+            for key in ((p, s, d), (p, s, _ANY), (p, _ANY, d), (p, _ANY, _ANY)):
+                last[key] = rule.index  # 규칙은 index 순서
+
+    def latest_overlap(self, rule, action):
+        """rule 과 겹치는 action 규칙 중 가장 늦은 위치 (없으면 -1)"""
+        # 색인은 전체 규칙 기준이라 rule 뒤의 규칙도 보인다. 그런 경우도 막으므로
+        # 필요보다 덜 묶을 수는 있어도 결과가 달라지지는 않는다.
+        last = self._last[action]
+        p = rule.protocol
+        src, dst = _indexed(rule.src), _indexed(rule.dst)
+        srcs = (src, None) if src is not None else (_ANY,)
+        dsts = (dst, None) if dst is not None else (_ANY,)
+        found = -1
+        for s in srcs:
+            for d in dsts:
+                found = max(found, last.get((p, s, d), -1))
+        return found
+
+
+def _indexed(addr):
+    # 그룹은 어느 주소와도 겹칠 수 있으므로 any 로 본다
+    return None if type(addr) is ir.GroupRef else addr
+
+
+def _opposite(action):
+    return DENY if action == ALLOW else ALLOW
+
+
+def group_rules(rules) -> list:
+    """
+    같은 (action, protocol, src) 끼리 dst 를 모으고, 혼자 남은 규칙은
+    (action, protocol, dst) 끼리 src 를 모은다. any 와 그룹은 묶지 않는다.
+    """
+    barriers = _Barriers(rules)
+
+    def groupable(addr):
+        return addr is not None and type(addr) is not ir.GroupRef
+
+    def collect(rules, side):
+        groups = {}  # (action, protocol, 고정 쪽 주소) -> [첫 규칙, 모은 주소들]
+        out = []  # [첫 규칙, 모은 주소들] 순서대로
+        for rule in rules:
+            fixed = rule.src if side == "dst" else rule.dst
+            moving = rule.dst if side == "dst" else rule.src
+            key = (rule.action, rule.protocol, fixed)
+            entry = groups.get(key) if groupable(moving) else None
+            if entry is not None:
+                barrier = barriers.latest_overlap(rule, _opposite(rule.action))
+                if barrier < entry[0].index:
+                    entry[1].append(moving)
+                    continue
+            entry = [rule, [moving]]
+            out.append(entry)
+            if groupable(moving):
+                groups[key] = entry
+        return out
+
+    by_src = collect(rules, "dst")
+    singles = [entry[0] for entry in by_src if len(entry[1]) == 1]
+    by_dst = collect(singles, "src")
+
+    groups = []
+    for first, dsts in by_src:
+        if len(dsts) > 1:
+            groups.append(AclGroup(first.index, first.action, first.protocol, (first.src,), tuple(dsts)))
+    for first, srcs in by_dst:
+        groups.append(AclGroup(first.index, first.action, first.protocol, tuple(srcs), (first.dst,)))
+    groups.sort(key=lambda g: g.index)
+    return groups
+
+
+def optimize_acl(models) -> AclPlan:
+    rules = rules_from(models)
+    kept, duplicates, shadowed = remove_redundant(rules)
+    return AclPlan(len(rules), group_rules(kept), duplicates, shadowed)
+
+
+def passthrough_acl(models) -> AclPlan:
+    """최적화 없이 규칙 하나당 그룹 하나 (--no-optimize)"""
+    rules = rules_from(models)
+    groups = [AclGroup(r.index, r.action, r.protocol, (r.src,), (r.dst,)) for r in rules]
+    return AclPlan(len(rules), groups, [], [])
+
+
+# -----------------------------
+# 백엔드에서 쓰는 도우미
+# -----------------------------
+def ternary(addrs):
+    """
+    주소 목록 → P4 ternary (value, mask) 목록.
+    int 주소는 정확히 덮는 prefix 로 합치고, any 는 (0, 0), 이름은 그대로.
+    그룹 원소의 (net, plen) 은 그 prefix 하나로.
+    """
+    ints = [a for a in addrs if isinstance(a, int)]
+    out = [(net, ir.netmask(plen)) for net, plen in ir.covering_prefixes(ints)]
+    for a in addrs:
+        if a is None:
+            out.append((0, 0))
+        elif isinstance(a, tuple):
+            mask = ir.netmask(a[1])
+            out.append((a[0] & mask, mask))
+        elif not isinstance(a, int):
+            out.append((a, 0xFFFFFFFF))
+    return out
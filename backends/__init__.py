@@ -0,0 +1,197 @@
+# backends/__init__.py
+#
+# 백엔드 레지스트리
+#
+# 타깃(p4, cisco, linux, ...)마다 Backend 하나를 등록하고, 그 안에
+# ir 문장 클래스 -> 생성 함수 를 등록한다. dispatch 는 type(model) 로
+# dict 한 번 찾는 것이 전부다.
+#
+# 새 타깃은 이 파일을 건드리지 않고 모듈 안에서
+#
+#     BACKEND = register_backend(Backend("mytarget", "My Config", "# unsupported"))
+#
+#     @BACKEND.emitter(ir.Allow)
+#     def allow(model): ...
+#
+# 처럼 등록한 뒤 load_plugin("모듈 이름") (CLI 에서는 --plugin) 으로 불러온다.
+#
+# 표 대신 타깃별 설정 파일 하나 (--config-dir) 를 만들 때는 문장 전체를 한 번에
+# 보는 생성 함수를 @BACKEND.program 으로 등록할 수 있다 (ACL 묶기 등).
+# 등록하지 않은 타깃은 문장별 출력을 순서대로 이어 붙인다. 도구별 파일 여러 개로
+# 나눠 쓰는 batch 출력 (--batch) 은 @BACKEND.batch 로 등록한다.
+# 지난 배포와의 차이만 쓰는 delta 출력 (--state) 은 @BACKEND.delta 로 등록한다.
+
+import importlib
+import sys
+
+import delta
+
+# 기본 타깃 (컬럼 순서). 모듈 이름은 backends/<이름>.py
+BUILTIN = ["json", "p4", "cisco", "linux"]
+_MODULES = {"json": "json_model"}
+
+_registry = {}
+
+
+class Backend:
+    def __init__(self, name: str, column: str, unsupported: str, filename: str = None):
+        self.name = name
+        self.column = column  # 표 헤더
+        self.unsupported = unsupported  # 등록 안 된 문장에 대한 출력
+        self.filename = filename or f"{name}.txt"  # --config-dir 안의 파일 이름
+        self.module = None
+        self.emitters = {}
+        self.fallback = None
+        self.program_fn = None
+        self.batch_fn = None
+        self.delta_fn = None
+
+    def emitter(self, *stmt_types):
+        """@backend.emitter(ir.Allow, ...) — 문장 클래스별 생성 함수 등록"""
+
+        def register(fn):
+            for cls in stmt_types:
+                self.emitters[cls] = fn
+            return fn
+
+        return register
+
+    def default(self, fn):
+        """@backend.default — 등록 안 된 문장 클래스 전부에 쓰는 생성 함수"""
+        self.fallback = fn
+        return fn
+
+    def lookup(self, cls):
+        fn = self.emitters.get(cls) or self.fallback
+        if fn is None:
+            text = self.unsupported
+            return lambda model: text
+        return fn
+
+    def emit(self, model) -> str:
+        return self.lookup(type(model))(model)
+
+    def program(self, fn):
+        """@backend.program — fn(models, out, passes) -> 통계 dict (passes: passes.Passes)"""
+        self.program_fn = fn
+        return fn
+
+    def emit_program(self, models, out, passes) -> dict:
+        """models 전체를 설정 파일 하나로 out 에 쓴다. 통계 dict 를 돌려준다."""
+        if self.program_fn is not None:
+            return self.program_fn(models, out, passes)
+        for model in models:
+            out.write(self.emit(model) + "\n")
+        return {"statements": len(models)}
+
+    def batch(self, fn):
+        """@backend.batch — fn(models, out_dir, passes) -> 통계 dict (파일 여러 개)"""
+        self.batch_fn = fn
+        return fn
+
+    def delta(self, fn):
+        """@backend.delta — fn(old, new, out) -> 통계 dict (old/new: passes.Passes)"""
+        self.delta_fn = fn
+        return fn
+
+    def emit_delta(self, old, new, out) -> dict:
+        """지난 스냅샷 (old) 과 이번 model (new) 의 차이를 out 에 쓴다 (--state)"""
+        if self.delta_fn is not None:
+            return self.delta_fn(old, new, out)
+        # 지우는 방법을 모르는 타깃: 추가된 문장만 문장별 출력으로
+        skipped = 0
+        for op, model in delta.ordered_ops(old.models, new.models):
+            if op == delta.ADD:
+                out.write(self.emit(model) + "\n")
+            else:
+                skipped += 1
+        return {"not_removed": skipped}
+
+
+def register_backend(backend: Backend) -> Backend:
+    # 호출한 모듈 이름을 기록해 둔다 (캐시 fingerprint 용)
+    backend.module = sys._getframe(1).f_globals.get("__name__")
+    _registry[backend.name] = backend
+    return backend
+
+
+def _import_builtin(name):
+    importlib.import_module(f"backends.{_MODULES.get(name, name)}")
+
+
+def load_builtin():
+    for name in BUILTIN:
+        if name not in _registry:
+            _import_builtin(name)
+
+
+def load_plugin(module_name: str):
+    """외부 백엔드 모듈 import (모듈이 import 될 때 스스로 등록한다)"""
+    importlib.import_module(module_name)
+
+
+def get_backend(name: str) -> Backend:
+    # 기본 타깃은 처음 요청될 때만 import 한다
+    if name not in _registry and name in BUILTIN:
+        _import_builtin(name)
+    try:
+        return _registry[name]
+    except KeyError:
+        raise KeyError(f"unknown backend: {name!r}") from None
+
+
+def registered():
+    """등록된 백엔드 (기본 타깃 먼저, 플러그인은 등록 순서)"""
+    load_builtin()
+    builtin = [_registry[name] for name in BUILTIN]
+    return builtin + [b for b in _registry.values() if b.name not in BUILTIN]
+
+
+def source_files(selected=None):
+    """백엔드 모듈 파일들 (바뀌면 증분 캐시를 무효화해야 함)"""
+    files = [__file__]
+    for backend in selected if selected is not None else _registry.values():
+        mod = sys.modules.get(backend.module)
+        if mod is not None and getattr(mod, "__file__", None):
+            files.append(mod.__file__)
+    return files
+
+
+class Emitter:
+    """
+    여러 타깃을 한 번에 생성.
+    문장 클래스마다 (타깃별 생성 함수) 튜플을 한 번만 만들어 두고,
+    model 하나당 dict 조회 한 번으로 모든 타깃 출력을 만든다.
+    """
+
+    def __init__(self, backends=None, metrics=None):
+        self.backends = list(backends) if backends is not None else registered()
+        self.metrics = metrics
+        self._dispatch = {}
+
+    @property
+    def columns(self):
+        return [b.column for b in self.backends]
+
+    def _functions(self, cls):
+        fns = tuple(b.lookup(cls) for b in self.backends)
+        if self.metrics is not None:
+            # --profile: 타깃별 / 문장 종류별 시간
+            fns = tuple(
+                self.metrics.wrap(f"emit:{b.name}", fn, stmt_type=cls.__name__)
+                for b, fn in zip(self.backends, fns)
+            )
+        self._dispatch[cls] = fns
+        return fns
+
+    def __call__(self, model) -> list:
+        fns = self._dispatch.get(type(model)) or self._functions(type(model))
+        return [fn(model) for fn in fns]
+
+    def emit_all(self, models):
+        """models 를 한 번만 훑으면서 model 마다 모든 타깃 출력 리스트를 낸다"""
+        dispatch = self._dispatch
+        for model in models:
+            cls = type(model)
+            fns = dispatch.get(cls) or self._functions(cls)
+            yield [fn(model) for fn in fns]
@@ -0,0 +1,420 @@
+# cisco.py
+#
+# ir 문장 -> Cisco IOS 스타일 설정 문자열
+
+import acl
+import delta
+import ir
+from ir import ip_str
+
+from backends import Backend, register_backend
+
+BACKEND = register_backend(
+    Backend("cisco", "Cisco Config", "! unsupported for cisco", "cisco.cfg")
+)
+
+
+@BACKEND.emitter(ir.Allow)
+def allow(model):
+    return (
+        "ip access-list extended ALLOW_TRAFFIC\n"
+        f" permit {model.protocol} host {ip_str(model.src)} host {ip_str(model.dst)}"
+    )
+
+
+@BACKEND.emitter(ir.GroupAllow)
+def group_allow(model):
+    return (
+        "ip access-list extended ALLOW_TRAFFIC\n"
+        f" permit {model.protocol} {_ace_addr((model.src,), None)} {_ace_addr((model.dst,), None)}"
+    )
+
+
+@BACKEND.emitter(ir.Block)
+def block(model):
+    return (
+        "ip access-list extended BLOCK_TRAFFIC\n"
+        f" deny {model.protocol} any any"
+    )
+
+
+@BACKEND.emitter(ir.Meter)
+def meter(model):
+    # 호스트마다 METER_<host> / LIMIT_<host> (설정 파일과 같은 이름)
+    return _meter_lines(model.host, model.rate_mbps).rstrip("\n")
+
+
+@BACKEND.emitter(ir.MeterEach)
+def meter_each(model):
+    name = group_name(model.group.name)
+    return (
+        f"class-map match-any {name}\n"
+        f" match access-group name {name}_ACL\n"
+        f"policy-map LIMIT_{name}\n"
+        f" class {name} police {model.rate} conform-action transmit"
+    )
+
+
+@BACKEND.emitter(ir.Qos)
+def qos(model):
+    return (
+        f"interface vlan{model.vlan}\n"
+        " priority-queue out\n"
+        " mls qos trust cos"
+    )
+
+
+@BACKEND.emitter(ir.Connectivity)
+def connectivity(model):
+    return "Controller installs static routes or ACLs"
+
+
+@BACKEND.emitter(ir.VlanCreate)
+def vlan_create(model):
+    return f"vlan {model.id} name {model.name}"
+
+
+@BACKEND.emitter(ir.VlanDelete)
+def vlan_delete(model):
+    return f"no vlan {model.id}"
+
+
+@BACKEND.emitter(ir.VlanRangeCreate)
+def vlan_range_create(model):
+    # IOS 의 VLAN 범위는 이름을 하나만 줄 수 없으므로 이름이 있으면 VLAN 마다
+    if model.name is None:
+        return f"vlan {model.first}-{model.last}"
+    return "\n".join(vlan_create(m) for m in model.expand())
+
+
+@BACKEND.emitter(ir.VlanRangeDelete)
+def vlan_range_delete(model):
+    return f"no vlan {model.first}-{model.last}"
+
+
+@BACKEND.emitter(ir.HostGroup)
+def host_group(model):
+    name = group_name(model.name)
+    return f"object-group network {name}\n" + "\n".join(_group_lines(model))
+
+
+@BACKEND.emitter(ir.Route)
+def route(model):
+    if isinstance(model.net, str):
+        # prefix 를 해석할 수 없는 주소 (앞자리 0 등): 원문 그대로, /24 외에는 host route
+        network, _, prefix = model.net.partition("/")
+        mask = "255.255.255.0" if prefix == "24" else "255.255.255.255"
+    else:
+        # IOS 는 host 비트가 남은 주소를 받지 않으므로 network 주소로
+        bits = ir.netmask(32 if model.plen is None else model.plen)
+        network, mask = ip_str(model.net & bits), ip_str(bits)
+    return f"ip route {network} {mask} {ip_str(model.next_hop)}"
+
+
+@BACKEND.emitter(ir.Monitor)
+def monitor(model):
+    return "Use IP SLA or controller probe"
+
+
+@BACKEND.emitter(ir.Backup)
+def backup(model):
+    return "copy running-config startup-config"
+
+
+# -----------------------------
+# 설정 파일 (--config-dir): config session 하나로 한 번에 commit
+#
+#   configure session intentlang
+#     object-group → 이름 붙은 ACL (한 번씩, ACE 에 sequence 번호)
+#     meter 호스트마다 ACL + class-map + policy-map, 부모 policy-map INTENT_METERS
+#     QoS 인터페이스 (VLAN 마다 한 번), VLAN, route (합친 것)
+#   verify / commit / end
+#   이후 exec 명령 (copy running-config ...)
+# ACL 은 같은 session 안에서 지우고 다시 만들어서 다시 적용해도 sequence 가 겹치지 않는다.
+# -----------------------------
+SESSION = "intentlang"
+SEQ_STEP = 10
+METER_POLICY = "INTENT_METERS"
+ACL_LISTS = ((acl.ALLOW, "ALLOW_TRAFFIC"), (acl.DENY, "BLOCK_TRAFFIC"))
+
+# 설정이 아닌 설명 문장은 주석으로
+_NOTES = (ir.Connectivity, ir.Monitor)
+# config 모드 밖에서 실행하는 명령
+_EXEC = (ir.Backup,)
+
+
+GROUP_PREFIX = "GRP_"
+
+
+def group_name(name) -> str:
+    return GROUP_PREFIX + name
+
+
+def _group_lines(group):
+    for member in group.members:
+        if isinstance(member, tuple):
+            net, plen = member
+            bits = ir.netmask(plen)
+            yield f" {ip_str(net & bits)} {ip_str(bits)}"
+        else:
+            yield f" host {ip_str(member)}"
+
+
+def _ace_addr(addrs, group_name):
+    if len(addrs) > 1:
+        return f"object-group {group_name}"
+    if addrs[0] is None:
+        return "any"
+    if type(addrs[0]) is ir.GroupRef:
+        return f"object-group {GROUP_PREFIX}{addrs[0].name}"
+    return f"host {ip_str(addrs[0])}"
+
+
+def _meter_name(host) -> str:
+    # 10.0.0.1 -> 10_0_0_1, 이름은 그대로 (IOS 이름에 쓸 수 없는 문자는 _)
+    return "".join(c if c.isalnum() or c in "_-" else "_" for c in ip_str(host))
+
+
+def _acl_layout(plan):
+    """AclPlan → (object-group 목록 [(이름, 주소들)], {action: [ACE 문자열]})"""
+    aces = {action: [] for action, _ in ACL_LISTS}
+    groups = []
+    for group in plan.groups:
+        name = f"ACL_{group.index}"
+        members = group.dsts if len(group.dsts) > 1 else group.srcs
+        if len(members) > 1:
+            groups.append((name, members))
+        verb = "permit" if group.action == acl.ALLOW else "deny"
+        src, dst = _ace_addr(group.srcs, name), _ace_addr(group.dsts, name)
+        aces[group.action].append(f"{verb} {group.protocol} {src} {dst}")
+    return groups, aces
+
+
+def _host_groups(passes) -> dict:
+    """define group → {object-group 이름: 줄 목록}"""
+    return {
+        group_name(name): list(_group_lines(group)) for name, group in passes.groups.items()
+    }
+
+
+def _write_host_groups(write, groups):
+    for name, lines in groups.items():
+        write(f"no object-group network {name}\nobject-group network {name}\n")
+        for line in lines:
+            write(line + "\n")
+
+
+def _write_acls(write, plan, host_groups=None):
+    """host_groups 는 ACL 을 지운 뒤 (쓰는 중인 object-group 은 지울 수 없다) 다시 만든다"""
+    groups, aces = _acl_layout(plan)
+    # 비어 있게 된 목록도 지워야 옛 ACE 가 남지 않는다 (없는 목록의 no 는 무시된다)
+    for action, list_name in ACL_LISTS:
+        write(f"no ip access-list extended {list_name}\n")
+    if host_groups:
+        _write_host_groups(write, host_groups)
+    for name, members in groups:
+        write(f"no object-group network {name}\nobject-group network {name}\n")
+        for addr in members:
+            write(f" host {ip_str(addr)}\n")
+    for action, list_name in ACL_LISTS:
+        if aces[action]:
+            write(f"ip access-list extended {list_name}\n")
+            for seq, ace in enumerate(aces[action], start=1):
+                write(f" {seq * SEQ_STEP} {ace}\n")
+    return len(groups), sum(len(a) for a in aces.values())
+
+
+def _skip(model):
+    # 설정 파일에서 따로 쓰는 문장 (meter, 그룹)
+    return type(model) in (ir.Meter, ir.MeterEach, ir.HostGroup)
+
+
+def _meter_hosts(models) -> dict:
+    """호스트 -> 제한 (Mbps). 같은 호스트는 처음 것만"""
+    hosts = {}
+    for model in models:
+        if type(model) is ir.Meter:
+            hosts.setdefault(model.host, model.rate_mbps)
+    return hosts
+
+
+def _meter_lines(host, rate) -> str:
+    name = _meter_name(host)
+    return (
+        f"ip access-list extended METER_{name}\n"
+        f" {SEQ_STEP} permit ip any host {ip_str(host)}\n"
+        f"class-map match-any METER_{name}\n"
+        f" match access-group name METER_{name}\n"
+        f"policy-map LIMIT_{name}\n"
+        " class class-default\n"
+        f"  police cir {rate * 1_000_000} conform-action transmit exceed-action drop\n"
+    )
+
+
+def _write_meters(write, hosts):
+    """호스트마다 ACL/class-map/policy-map 하나"""
+    for host, rate in hosts.items():
+        write(_meter_lines(host, rate))
+    if hosts:
+        # 인터페이스에는 이것 하나만 붙인다 (호스트별 policy 는 자식)
+        write(f"policy-map {METER_POLICY}\n")
+        for host in hosts:
+            name = _meter_name(host)
+            write(f" class METER_{name}\n  service-policy LIMIT_{name}\n")
+    return len(hosts)
+
+
+@BACKEND.program
+def program(models, out, passes):
+    plan = passes.acl
+    write = out.write
+    write(f"! generated by IntentLang\nconfigure session {SESSION}\n")
+    host_groups = _host_groups(passes)
+    groups, aces = _write_acls(write, plan, host_groups)
+    meters = _write_meters(write, _meter_hosts(passes.expanded()))
+    qos_seen = set()
+    notes, exec_lines = [], []
+    for model in passes.rest(_skip):
+        cls = type(model)
+        if cls in _NOTES:
+            notes.append(f"! {BACKEND.emit(model)}")
+        elif cls in _EXEC:
+            exec_lines.append(BACKEND.emit(model))
+        elif cls is ir.Qos:
+            if model.vlan not in qos_seen:
+                qos_seen.add(model.vlan)
+                write(qos(model) + "\n")
+        else:
+            write(BACKEND.emit(model) + "\n")
+    for model in passes.routes.models():
+        write(route(model) + "\n")
+    for note in dict.fromkeys(notes):
+        write(note + "\n")
+    write("verify\ncommit\nend\n")
+    for line in dict.fromkeys(exec_lines):
+        write(line + "\n")
+    stats = plan.stats()
+    stats.update(passes.routes.stats())
+    stats.update(
+        object_groups=groups + len(host_groups),
+        aces=aces,
+        metered_hosts=meters,
+        qos_vlans=len(qos_seen),
+    )
+    return stats
+
+
+# -----------------------------
+# delta 출력 (--state): 지난 스냅샷과 다른 것만, 역시 config session 하나로
+#
+#   새 VLAN (이름 바뀐 것 포함) → ACL (바뀌었으면 다시 만들고 안 쓰는 object-group 삭제)
+#   → meter 호스트 지우기 / 넣기 → QoS 인터페이스 → route (no 먼저) → VLAN 지우기
+# -----------------------------
+def _vlans(models):
+    created, deleted = {}, []
+    for model in models:
+        if type(model) is ir.VlanCreate:
+            created[model.id] = model
+        elif type(model) is ir.VlanDelete:
+            deleted.append(model.id)
+    return created, deleted
+
+
+def _qos_vlans(passes) -> dict:
+    vlans = {}
+    for model in passes.rest():
+        if type(model) is ir.Qos:
+            vlans.setdefault(model.vlan, model)
+    return vlans
+
+
+@BACKEND.delta
+def delta_session(old, new, out):
+    write = out.write
+    write(f"! generated by IntentLang (delta)\nconfigure session {SESSION}\n")
+
+    old_created, old_deleted = _vlans(old.expanded())
+    new_created, new_deleted = _vlans(new.expanded())
+    for vid, model in new_created.items():
+        if old_created.get(vid) != model:
+            write(vlan_create(model) + "\n")
+
+    # 그룹은 바뀐 원소만 (ACE 가 쓰는 중이어도 된다), 없어진 그룹은 ACL 을 바꾼 뒤 지운다
+    old_host_groups, new_host_groups = _host_groups(old), _host_groups(new)
+    group_changes = 0
+    for name, lines in new_host_groups.items():
+        removed, added = delta.diff(old_host_groups.get(name, ()), lines)
+        if removed or added:
+            group_changes += 1
+            write(f"object-group network {name}\n")
+            for line in removed:
+                write(f" no{line}\n")
+            for line in added:
+                write(line + "\n")
+
+    old_groups, old_aces = _acl_layout(old.acl)
+    new_groups, new_aces = _acl_layout(new.acl)
+    acl_changed = (old_groups, old_aces) != (new_groups, new_aces)
+    if acl_changed:
+        _write_acls(write, new.acl)
+        # 옛 ACL 이 없어진 뒤에야 지울 수 있다
+        names = {name for name, _ in new_groups}
+        for name, _ in old_groups:
+            if name not in names:
+                write(f"no object-group network {name}\n")
+    for name in old_host_groups:
+        if name not in new_host_groups:
+            write(f"no object-group network {name}\n")
+
+    old_hosts, new_hosts = _meter_hosts(old.expanded()), _meter_hosts(new.expanded())
+    gone = [host for host in old_hosts if host not in new_hosts]
+    for host in gone:
+        name = _meter_name(host)
+        write(
+            f"policy-map {METER_POLICY}\n no class METER_{name}\n"
+            f"no policy-map LIMIT_{name}\n"
+            f"no class-map match-any METER_{name}\n"
+            f"no ip access-list extended METER_{name}\n"
+        )
+    if old_hosts and not new_hosts:
+        write(f"no policy-map {METER_POLICY}\n")
+    # 제한만 바뀐 호스트는 police 를 다시 쓰면 덮어쓴다
+    changed = {h: rate for h, rate in new_hosts.items() if old_hosts.get(h) != rate}
+    _write_meters(write, changed)
+
+    old_qos, new_qos = _qos_vlans(old), _qos_vlans(new)
+    for vlan in old_qos:
+        if vlan not in new_qos:
+            write(f"interface vlan{vlan}\n no priority-queue out\n no mls qos trust cos\n")
+    for vlan, model in new_qos.items():
+        if vlan not in old_qos:
+            write(qos(model) + "\n")
+
+    removed, added = delta.diff(
+        [route(m) for m in old.routes.models()], [route(m) for m in new.routes.models()]
+    )
+    for line in reversed(removed):
+        write(f"no {line}\n")
+    for line in added:
+        write(line + "\n")
+
+    dropped = [vid for vid in old_created if vid not in new_created]
+    dropped.extend(vid for vid in dict.fromkeys(new_deleted) if vid not in old_deleted)
+    for vid in dict.fromkeys(dropped):
+        write(f"no vlan {vid}\n")
+    write("verify\ncommit\nend\n")
+    # exec 명령은 새로 생긴 것만
+    _, exec_added = delta.diff(
+        [m for m in old.models if type(m) in _EXEC], [m for m in new.models if type(m) in _EXEC]
+    )
+    for model in exec_added:
+        write(BACKEND.emit(model) + "\n")
+    return {
+        "acl_rebuilt": int(acl_changed),
+        "groups_changed": group_changes,
+        "meters_removed": len(gone),
+        "meters_changed": len(changed),
+        "routes_removed": len(removed),
+        "routes_added": len(added),
+        "vlans_removed": len(dict.fromkeys(dropped)),
+    }
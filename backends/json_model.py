@@ -0,0 +1,24 @@
+# json_model.py
+#
+# "json" 타깃: JSON Semantic Model 컬럼 (ir 문장의 to_dict())
+
+import json
+
+import delta
+from backends import Backend, register_backend
+
+BACKEND = register_backend(Backend("json", "JSON Semantic Model", "{}", "model.jsonl"))
+
+
+@BACKEND.default
+def to_json(model):
+    return json.dumps(model.to_dict())
+
+
+@BACKEND.delta
+def delta_ops(old, new, out):
+    # {"op": "add" | "remove", 문장 ...} 한 줄에 하나, 적용 순서대로
+    ops = delta.ordered_ops(old.models, new.models)
+    for op, model in ops:
+        out.write(json.dumps({"op": op, **model.to_dict()}) + "\n")
+    return {"ops": len(ops)}
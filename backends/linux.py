@@ -0,0 +1,453 @@
+# linux.py
+#
+# ir 문장 -> Linux 설정 문자열 (iptables / tc / ip)
+
+from contextlib import ExitStack
+
+import acl
+import delta
+import ir
+import writers
+from ir import ip_str, member_str
+
+from backends import Backend, register_backend
+from backends.linux_tc import is_tc, plan_htb
+
+BACKEND = register_backend(
+    Backend("linux", "Linux Config", "# unsupported for linux", "linux.sh")
+)
+
+
+@BACKEND.emitter(ir.Allow)
+def allow(model):
+    return (
+        "iptables -A INPUT "
+        f"-p {model.protocol} -s {ip_str(model.src)} -d {ip_str(model.dst)} -j ACCEPT"
+    )
+
+
+@BACKEND.emitter(ir.GroupAllow)
+def group_allow(model):
+    # 그룹 쪽은 define group 이 만든 ipset 으로 (펼치지 않는다)
+    return (
+        f"iptables -A INPUT -p {model.protocol}"
+        f"{_addr_match('-s', (model.src,))}{_addr_match('-d', (model.dst,))} -j ACCEPT"
+    )
+
+
+@BACKEND.emitter(ir.Block)
+def block(model):
+    return f"iptables -A INPUT -p {model.protocol} -j DROP"
+
+
+@BACKEND.emitter(ir.Meter)
+def meter(model):
+    # 매우 단순화된 tc 예시 (문장마다 root qdisc / classid 1:1 이라 둘이면 충돌한다.
+    # 실제로 쓸 수 있는 것은 --config-dir 의 HTB 트리, linux_tc.plan_htb)
+    return (
+        "tc qdisc add dev eth0 root handle 1: htb default 10; "
+        f"tc class add dev eth0 parent 1: classid 1:1 htb rate {model.rate}"
+    )
+
+
+@BACKEND.emitter(ir.MeterEach)
+def meter_each(model):
+    return meter(model) + f"  # each host in {model.group}"
+
+
+@BACKEND.emitter(ir.Qos)
+def qos(model):
+    return "tc class add dev eth0 parent 1: classid 1:10 htb rate 100mbit prio 0"
+
+
+@BACKEND.emitter(ir.Connectivity)
+def connectivity(model):
+    # dst 쪽으로 /32 라우트 추가하는 예시
+    return f"ip route add {ip_str(model.dst)}/32 via 10.0.0.254"
+
+
+@BACKEND.emitter(ir.VlanCreate)
+def vlan_create(model):
+    return f"ip link add link eth0 name eth0.{model.id} type vlan id {model.id}"
+
+
+@BACKEND.emitter(ir.VlanDelete)
+def vlan_delete(model):
+    return f"ip link delete eth0.{model.id}"
+
+
+@BACKEND.emitter(ir.VlanRangeCreate)
+def vlan_range_create(model):
+    return (
+        f"for id in $(seq {model.first} {model.last}); do "
+        "ip link add link eth0 name eth0.$id type vlan id $id; done"
+    )
+
+
+@BACKEND.emitter(ir.VlanRangeDelete)
+def vlan_range_delete(model):
+    return f"for id in $(seq {model.first} {model.last}); do ip link delete eth0.$id; done"
+
+
+@BACKEND.emitter(ir.HostGroup)
+def host_group(model):
+    name = group_set(model.name)
+    adds = "".join(f"; ipset add {name} {member_str(m)} -exist" for m in model.members)
+    return f"ipset create {name} {GROUP_SET_TYPE} -exist{adds}"
+
+
+@BACKEND.emitter(ir.Route)
+def route(model):
+    return f"ip route add {model.dst} via {ip_str(model.next_hop)}"
+
+
+@BACKEND.emitter(ir.Monitor)
+def monitor(model):
+    return f"ping -c 4 {ip_str(model.dst)}"
+
+
+@BACKEND.emitter(ir.Backup)
+def backup(model):
+    return "cp /etc/network/interfaces /backup/interfaces.bak"
+
+
+# -----------------------------
+# 설정 파일 (--config-dir): route 는 합친 뒤 끝에, ACL 은 최적화 후 ipset 으로 묶는다
+# define group 은 grp_<이름> ipset (hash:net, prefix 그대로) 으로 규칙보다 먼저.
+# VLAN 범위와 "per host in" 은 펼쳐서 (ip -batch / tc 트리는 VLAN / 호스트마다 한 줄)
+# -----------------------------
+GROUP_SET_PREFIX = "grp_"
+GROUP_SET_TYPE = "hash:net"
+
+
+def group_set(name) -> str:
+    return GROUP_SET_PREFIX + name
+
+
+def _set_type(name) -> str:
+    return GROUP_SET_TYPE if name.startswith(GROUP_SET_PREFIX) else "hash:ip"
+
+
+def _addr_match(flag, addrs):
+    addr = addrs[0]
+    if addrs == (None,):
+        return ""
+    if type(addr) is ir.GroupRef:
+        return f" -m set --match-set {group_set(addr.name)} {'src' if flag == '-s' else 'dst'}"
+    return f" {flag} {ip_str(addr)}"
+
+
+def group_sets(passes) -> list:
+    """define group → [(ipset 이름, 원소 문자열)] (정의 순서)"""
+    return [
+        (group_set(name), [member_str(m) for m in group.members])
+        for name, group in passes.groups.items()
+    ]
+
+
+# ACL 규칙은 전용 체인 하나에 (INPUT 에는 점프 한 줄만). 다시 적용할 때 이 체인만
+# 비우고 채우므로 다른 도구가 INPUT 에 넣은 규칙은 그대로 남는다.
+CHAIN = "INTENT"
+_JUMP = f"INPUT -j {CHAIN}"
+
+
+def _chain_setup() -> str:
+    """INTENT 체인을 (없으면) 만들고 INPUT 에서 한 번만 점프하는 명령"""
+    return (
+        f"iptables -N {CHAIN} 2>/dev/null || iptables -F {CHAIN}\n"
+        f"iptables -C {_JUMP} 2>/dev/null || iptables -A {_JUMP}\n"
+    )
+
+
+def _skip(model):
+    # 설정 파일에서 따로 쓰는 문장 (tc 트리, 그룹 ipset)
+    return is_tc(model) or type(model) is ir.HostGroup
+
+
+def acl_rules(plan):
+    """
+    AclPlan → (ipset 목록 [(이름, 주소들)], INTENT 체인 규칙 목록 [(인자 문자열, group, set 이름)])
+    인자 문자열은 'iptables' 뒤에 오는 부분 (-A INTENT ... -j ACCEPT)
+    """
+    sets, rules = [], []
+    for group in plan.groups:
+        target = "ACCEPT" if group.action == acl.ALLOW else "DROP"
+        rule = f"-A {CHAIN} -p {group.protocol}"
+        name = None
+        if len(group) == 1:
+            rule += _addr_match("-s", group.srcs) + _addr_match("-d", group.dsts)
+        else:
+            # 묶인 쪽은 ipset 하나, 다른 쪽은 주소 하나
+            name = f"acl_{group.index}"
+            if len(group.dsts) > 1:
+                sets.append((name, group.dsts))
+                rule += _addr_match("-s", group.srcs) + f" -m set --match-set {name} dst"
+            else:
+                sets.append((name, group.srcs))
+                rule += _addr_match("-d", group.dsts) + f" -m set --match-set {name} src"
+        rules.append((f"{rule} -j {target}", group, name))
+    return sets, rules
+
+
+@BACKEND.program
+def program(models, out, passes):
+    plan = passes.acl
+    write = out.write
+    write("#!/bin/sh\n# generated by IntentLang\n")
+    write(_chain_setup())
+    sets, rules = acl_rules(plan)
+    sets = group_sets(passes) + sets
+    for name, members in sets:
+        write(f"ipset create {name} {_set_type(name)}\n")
+        for addr in members:
+            write(f"ipset add {name} {ip_str(addr)}\n")
+    for rule, _, _ in rules:
+        write(f"iptables {rule}\n")
+    for model in passes.rest(_skip):
+        write(BACKEND.emit(model) + "\n")
+    for model in passes.routes.models():
+        write(route(model) + "\n")
+    htb = plan_htb(passes.expanded())
+    for command in htb.commands():
+        write(f"tc {command}\n")
+    stats = plan.stats()
+    stats.update(passes.routes.stats())
+    stats.update(htb.stats())
+    stats["ipsets"] = len(sets)
+    return stats
+
+
+# -----------------------------
+# batch 출력 (--config-dir --batch): 도구마다 파일 하나, 프로세스 하나로 한 번에 적용
+#
+#   linux.rules : iptables-restore --noflush (INTENT 체인만 원자적으로 교체)
+#   linux.ipset : ipset restore
+#   linux.nft   : nft -f (iptables 대신 쓸 때, set 포함 테이블 하나를 원자적으로 교체)
+#   linux.ip    : ip -force -batch (VLAN 링크, route replace)
+#   linux.tc    : tc -batch (root qdisc 를 지운 뒤)
+#   linux.sh    : 위 파일들을 불러오는 스크립트 + 나머지 명령 (ping, cp ...)
+# linux.sh 는 여러 번 실행해도 된다: 이미 있는 VLAN 링크 / 없는 링크 지우기는
+# -force 로 넘어가고, route 는 replace, tc 트리는 장치마다 통째로 다시 만든다.
+# 적용 전에 python linux_check.py DIR 로 문법을 미리 확인할 수 있다.
+# -----------------------------
+BATCH_FILES = ("linux.rules", "linux.ipset", "linux.nft", "linux.ip", "linux.tc", "linux.sh")
+NFT_TABLE = "intentlang"
+
+# 문장별 출력 중 앞의 도구 이름을 떼고 batch 파일로 보낼 것
+_BATCH_TOOLS = {"ip": "linux.ip", "tc": "linux.tc"}
+_ROUTE_ADD = "route add "
+
+
+def _nft_addr(field, addrs, name):
+    if name is not None and len(addrs) > 1:
+        return f" ip {field} @{name}"
+    if addrs == (None,):
+        return ""
+    if type(addrs[0]) is ir.GroupRef:
+        return f" ip {field} @{group_set(addrs[0].name)}"
+    return f" ip {field} {ip_str(addrs[0])}"
+
+
+def write_nft(f, sets, rules):
+    # 'table' 로 만들어 두고 바로 'delete' → 새로 정의: 파일 하나가 한 트랜잭션
+    f.write(f"table ip {NFT_TABLE}\ndelete table ip {NFT_TABLE}\n")
+    f.write(f"table ip {NFT_TABLE} {{\n")
+    for name, members in sets:
+        f.write(f"\tset {name} {{\n\t\ttype ipv4_addr\n")
+        if name.startswith(GROUP_SET_PREFIX):
+            f.write("\t\tflags interval\n")  # prefix 원소
+        f.write(f"\t\telements = {{ {', '.join(ip_str(a) for a in members)} }}\n\t}}\n")
+    f.write("\tchain input {\n\t\ttype filter hook input priority 0; policy accept;\n")
+    for _, group, name in rules:
+        verdict = "accept" if group.action == acl.ALLOW else "drop"
+        match = (
+            f"ip protocol {group.protocol}"
+            + _nft_addr("saddr", group.srcs, name)
+            + _nft_addr("daddr", group.dsts, name)
+        )
+        f.write(f"\t\t{match} {verdict}\n")
+    f.write("\t}\n}\n")
+
+
+@BACKEND.batch
+def batch(models, out_dir, passes):
+    plan = passes.acl
+    sets, rules = acl_rules(plan)
+    sets = group_sets(passes) + sets
+    with ExitStack() as stack:
+        files = {
+            name: stack.enter_context(writers.open_output(out_dir / name))
+            for name in BATCH_FILES
+        }
+        # --noflush: filter 테이블의 다른 체인은 건드리지 않는다
+        files["linux.rules"].write(f"*filter\n:{CHAIN} - [0:0]\n-F {CHAIN}\n")
+        for rule, _, _ in rules:
+            files["linux.rules"].write(rule + "\n")
+        files["linux.rules"].write("COMMIT\n")
+        for name, members in sets:
+            files["linux.ipset"].write(f"create {name} {_set_type(name)} -exist\nflush {name}\n")
+            for addr in members:
+                files["linux.ipset"].write(f"add {name} {ip_str(addr)}\n")
+        write_nft(files["linux.nft"], sets, rules)
+
+        commands = []  # batch 로 못 보내는 나머지 명령
+        batched = {target: {} for target in _BATCH_TOOLS.values()}  # 순서 유지 + 중복 제거
+        lines = [BACKEND.emit(m) for m in passes.rest(_skip, expand=True)]
+        lines.extend(route(m) for m in passes.routes.models())
+        for line in lines:
+            for command in line.split("; "):
+                tool, _, rest = command.partition(" ")
+                target = _BATCH_TOOLS.get(tool)
+                if target is None:
+                    commands.append(command)
+                else:
+                    if rest.startswith(_ROUTE_ADD):
+                        # 다시 실행해도 "File exists" 로 멈추지 않게
+                        rest = "route replace " + rest.removeprefix(_ROUTE_ADD)
+                    # 같은 명령 두 번 (예: root qdisc) 은 batch 를 중간에 멈추게 한다
+                    batched[target][rest] = None
+        files["linux.ip"].writelines(f"{rest}\n" for rest in batched["linux.ip"])
+        # meter / QoS 는 장치마다 HTB 트리 하나 (부모가 먼저)
+        htb = plan_htb(passes.expanded())
+        files["linux.tc"].writelines(f"{command}\n" for command in htb.commands())
+        files["linux.tc"].writelines(f"{rest}\n" for rest in batched["linux.tc"])
+
+        sh = files["linux.sh"]
+        sh.write(
+            "#!/bin/sh\n# generated by IntentLang (batch)\n"
+            "# FIREWALL=nft 이면 iptables 대신 nft\n"
+            "set -e\ncd \"$(dirname \"$0\")\"\n"
+            'if [ "${FIREWALL:-iptables}" = nft ]; then\n'
+            "\tnft -f linux.nft\n"
+            "else\n"
+            "\tipset restore < linux.ipset\n"
+            "\tiptables-restore --noflush < linux.rules\n"
+            f"\tiptables -C {_JUMP} 2>/dev/null || iptables -A {_JUMP}\n"
+            "fi\n"
+            "# 이미 있는 링크 add / 없는 링크 delete 는 실패해도 나머지를 계속\n"
+            "ip -force -batch linux.ip || true\n"
+        )
+        for dev in htb.devices:
+            sh.write(f"tc qdisc del dev {dev} root 2>/dev/null || true\n")
+        sh.write("tc -batch linux.tc\n")
+        for command in commands:
+            sh.write(command + "\n")
+    stats = plan.stats()
+    stats.update(passes.routes.stats())
+    stats.update(htb.stats())
+    stats["ipsets"] = len(sets)
+    return stats
+
+
+# -----------------------------
+# delta 출력 (--state): 지난 스냅샷과 다른 명령만 (linux.delta.sh)
+#
+#   새 VLAN 링크 → ipset 새 set/주소 → iptables -D (지운 규칙) → iptables -I 위치
+#   → ipset 주소 del / set destroy → route del/add → tc 트리 (바뀐 경우만 다시)
+#   → VLAN 링크 지우기
+# 규칙은 최종 목록에서의 위치로 작은 것부터 -I 하므로 결과 순서가 전체 출력과 같다.
+# 순서만 바뀐 규칙은 지웠다가 다시 넣는다 (delta.reordered).
+# -----------------------------
+_RULE_PREFIX = f"-A {CHAIN} "
+_LINK_ADD = "ip link add "
+_LINK_DEL = "ip link delete "
+
+
+def _state(passes):
+    sets, rules = acl_rules(passes.acl)
+    sets = group_sets(passes) + sets
+    specs = [rule.removeprefix(_RULE_PREFIX) for rule, _, _ in rules]
+    lines = [BACKEND.emit(m) for m in passes.rest(_skip, expand=True)]
+    lines.extend(route(m) for m in passes.routes.models())
+    htb = plan_htb(passes.expanded())
+    return dict(sets), list(dict.fromkeys(specs)), list(dict.fromkeys(lines)), htb
+
+
+def _undo(line):
+    """명령 하나를 되돌리는 명령. 되돌릴 수 없으면 (ping, cp, 지우기) None"""
+    if line.startswith("ip route add "):
+        return "ip route del " + line.removeprefix("ip route add ")
+    if line.startswith(_LINK_ADD):
+        # ip link add link eth0 name eth0.N type vlan id N
+        words = line.split()
+        return _LINK_DEL + words[words.index("name") + 1]
+    return None
+
+
+@BACKEND.delta
+def delta_script(old, new, out):
+    old_sets, old_specs, old_lines, old_htb = _state(old)
+    new_sets, new_specs, new_lines, new_htb = _state(new)
+    write = out.write
+    write("#!/bin/sh\n# generated by IntentLang (delta)\nset -e\n")
+    write(f"iptables -N {CHAIN} 2>/dev/null || true\n")
+    write(f"iptables -C {_JUMP} 2>/dev/null || iptables -A {_JUMP}\n")
+
+    removed, added = delta.diff(old_lines, new_lines)
+    for line in added:
+        if line.startswith(_LINK_ADD):
+            write(line + "\n")
+
+    set_ops = 0
+    for name, members in new_sets.items():
+        if name not in old_sets:
+            write(f"ipset create {name} {_set_type(name)} -exist\n")
+        for addr in delta.diff(old_sets.get(name, ()), members)[1]:
+            write(f"ipset add {name} {ip_str(addr)} -exist\n")
+            set_ops += 1
+
+    moved = delta.reordered(old_specs, new_specs)
+    gone, _ = delta.diff(old_specs, new_specs)
+    gone = set(gone) | moved
+    for spec in reversed(old_specs):
+        if spec in gone:
+            write(f"iptables -D {CHAIN} {spec}\n")
+    old_specs_set = set(old_specs)
+    inserted = 0
+    for pos, spec in enumerate(new_specs, start=1):
+        if spec not in old_specs_set or spec in moved:
+            write(f"iptables -I {CHAIN} {pos} {spec}\n")
+            inserted += 1
+
+    for name, members in old_sets.items():
+        if name in new_sets:
+            for addr in delta.diff(members, new_sets[name])[0]:
+                write(f"ipset del {name} {ip_str(addr)} -exist\n")
+                set_ops += 1
+        else:
+            write(f"ipset destroy {name}\n")
+
+    not_removed = 0
+    for line in reversed(removed):
+        undo = _undo(line)
+        if undo is None:
+            not_removed += 1
+        elif not line.startswith(_LINK_ADD):
+            write(undo + "\n")
+    for line in added:
+        if not line.startswith((_LINK_ADD, _LINK_DEL)):
+            write(line + "\n")
+
+    # tc 트리는 classid / 해시 칸이 서로 얽혀 있어 바뀌면 장치마다 통째로 다시 만든다
+    rebuilt = list(old_htb.commands()) != list(new_htb.commands())
+    if rebuilt:
+        for dev in old_htb.devices:
+            write(f"tc qdisc del dev {dev} root\n")
+        for command in new_htb.commands():
+            write(f"tc {command}\n")
+
+    for line in reversed(removed):
+        if line.startswith(_LINK_ADD):
+            write(_undo(line) + "\n")
+    for line in added:
+        if line.startswith(_LINK_DEL):
+            write(line + "\n")
+    return {
+        "rules_deleted": len(gone),
+        "rules_inserted": inserted,
+        "ipset_changes": set_ops,
+        "commands_removed": len(removed) - not_removed,
+        "commands_added": len(added),
+        "tc_rebuilt": int(rebuilt),
+        "not_removed": not_removed,
+    }
@@ -0,0 +1,168 @@
+# linux_tc.py
+#
+# Linux 설정 파일 (--config-dir) 의 meter / QoS → tc HTB
+#
+# 장치마다 HTB 트리 하나:
+#
+#   1:      root qdisc (htb default 10)
+#   1:1     링크 전체 (LINK_RATE)
+#   1:10    분류 안 된 트래픽 (default)
+#   1:1VVV  QoS high VLAN (prio 0), VVV = VLAN id (16진), flower vlan_id 필터
+#   1:2000~ meter 호스트마다 class 하나 (rate = ceil = 제한값)
+#
+# 호스트 분류는 dst 주소로 두 단계 해시한 u32 필터:
+#   800:: (root) --3번째 옥텟--> 2: (256 칸) --4번째 옥텟--> 3:, 4:, ... (256 칸)
+# 칸 하나에는 마지막 두 옥텟이 같은 호스트만 들어가므로 호스트 수와 무관하게
+# 패킷마다 필터 몇 개만 본다. 이름이 풀리지 않은 호스트는 class 만 만들고
+# 필터는 만들지 않는다 (통계 unclassified).
+
+import ir
+from ir import ip_str
+
+DEVICE = "eth0"
+LINK_RATE = "10gbit"
+DEFAULT_RATE = "1mbit"
+QOS_RATE = "100mbit"
+
+ROOT = 1  # root qdisc major
+DEFAULT_MINOR = 0x10
+QOS_BASE = 0x1000  # | VLAN id (1~4094): 실행마다 같은 classid
+HOST_BASE = 0x2000
+MAX_MINOR = 0xFFFF
+
+PRIO_VLAN = 1
+PRIO_HOST = 5
+HOST_TABLE = 2  # 3번째 옥텟 해시 테이블 handle, 4번째 옥텟 테이블은 3 부터
+
+
+def mbit(rate_mbps) -> str:
+    # intent 의 Mbps 는 megabit (tc 의 mbps 는 megabyte 이다)
+    return f"{rate_mbps}mbit"
+
+
+class Device:
+    """장치 하나의 HTB 트리"""
+
+    def __init__(self, name):
+        self.name = name
+        self.vlans = {}  # vlan id -> classid minor
+        self.hosts = {}  # host (int 또는 이름) -> (minor, rate_mbps)
+        self.duplicates = 0
+        self.conflicts = 0
+        self.invalid = 0  # 범위 밖 VLAN id
+
+    def add_vlan(self, vlan):
+        if not isinstance(vlan, int) or not 1 <= vlan <= 4094:
+            self.invalid += 1
+            return
+        if vlan in self.vlans:
+            self.duplicates += 1
+            return
+        self.vlans[vlan] = QOS_BASE | vlan
+
+    def add_host(self, host, rate_mbps):
+        seen = self.hosts.get(host)
+        if seen is not None:
+            # 같은 호스트를 다시 제한하면 처음 것을 쓴다
+            if seen[1] == rate_mbps:
+                self.duplicates += 1
+            else:
+                self.conflicts += 1
+            return
+        minor = HOST_BASE + len(self.hosts)
+        if minor > MAX_MINOR:
+            limit = MAX_MINOR - HOST_BASE + 1
+            raise ValueError(f"{self.name}: too many metered hosts (max {limit})")
+        self.hosts[host] = (minor, rate_mbps)
+
+    def commands(self):
+        """tc -batch 명령 (앞의 'tc' 없이), 부모가 먼저 나오는 순서"""
+        dev = self.name
+        cls = f"class add dev {dev} parent {ROOT}:1 classid {ROOT}"
+        yield f"qdisc add dev {dev} root handle {ROOT}: htb default {DEFAULT_MINOR:x}"
+        yield (
+            f"class add dev {dev} parent {ROOT}: classid {ROOT}:1 "
+            f"htb rate {LINK_RATE} ceil {LINK_RATE}"
+        )
+        yield f"{cls}:{DEFAULT_MINOR:x} htb rate {DEFAULT_RATE} ceil {LINK_RATE} prio 7"
+        for vlan, minor in self.vlans.items():
+            yield f"{cls}:{minor:x} htb rate {QOS_RATE} ceil {LINK_RATE} prio 0"
+        for minor, rate in self.hosts.values():
+            yield f"{cls}:{minor:x} htb rate {mbit(rate)} ceil {mbit(rate)}"
+        for vlan, minor in self.vlans.items():
+            yield (
+                f"filter add dev {dev} parent {ROOT}: protocol 802.1Q prio {PRIO_VLAN} "
+                f"flower vlan_id {vlan} classid {ROOT}:{minor:x}"
+            )
+        yield from self._host_filters()
+
+    def _host_filters(self):
+        by_octet = {}  # 3번째 옥텟 -> [(주소, minor)]
+        for host, (minor, _) in self.hosts.items():
+            if isinstance(host, int):
+                by_octet.setdefault((host >> 8) & 0xFF, []).append((host, minor))
+        if not by_octet:
+            return
+        u32 = f"filter add dev {self.name} parent {ROOT}: prio {PRIO_HOST} protocol ip"
+        yield f"{u32} u32"
+        yield f"{u32} handle {HOST_TABLE:x}: u32 divisor 256"
+        yield (
+            f"{u32} u32 ht 800:: match u32 0 0 "
+            f"hashkey mask 0x0000ff00 at 16 link {HOST_TABLE:x}:"
+        )
+        for n, (octet, hosts) in enumerate(sorted(by_octet.items())):
+            table = HOST_TABLE + 1 + n
+            yield f"{u32} handle {table:x}: u32 divisor 256"
+            yield (
+                f"{u32} u32 ht {HOST_TABLE:x}:{octet:x}: match u32 0 0 "
+                f"hashkey mask 0x000000ff at 16 link {table:x}:"
+            )
+            for addr, minor in hosts:
+                yield (
+                    f"{u32} u32 ht {table:x}:{addr & 0xFF:x}: "
+                    f"match ip dst {ip_str(addr)}/32 flowid {ROOT}:{minor:x}"
+                )
+
+
+class HtbPlan:
+    def __init__(self):
+        self.devices = {}
+
+    def device(self, name) -> Device:
+        dev = self.devices.get(name)
+        if dev is None:
+            dev = self.devices[name] = Device(name)
+        return dev
+
+    def commands(self):
+        for dev in self.devices.values():
+            yield from dev.commands()
+
+    def stats(self) -> dict:
+        devices = self.devices.values()
+        return {
+            "tc_devices": len(self.devices),
+            "metered_hosts": sum(len(d.hosts) for d in devices),
+            "qos_vlans": sum(len(d.vlans) for d in devices),
+            "unclassified": sum(
+                1 for d in devices for h in d.hosts if not isinstance(h, int)
+            ),
+            "meter_duplicates": sum(d.duplicates for d in devices),
+            "meter_conflicts": sum(d.conflicts for d in devices),
+            "invalid_vlans": sum(d.invalid for d in devices),
+        }
+
+
+def plan_htb(models, device=DEVICE) -> HtbPlan:
+    """models 의 "per host in" 은 펼친 것 (Passes.expanded) 이어야 한다"""
+    plan = HtbPlan()
+    for model in models:
+        if type(model) is ir.Meter:
+            plan.device(device).add_host(model.host, model.rate_mbps)
+        elif type(model) is ir.Qos:
+            plan.device(device).add_vlan(model.vlan)
+    return plan
+
+
+def is_tc(model) -> bool:
+    return type(model) in (ir.Meter, ir.Qos, ir.MeterEach)
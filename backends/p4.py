@@ -0,0 +1,198 @@
+# p4.py
+#
+# ir 문장 -> P4/OpenFlow 스타일 설정 문자열 (논문/보고서용 예시 형식)
+
+import ir
+import writers
+from ir import ip_str
+
+from backends import Backend, register_backend
+from backends.p4_runtime import (
+    DELETE,
+    INSERT,
+    MODIFY,
+    diff_plans,
+    load_priorities,
+    plan_p4,
+    write_updates,
+)
+
+BACKEND = register_backend(
+    Backend("p4", "P4/OpenFlow", "// unsupported for P4/OpenFlow", "p4.json")
+)
+CLI_FILE = "p4.cli"
+
+
+@BACKEND.emitter(ir.Allow)
+def allow(model):
+    return (
+        "acl_table: match={"
+        f"'src':'{ip_str(model.src)}',"
+        f"'dst':'{ip_str(model.dst)}',"
+        f"'proto':'{model.protocol}'"
+        "}, action=allow"
+    )
+
+
+def _addr(value):
+    return str(value) if type(value) is ir.GroupRef else ip_str(value)
+
+
+@BACKEND.emitter(ir.GroupAllow)
+def group_allow(model):
+    return (
+        "acl_table: match={"
+        f"'src':'{_addr(model.src)}',"
+        f"'dst':'{_addr(model.dst)}',"
+        f"'proto':'{model.protocol}'"
+        "}, action=allow"
+    )
+
+
+@BACKEND.emitter(ir.Block)
+def block(model):
+    return (
+        "acl_table: match={"
+        f"'proto':'{model.protocol}'"
+        "}, action=deny"
+    )
+
+
+@BACKEND.emitter(ir.Meter)
+def meter(model):
+    return (
+        "meter_table: match={"
+        f"'src':'{ip_str(model.host)}'"
+        "}, action={'set_rate':'" + model.rate + "'}"
+    )
+
+
+@BACKEND.emitter(ir.MeterEach)
+def meter_each(model):
+    return (
+        "meter_table: match={"
+        f"'src':'{model.group}'"
+        "}, action={'set_rate':'" + model.rate + "'} per host"
+    )
+
+
+@BACKEND.emitter(ir.Qos)
+def qos(model):
+    return (
+        "qos_table: match={"
+        f"'Vlan':{model.vlan}"
+        "}, action={'set_priority':'high'}"
+    )
+
+
+@BACKEND.emitter(ir.Connectivity)
+def connectivity(model):
+    return (
+        "flow_table: match={"
+        f"'src':'{ip_str(model.src)}',"
+        f"'dst':'{ip_str(model.dst)}'"
+        "}, action='forward', path=['SW1','SW3']"
+    )
+
+
+@BACKEND.emitter(ir.VlanCreate)
+def vlan_create(model):
+    return "VLAN setup via P4 metadata (optional)"
+
+
+@BACKEND.emitter(ir.VlanDelete)
+def vlan_delete(model):
+    return "Remove VLAN metadata in tables"
+
+
+@BACKEND.emitter(ir.VlanRangeCreate)
+def vlan_range_create(model):
+    return f"VLAN {model.first}-{model.last} setup via P4 metadata (optional)"
+
+
+@BACKEND.emitter(ir.VlanRangeDelete)
+def vlan_range_delete(model):
+    return f"Remove VLAN {model.first}-{model.last} metadata in tables"
+
+
+@BACKEND.emitter(ir.HostGroup)
+def host_group(model):
+    return f"Host group {model.name}: {model.size()} addresses as ternary keys"
+
+
+@BACKEND.emitter(ir.Route)
+def route(model):
+    return (
+        "flow_table: match={"
+        f"'dst':'{model.dst}'"
+        "}, action='forward'"
+    )
+
+
+@BACKEND.emitter(ir.Monitor)
+def monitor(model):
+    return "monitor_table: timestamps/counters to measure RTT"
+
+
+@BACKEND.emitter(ir.Backup)
+def backup(model):
+    return "Save controller switch state to JSON/YAML"
+
+
+# -----------------------------
+# 설정 파일 (--config-dir): 테이블 항목 (backends/p4_runtime.py)
+#   p4.json  P4Runtime WriteRequest 모양의 JSON
+#   p4.cli   bmv2 simple_switch_CLI 명령 (--batch)
+# 테이블 크기를 넘으면 에러 진단 (passes.diagnostics)
+# ACL priority 는 지난 배포 (passes.state) 의 값을 이어받고 다음 배포로 넘긴다
+# -----------------------------
+def _plan_stable(passes):
+    state = passes.state.get(BACKEND.name, {})
+    plan = plan_p4(passes, priorities=load_priorities(state.get("priorities", {})))
+    passes.next_state[BACKEND.name] = {"priorities": plan.priority_state()}
+    return plan
+
+
+def _plan(passes):
+    plan = _plan_stable(passes)
+    passes.diagnostics.extend(plan.diagnostics())
+    stats = passes.acl.stats()
+    stats.update(passes.routes.stats())
+    stats.update(plan.stats())
+    return plan, stats
+
+
+@BACKEND.program
+def program(models, out, passes):
+    plan, stats = _plan(passes)
+    plan.write_runtime(out)
+    return stats
+
+
+@BACKEND.batch
+def batch(models, out_dir, passes):
+    plan, stats = _plan(passes)
+    with writers.open_output(out_dir / BACKEND.filename) as f:
+        plan.write_runtime(f)
+    with writers.open_output(out_dir / CLI_FILE) as f:
+        plan.write_cli(f)
+    return stats
+
+
+# -----------------------------
+# delta 출력 (--state): 항목 단위 DELETE / MODIFY / INSERT (p4.delta.json)
+# -----------------------------
+@BACKEND.delta
+def delta_updates(old, new, out):
+    # old 도 같은 지난 priority 로 매기므로 장치에 있는 값이 그대로 나온다
+    after = _plan_stable(new)
+    updates = diff_plans(_plan_stable(old), after)
+    write_updates(out, after.tables(), updates)
+    counts = {DELETE: 0, MODIFY: 0, INSERT: 0}
+    for update in updates:
+        counts[update["type"]] += 1
+    return {
+        "p4_deletes": counts[DELETE],
+        "p4_modifies": counts[MODIFY],
+        "p4_inserts": counts[INSERT],
+    }
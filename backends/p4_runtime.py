@@ -0,0 +1,518 @@
+# p4_runtime.py
+#
+# P4 설정 파일 (--config-dir) 의 테이블 항목
+#
+# 문장을 테이블 항목 (키 + action + 인자) 으로 바꾸고, 키는 테이블 정의의
+# match 종류대로 묶는다:
+#
+#   acl_table      ternary  src, dst (prefix 로 덮은 value&&&mask), proto   allow / drop
+#   meter_table    exact    src                                          set_rate(rate_mbps)
+#   qos_table      exact    vlan_id                                      set_priority(prio)
+#   vlan_table     exact    vlan_id                                      set_vlan
+#   flow_table     exact    src, dst                                     forward
+#   monitor_table  exact    src, dst                                     timestamp
+#   ipv4_lpm       lpm      dst                                          set_nhop(nhop)
+#
+# 같은 키는 한 번만 (먼저 나온 것이 이긴다). 테이블마다 항목 수를 크기와
+# 비교해서 넘치면 에러 진단을 남긴다 (장비에 올리기 전에 알 수 있게).
+# ternary priority 는 PRIORITY_STEP 간격으로 띄워서 매기고 (--state 면) 지난 배포의
+# 값을 이어받는다: 규칙 하나를 넣거나 빼도 다른 항목의 priority 는 그대로다.
+# 출력은 P4Runtime WriteRequest 모양의 JSON (값은 canonical bytes 의 base64,
+# id 대신 이름) 과 bmv2 simple_switch_CLI 명령 파일 두 가지.
+
+import base64
+import json
+
+import acl
+import delta
+import ir
+from diagnostics import ERROR, WARNING, Diagnostic
+from ir import ip_str
+
+EXACT = "exact"
+LPM = "lpm"
+TERNARY = "ternary"
+
+# P4Runtime Update.type
+INSERT = "INSERT"
+MODIFY = "MODIFY"
+DELETE = "DELETE"
+
+PROGRAM = "intentlang"
+# ternary 항목 priority: P4Runtime 은 int32 (> 0), 새 항목이 들어갈 빈 값을 남긴다
+PRIORITY_STEP = 1 << 10
+PRIORITY_MAX = (1 << 31) - 1
+PRIORITY_HIGH = 7
+PROTOCOLS = {ir.Protocol.TCP: 6, ir.Protocol.ICMP: 1}
+ACL_ACTIONS = {acl.ALLOW: "allow", acl.DENY: "drop"}
+
+
+class Table:
+    def __init__(self, name, keys, params=(), size=1024):
+        self.name = name
+        self.keys = keys  # ((필드 이름, match 종류, bit 수), ...)
+        self.params = params  # action 인자 ((이름, bit 수), ...)
+        self.size = size  # 기본 크기 (TABLE_SIZES 로 바꿈)
+
+    @property
+    def ternary(self) -> bool:
+        # ternary 키가 있는 테이블만 priority 를 쓴다
+        return any(kind == TERNARY for _, kind, _ in self.keys)
+
+
+_ADDR = 32
+# CLI 에서 점 표기로 쓰는 키 / 인자
+ADDRESSES = {"hdr.ipv4.srcAddr", "hdr.ipv4.dstAddr", "nhop"}
+TABLES = {
+    t.name: t
+    for t in (
+        Table(
+            "acl_table",
+            (
+                ("hdr.ipv4.srcAddr", TERNARY, _ADDR),
+                ("hdr.ipv4.dstAddr", TERNARY, _ADDR),
+                ("hdr.ipv4.protocol", TERNARY, 8),
+            ),
+            size=1024,
+        ),
+        Table(
+            "meter_table",
+            (("hdr.ipv4.srcAddr", EXACT, _ADDR),),
+            (("rate_mbps", 32),),
+            size=1024,
+        ),
+        Table(
+            "qos_table", (("hdr.vlan.vid", EXACT, 12),), (("prio", 3),), size=4096
+        ),
+        Table("vlan_table", (("hdr.vlan.vid", EXACT, 12),), size=4096),
+        Table(
+            "flow_table",
+            (("hdr.ipv4.srcAddr", EXACT, _ADDR), ("hdr.ipv4.dstAddr", EXACT, _ADDR)),
+            size=4096,
+        ),
+        Table(
+            "monitor_table",
+            (("hdr.ipv4.srcAddr", EXACT, _ADDR), ("hdr.ipv4.dstAddr", EXACT, _ADDR)),
+            size=1024,
+        ),
+        Table(
+            "ipv4_lpm", (("hdr.ipv4.dstAddr", LPM, _ADDR),), (("nhop", _ADDR),), size=16384
+        ),
+    )
+}
+
+# 테이블 이름 -> 항목 수 한도. --p4-table-size 로 바꾼다
+TABLE_SIZES = {name: t.size for name, t in TABLES.items()}
+
+
+def parse_table_sizes(specs) -> dict:
+    """['acl_table=2048', ...] -> {'acl_table': 2048}. 잘못된 값은 ValueError"""
+    sizes = {}
+    for spec in specs:
+        name, sep, value = spec.partition("=")
+        if name not in TABLES:
+            raise ValueError(f"unknown P4 table {name!r} (known: {', '.join(TABLES)})")
+        if not sep or not value.isdigit() or int(value) == 0:
+            raise ValueError(f"bad table size {spec!r}, expected TABLE=N (N > 0)")
+        sizes[name] = int(value)
+    return sizes
+
+
+def set_table_sizes(sizes):
+    TABLE_SIZES.update(sizes)
+
+
+# -----------------------------
+# 키 묶기
+# -----------------------------
+def _fits(value, bits) -> bool:
+    return isinstance(value, int) and 0 <= value < (1 << bits)
+
+
+def pack_key(table, fields):
+    """
+    fields: 키마다 exact 는 값, lpm 은 (값, prefix 길이), ternary 는 (값, mask).
+    돌려주는 값: 키마다 정규화한 값 (와일드카드는 None) 의 tuple.
+    int 가 아니거나 bit 수를 넘는 값 (풀리지 않은 호스트 이름 등) 이 있으면 None.
+    """
+    packed = []
+    for (_, kind, bits), field in zip(table.keys, fields):
+        if kind == EXACT:
+            if not _fits(field, bits):
+                return None
+            packed.append(field)
+            continue
+        value, arg = field
+        if kind == LPM:
+            if not _fits(value, bits) or not 0 <= arg <= bits:
+                return None
+            mask = ((1 << bits) - 1) ^ ((1 << (bits - arg)) - 1)
+            # prefix 0 은 P4Runtime 에서 키를 빼야 한다 (와일드카드)
+            packed.append((value & mask, arg) if arg else None)
+        else:
+            if arg == 0:
+                packed.append(None)
+                continue
+            if not _fits(value, bits) or not _fits(arg, bits):
+                return None
+            packed.append((value & arg, arg))  # mask 밖 비트는 0 이어야 한다
+    return tuple(packed)
+
+
+def _bytes(value) -> bytes:
+    # canonical bytes: 앞쪽 0 바이트 없이 (0 은 1 바이트)
+    return value.to_bytes(max(1, (value.bit_length() + 7) // 8), "big")
+
+
+def _b64(value) -> str:
+    return base64.b64encode(_bytes(value)).decode("ascii")
+
+
+class Entry:
+    __slots__ = ("table", "match", "action", "params")
+
+    def __init__(self, table, match, action, params=()):
+        self.table = table
+        self.match = match
+        self.action = action
+        self.params = params
+
+    def to_runtime(self, priority=None, update=INSERT) -> dict:
+        """P4Runtime Update 하나. DELETE 는 키 (match, priority) 만"""
+        match = []
+        for (field, kind, _), value in zip(self.table.keys, self.match):
+            if value is None:
+                continue  # 와일드카드는 키를 뺀다
+            if kind == EXACT:
+                match.append({"fieldName": field, "exact": {"value": _b64(value)}})
+            elif kind == LPM:
+                lpm = {"value": _b64(value[0]), "prefixLen": value[1]}
+                match.append({"fieldName": field, "lpm": lpm})
+            else:
+                match.append(
+                    {
+                        "fieldName": field,
+                        "ternary": {"value": _b64(value[0]), "mask": _b64(value[1])},
+                    }
+                )
+        entry = {"tableName": self.table.name, "match": match}
+        if priority is not None:
+            entry["priority"] = priority
+        if update == DELETE:
+            return {"type": update, "entity": {"tableEntry": entry}}
+        params = [
+            {"paramName": name, "value": _b64(value)}
+            for (name, _), value in zip(self.table.params, self.params)
+        ]
+        entry["action"] = {"action": {"actionName": self.action, "params": params}}
+        return {"type": update, "entity": {"tableEntry": entry}}
+
+    def to_cli(self, priority=None) -> str:
+        """simple_switch_CLI table_add 명령 하나"""
+        keys = []
+        for (field, kind, _), value in zip(self.table.keys, self.match):
+            if kind == EXACT:
+                keys.append(_cli_value(value, field))
+            elif kind == LPM:
+                if value is None:
+                    keys.append(f"{_cli_value(0, field)}/0")
+                else:
+                    keys.append(f"{_cli_value(value[0], field)}/{value[1]}")
+            elif value is None:
+                keys.append("0&&&0")
+            else:
+                keys.append(f"{value[0]:#x}&&&{value[1]:#x}")
+        params = " ".join(
+            _cli_value(value, name) for (name, _), value in zip(self.table.params, self.params)
+        )
+        line = f"table_add {self.table.name} {self.action} {' '.join(keys)} =>"
+        if params:
+            line += f" {params}"
+        if priority is not None:
+            line += f" {priority}"
+        return line
+
+
+def _cli_value(value, name) -> str:
+    return ip_str(value) if name in ADDRESSES else str(value)
+
+
+# -----------------------------
+# 항목 모으기
+# -----------------------------
+class P4Plan:
+    def __init__(self, sizes=None):
+        self.sizes = dict(TABLE_SIZES if sizes is None else sizes)
+        self.entries = {name: {} for name in TABLES}  # 테이블 -> {키: Entry} (순서 유지)
+        self.duplicates = 0
+        self.conflicts = 0  # 같은 키, 다른 action/인자 (처음 것을 쓴다)
+        self.unpacked = {}  # 테이블 -> 키로 만들 수 없어 뺀 항목 수
+        self.removed = 0
+        self.controller = 0  # 테이블 항목이 아닌 문장 (backup)
+        self.priorities = {}  # ternary 테이블 -> {키: P4Runtime priority}
+
+    def add(self, name, fields, action, params=()) -> bool:
+        table = TABLES[name]
+        match = pack_key(table, fields)
+        if match is None or not all(_fits(v, b) for (_, b), v in zip(table.params, params)):
+            self.unpacked[name] = self.unpacked.get(name, 0) + 1
+            return False
+        entries = self.entries[name]
+        seen = entries.get(match)
+        if seen is not None:
+            if seen.action == action and seen.params == params:
+                self.duplicates += 1
+            else:
+                self.conflicts += 1
+            return False
+        entries[match] = Entry(table, match, action, tuple(params))
+        return True
+
+    def remove(self, name, fields):
+        match = pack_key(TABLES[name], fields)
+        if match is not None and self.entries[name].pop(match, None) is not None:
+            self.removed += 1
+
+    def assign_priorities(self, previous=None):
+        """
+        ternary 테이블 항목의 priority (먼저 넣은 것이 크다).
+        previous ({테이블: {키: priority}}, 지난 배포) 에 있던 항목은 순서가 그대로인 한
+        같은 값을 쓰고, 새 항목 / 순서가 바뀐 항목만 이웃 사이의 빈 값에 넣는다.
+        """
+        previous = previous or {}
+        for name, entries in self.entries.items():
+            if TABLES[name].ternary:
+                self.priorities[name] = _stable_priorities(list(entries), previous.get(name, {}))
+
+    def priority_state(self) -> dict:
+        """다음 배포로 넘길 priority (JSON: {테이블: [[키, priority], ...]})"""
+        return {name: list(map(list, p.items())) for name, p in self.priorities.items() if p}
+
+    def ordered(self):
+        """(Entry, P4Runtime priority, bmv2 priority). ternary 는 먼저 넣은 것이 이긴다"""
+        for name, entries in self.entries.items():
+            priorities = self.priorities.get(name)
+            if priorities is None and TABLES[name].ternary:
+                priorities = self.priorities[name] = _stable_priorities(list(entries), {})
+            for match, entry in entries.items():
+                if priorities is not None:
+                    # P4Runtime 은 큰 값이, bmv2 는 작은 값이 먼저 맞는다
+                    priority = priorities[match]
+                    yield entry, priority, PRIORITY_MAX - priority
+                else:
+                    yield entry, None, None
+
+    def overflow(self):
+        """[(테이블, 항목 수, 크기)] 크기를 넘은 테이블"""
+        return [
+            (name, len(entries), self.sizes[name])
+            for name, entries in self.entries.items()
+            if len(entries) > self.sizes[name]
+        ]
+
+    def diagnostics(self) -> list:
+        found = [
+            Diagnostic(
+                f"P4 table {name}: {count} entries, size {size}",
+                severity=ERROR,
+                code="p4-capacity",
+            )
+            for name, count, size in self.overflow()
+        ]
+        for name, count in self.unpacked.items():
+            found.append(
+                Diagnostic(
+                    f"P4 table {name}: {count} entries skipped "
+                    "(host names or values that do not fit the key)",
+                    severity=WARNING,
+                    code="p4-key",
+                )
+            )
+        return found
+
+    def stats(self) -> dict:
+        return {
+            "p4_entries": sum(len(e) for e in self.entries.values()),
+            "p4_duplicates": self.duplicates,
+            "p4_conflicts": self.conflicts,
+            "p4_skipped": sum(self.unpacked.values()),
+            "p4_removed": self.removed,
+            "p4_controller": self.controller,
+            "p4_over_capacity": len(self.overflow()),
+        }
+
+    # -----------------------------
+    # 출력
+    # -----------------------------
+    def tables(self) -> dict:
+        return {
+            name: {"entries": len(entries), "size": self.sizes[name]}
+            for name, entries in self.entries.items()
+            if entries
+        }
+
+    def write_runtime(self, out):
+        """P4Runtime WriteRequest 모양의 JSON (update 한 줄에 하나)"""
+        updates = (entry.to_runtime(priority) for entry, priority, _ in self.ordered())
+        write_updates(out, self.tables(), updates)
+
+    def write_cli(self, out):
+        """simple_switch_CLI < p4.cli. 쓰는 테이블은 먼저 비운다 (다시 적용해도 같은 결과)"""
+        for name, entries in self.entries.items():
+            if entries:
+                out.write(f"table_clear {name}\n")
+        for entry, _, priority in self.ordered():
+            out.write(entry.to_cli(priority) + "\n")
+
+
+def _stable_priorities(matches, old) -> dict:
+    """
+    matches (높은 것부터) 의 priority. old 의 값을 순서가 맞는 가장 긴 부분열만큼
+    그대로 쓰고 나머지는 사이에 나눠 넣는다. 빈 값이 모자라면 전부 새로 매긴다.
+    """
+    present = set(matches)
+    by_old = sorted((m for m in old if m in present), key=old.get, reverse=True)
+    moved = delta.reordered(by_old, matches)
+    priorities = {m: old[m] for m in by_old if m not in moved}
+    run = []  # 앞의 고정된 값과 다음 고정된 값 사이의 항목
+    hi = None
+    for match in matches + [None]:
+        if match is not None and match not in priorities:
+            run.append(match)
+            continue
+        lo = 0 if match is None else priorities[match]
+        if run and not _fill(priorities, run, hi, lo):
+            # 처음 배포와 같게 STEP 간격으로 (항목이 아주 많으면 좁힌다)
+            step = min(PRIORITY_STEP, PRIORITY_MAX // max(1, len(matches)))
+            return {m: (len(matches) - i) * step for i, m in enumerate(matches)}
+        run, hi = [], lo
+    return priorities
+
+
+def _fill(priorities, run, hi, lo) -> bool:
+    """run 을 hi 와 lo 사이 (둘 다 제외, hi 가 None 이면 맨 위) 에 넣는다"""
+    k = len(run)
+    if hi is None:
+        values = [lo + PRIORITY_STEP * (k - j) for j in range(k)]
+        if values[0] > PRIORITY_MAX:
+            return False
+    elif lo == 0 and hi - PRIORITY_STEP * k > 0:
+        values = [hi - PRIORITY_STEP * (j + 1) for j in range(k)]
+    elif hi - lo > k:
+        values = [hi - (hi - lo) * (j + 1) // (k + 1) for j in range(k)]
+    else:
+        return False
+    priorities.update(zip(run, values))
+    return True
+
+
+def load_priorities(state) -> dict:
+    """priority_state() 의 JSON → {테이블: {키: priority}} (키의 list 를 tuple 로)"""
+    return {
+        name: {
+            tuple(tuple(v) if isinstance(v, list) else v for v in match): priority
+            for match, priority in pairs
+        }
+        for name, pairs in state.items()
+    }
+
+
+def write_updates(out, tables, updates):
+    out.write("{\n")
+    out.write(f'"program": {json.dumps(PROGRAM)},\n')
+    out.write(f'"tables": {json.dumps(tables)},\n')
+    out.write('"updates": [')
+    sep = "\n"
+    for update in updates:
+        out.write(sep + json.dumps(update, separators=(",", ":")))
+        sep = ",\n"
+    out.write("\n]\n}\n")
+
+
+def diff_plans(before, after) -> list:
+    """
+    두 P4Plan 의 차이 → P4Runtime update 목록. 항목은 (테이블, 키) 로 맞춘다.
+      exact / lpm 테이블: DELETE → MODIFY → INSERT (먼저 비워야 용량을 넘지 않는다)
+      ternary (ACL): INSERT → MODIFY → DELETE (바꾸는 동안 패킷이 아래 규칙으로
+        떨어지지 않게). priority 가 바뀐 항목은 P4Runtime 에서 priority 가 항목을
+        가리키는 값이라 MODIFY 로 못 바꾸므로 새 priority 로 넣은 뒤 옛 것을 지운다.
+    action / 인자만 바뀐 항목은 MODIFY.
+    """
+
+    def keyed(plan):
+        return {
+            (entry.table.name, entry.match): (entry, priority)
+            for entry, priority, _ in plan.ordered()
+        }
+
+    old, new = keyed(before), keyed(after)
+    inserts = {False: [], True: []}  # ternary 여부 -> update 목록
+    modifies = {False: [], True: []}
+    deletes = {False: [], True: []}
+    for key, (entry, priority) in new.items():
+        ternary = entry.table.ternary
+        seen = old.get(key)
+        if seen is None:
+            inserts[ternary].append(entry.to_runtime(priority))
+        elif seen[1] != priority:
+            inserts[ternary].append(entry.to_runtime(priority))
+            deletes[ternary].append(seen[0].to_runtime(seen[1], DELETE))
+        elif (seen[0].action, seen[0].params) != (entry.action, entry.params):
+            modifies[ternary].append(entry.to_runtime(priority, MODIFY))
+    for key, (entry, priority) in old.items():
+        if key not in new:
+            deletes[entry.table.ternary].append(entry.to_runtime(priority, DELETE))
+    return (
+        inserts[True] + modifies[True] + deletes[True]
+        + deletes[False] + modifies[False] + inserts[False]
+    )
+
+
+def _members(addrs, groups):
+    # 그룹은 원소 그대로 (prefix 는 펼치지 않고 ternary 하나로)
+    out = []
+    for addr in addrs:
+        if type(addr) is ir.GroupRef:
+            group = groups.get(addr.name)
+            if group is not None:
+                out.extend(group.members)
+        else:
+            out.append(addr)
+    return out
+
+
+def plan_p4(passes, sizes=None, priorities=None) -> P4Plan:
+    """priorities: 지난 배포의 ternary priority (load_priorities), 없으면 처음부터"""
+    plan = P4Plan(sizes)
+    groups = passes.groups
+    for group in passes.acl.groups:
+        # 주소 집합은 가장 적은 prefix (value&&&mask) 로 덮는다
+        proto = (PROTOCOLS[group.protocol], 0xFF)
+        action = ACL_ACTIONS[group.action]
+        dsts = acl.ternary(_members(group.dsts, groups))
+        for src in acl.ternary(_members(group.srcs, groups)):
+            for dst in dsts:
+                plan.add("acl_table", (src, dst, proto), action)
+    # VLAN 범위와 "per host in" 은 항목 하나씩 (테이블에는 범위 키가 없다)
+    for model in passes.rest(lambda m: type(m) is ir.HostGroup, expand=True):
+        cls = type(model)
+        if cls is ir.Meter:
+            plan.add("meter_table", (model.host,), "set_rate", (model.rate_mbps,))
+        elif cls is ir.Qos:
+            plan.add("qos_table", (model.vlan,), "set_priority", (PRIORITY_HIGH,))
+        elif cls is ir.VlanCreate:
+            plan.add("vlan_table", (model.id,), "set_vlan")
+        elif cls is ir.VlanDelete:
+            # 프로그램 전체의 결과만 남긴다 (없는 항목 삭제는 bmv2 에서 에러)
+            plan.remove("vlan_table", (model.id,))
+        elif cls is ir.Connectivity:
+            plan.add("flow_table", (model.src, model.dst), "forward")
+        elif cls is ir.Monitor:
+            plan.add("monitor_table", (model.src, model.dst), "timestamp")
+        else:
+            plan.controller += 1
+    for model in passes.routes.models():
+        plen = 32 if model.plen is None else model.plen
+        plan.add("ipv4_lpm", ((model.net, plen),), "set_nhop", (model.next_hop,))
+    plan.assign_priorities(priorities)
+    return plan
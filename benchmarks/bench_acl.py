@@ -0,0 +1,78 @@
+# bench_acl.py
+#
+# ACL 최적화 pass: 생성한 코퍼스에서 규칙 수 before/after + 걸린 시간
+#   rules    : ACL 문장 수 (allow/block)
+#   dup/shad : 중복 / shadow 로 버린 규칙
+#   groups   : 최적화 후 규칙 수 (ipset / object-group 하나가 규칙 하나)
+#   ternary  : P4 ternary 항목 수 (주소 집합을 prefix 로 덮은 뒤)
+#   --check  : 임의의 패킷으로 원래 규칙과 최적화 결과의 첫 매치가 같은지 확인
+#
+#   python benchmarks/bench_acl.py [--sizes 1e3,1e4,1e5] [--mix realistic] [--check]
+
+from pathlib import Path
+import argparse
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import acl  # noqa: E402
+from compiler import compile_intent  # noqa: E402
+from corpus import MIXES, generate  # noqa: E402
+
+
+def first_match(rules, protocol, src, dst):
+    for action, proto, srcs, dsts in rules:
+        if proto == protocol and (None in srcs or src in srcs) and (None in dsts or dst in dsts):
+            return action
+    return None
+
+
+def check(models, plan, rng, probes=2000):
+    """원래 규칙 순서와 최적화 결과가 같은 판정을 내리는지 (틀린 패킷 수)"""
+    before = [(r.action, r.protocol, {r.src}, {r.dst}) for r in acl.rules_from(models)]
+    after = [(g.action, g.protocol, set(g.srcs), set(g.dsts)) for g in plan.groups]
+    addrs = [a for r in before for a in (next(iter(r[2])), next(iter(r[3]))) if a is not None]
+    if not addrs:
+        return 0
+    wrong = 0
+    for _ in range(probes):
+        packet = (rng.choice(["tcp", "icmp"]), rng.choice(addrs), rng.choice(addrs))
+        if first_match(before, *packet) != first_match(after, *packet):
+            wrong += 1
+    return wrong
+
+
+def main():
+    ap = argparse.ArgumentParser(description="ACL optimization before/after")
+    ap.add_argument("--sizes", default="1e3,1e4,1e5", help="코퍼스 문장 수 (쉼표 구분)")
+    ap.add_argument("--mix", choices=sorted(MIXES), default="realistic")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--check", action="store_true", help="첫 매치 동치 확인")
+    args = ap.parse_args()
+
+    print("n\trules\tdup\tshad\tgroups\tternary\treduction\tseconds"
+          + ("\twrong" if args.check else ""))
+    for n in (int(float(s)) for s in args.sizes.split(",")):
+        models = compile_intent("\n".join(generate(n, args.seed, mix=args.mix)))
+        t0 = time.perf_counter()
+        plan = acl.optimize_acl(models)
+        dt = time.perf_counter() - t0
+        ternary = sum(
+            len(acl.ternary(g.srcs)) * len(acl.ternary(g.dsts)) for g in plan.groups
+        )
+        stats = plan.stats()
+        before = stats["acl_rules"] or 1
+        line = (
+            f"{n}\t{stats['acl_rules']}\t{stats['duplicates']}\t{stats['shadowed']}\t"
+            f"{stats['acl_groups']}\t{ternary}\t"
+            f"{100 * (1 - stats['acl_groups'] / before):.1f}%\t{dt:.3f}"
+        )
+        if args.check:
+            line += f"\t{check(models, plan, random.Random(args.seed))}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
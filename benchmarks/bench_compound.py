@@ -0,0 +1,78 @@
+# bench_compound.py
+#
+# 범위 / 그룹 문장 vs 같은 내용을 문장 하나씩 풀어 쓴 프로그램:
+# 컴파일 + 설정 파일 (--config-dir) 시간, 최대 메모리, 출력 크기
+#
+#   python benchmarks/bench_compound.py [--vlans 4000] [--hosts 64]
+
+from pathlib import Path
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import compiler  # noqa: E402
+from ir import ip_str  # noqa: E402
+
+TARGETS = ["linux", "cisco", "p4"]
+
+
+def compact(vlans, hosts):
+    return [
+        f"create vlan 2-{vlans + 1}",
+        f"define group web as {', '.join(ip_str(0x0A000100 + i) for i in range(hosts))}",
+        f"define group db as {', '.join(ip_str(0x0A000200 + i) for i in range(hosts))}",
+        "allow tcp from @web to @db",
+        "limit bandwidth 10Mbps per host in @web",
+    ]
+
+
+def spelled(vlans, hosts):
+    lines = [f"create vlan {vid} name VLAN{vid:04d}" for vid in range(2, vlans + 2)]
+    lines.extend(
+        f"allow tcp from {ip_str(0x0A000100 + s)} to {ip_str(0x0A000200 + d)}"
+        for s in range(hosts)
+        for d in range(hosts)
+    )
+    lines.extend(
+        f"limit bandwidth 10Mbps for {ip_str(0x0A000100 + i)}" for i in range(hosts)
+    )
+    return lines
+
+
+def run(lines, out_dir):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    models = compiler.compile_intent("\n".join(lines), fast=True)
+    compiler.write_configs(models, out_dir, TARGETS)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    size = sum(os.path.getsize(p) for p in Path(out_dir).iterdir())
+    return len(models), elapsed, peak, size
+
+
+def main():
+    ap = argparse.ArgumentParser(description="compound statements vs spelled-out program")
+    ap.add_argument("--vlans", type=int, default=4000)
+    ap.add_argument("--hosts", type=int, default=64, help="그룹마다 호스트 수")
+    args = ap.parse_args()
+
+    compiler.compile_intent("\n".join(compact(2, 2)))  # 파서 로드는 재지 않는다
+    print("program\tlines\tmodels\tseconds\tpeak_MB\toutput_KB")
+    for name, build in (("compound", compact), ("spelled", spelled)):
+        lines = build(args.vlans, args.hosts)
+        with tempfile.TemporaryDirectory() as tmp:
+            count, elapsed, peak, size = run(lines, tmp)
+        print(
+            f"{name}\t{len(lines)}\t{count}\t{elapsed:.3f}"
+            f"\t{peak / 2**20:.1f}\t{size / 1024:.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# bench_fastpath.py
+#
+# fastpath 인식기를 lark (inline) 경로와 줄 단위로 대조하고 속도를 비교
+#
+#   python benchmarks/bench_fastpath.py [-n 200000] [--noise 0.05]
+
+from pathlib import Path
+import argparse
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lark import UnexpectedInput  # noqa: E402
+
+import compiler  # noqa: E402
+from corpus import generate  # noqa: E402
+from fastpath import FastRecognizer  # noqa: E402
+
+
+def lark_line(parser, line):
+    try:
+        return parser.parse(line)
+    except UnexpectedInput:
+        return None
+
+
+def main():
+    ap = argparse.ArgumentParser(description="fastpath vs lark")
+    ap.add_argument("-n", type=int, default=200_000, help="문장 수")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument(
+        "--noise", type=float, default=0.05, help="변형(대부분 에러) 줄 비율"
+    )
+    args = ap.parse_args()
+
+    lines = list(generate(args.n, args.seed, args.noise, mix="uniform"))
+    parser = compiler.get_parser(inline=True)
+    fast = FastRecognizer(compiler.IntentToJSON())
+
+    # 1) 검증: fastpath 가 인식한 줄은 lark 결과와 같아야 한다
+    hits = 0
+    for line in lines:
+        got = fast.recognize(line)
+        if got is None:
+            continue
+        hits += 1
+        want = lark_line(parser, line)
+        if got != want:
+            sys.exit(f"MISMATCH: {line!r}\n  fast: {got}\n  lark: {want}")
+    print(f"verified\t{args.n} lines, fastpath hit {hits} ({hits / args.n:.1%})")
+
+    # 2) 속도: lark 만 vs fastpath + lark fallback
+    t0 = time.perf_counter()
+    for line in lines:
+        lark_line(parser, line)
+    t_lark = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for line in lines:
+        if fast.recognize(line) is None:
+            lark_line(parser, line)
+    t_fast = time.perf_counter() - t0
+
+    print("path\tseconds\tlines/s")
+    print(f"lark\t{t_lark:.3f}\t{args.n / t_lark:,.0f}")
+    print(f"fastpath\t{t_fast:.3f}\t{args.n / t_fast:,.0f}")
+    print(f"speedup\t{t_lark / t_fast:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
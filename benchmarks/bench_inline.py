@@ -0,0 +1,57 @@
+# bench_inline.py
+#
+# Tree 경로 (parse → Tree → IntentToJSON.transform) 와
+# inline 경로 (LALR 리듀스 콜백에서 바로 model 생성) 의 문장당 처리량 비교
+#
+#   python benchmarks/bench_inline.py [-n 100000] [-r 3]
+
+from pathlib import Path
+import argparse
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import compiler  # noqa: E402
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description="tree vs inline transform")
+    ap.add_argument("-n", type=int, default=100_000, help="문장 수")
+    ap.add_argument("-r", type=int, default=3, help="반복 횟수 (최솟값 사용)")
+    args = ap.parse_args()
+
+    intents = (compiler.INTENTS * (args.n // len(compiler.INTENTS) + 1))[: args.n]
+    code = "\n".join(intents)
+
+    tree_parser = compiler.get_parser(inline=False)
+    inline_parser = compiler.get_parser(inline=True)
+
+    def tree_path():
+        return compiler.IntentToJSON().transform(tree_parser.parse(code))
+
+    def inline_path():
+        return inline_parser.parse(code)
+
+    assert tree_path() == inline_path(), "inline 결과가 Tree 경로와 다름"
+
+    print("path\tseconds\tstmts/s\tus/stmt")
+    results = {}
+    for name, fn in (("tree", tree_path), ("inline", inline_path)):
+        sec = best_of(fn, args.r)
+        results[name] = sec
+        print(f"{name}\t{sec:.3f}\t{args.n / sec:,.0f}\t{sec / args.n * 1e6:.2f}")
+    print(f"speedup\t{results['tree'] / results['inline']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
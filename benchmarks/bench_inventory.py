@@ -0,0 +1,86 @@
+# bench_inventory.py
+#
+# 호스트 인벤토리: CSV 를 dict 로 읽기 vs mmap 인덱스
+#   build   : CSV → 인덱스 파일 생성 (한 번)
+#   open    : 매 실행마다 드는 준비 시간 (dict 는 CSV 전체 읽기)
+#   lookup  : 랜덤 이름 조회 (있는 이름 90% + 없는 이름 10%), lru 캐시 없이
+#   open MB : 준비 직후 RSS 증가분 (mmap 은 조회한 페이지만 올라온다)
+#
+#   python benchmarks/bench_inventory.py [-n 1000000] [--lookups 200000]
+
+from pathlib import Path
+import argparse
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from inventory import DictInventory, build_index, load_csv, open_inventory  # noqa: E402
+
+
+def write_csv(path, n, rng):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("hostname,ip\n")
+        for i in range(n):
+            ip = rng.getrandbits(24)
+            f.write(f"host{i:07d},10.{ip >> 16}.{(ip >> 8) & 255}.{ip & 255}\n")
+
+
+def rss_mb():
+    # 현재 RSS (linux), 없으면 peak RSS
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def timed(fn):
+    before = rss_mb()
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0, rss_mb() - before
+
+
+def main():
+    ap = argparse.ArgumentParser(description="host inventory dict vs index")
+    ap.add_argument("-n", type=int, default=1_000_000, help="인벤토리 항목 수")
+    ap.add_argument("--lookups", type=int, default=200_000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    names = [
+        f"host{rng.randrange(args.n):07d}" if rng.random() < 0.9 else f"nohost{i}"
+        for i in range(args.lookups)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "hosts.csv"
+        idx_path = Path(tmp) / "hosts.idx"
+        write_csv(csv_path, args.n, rng)
+
+        _, t_build, _ = timed(lambda: build_index(load_csv(csv_path), idx_path))
+        print(f"build\t{args.n:,} hosts\t{t_build:.2f}s\t"
+              f"{idx_path.stat().st_size / 2**20:.1f} MB on disk")
+
+        print("inventory\topen s\topen MB\tlookups/s")
+        for label, load in [
+            ("mmap index", lambda: open_inventory(idx_path)),
+            ("dict(csv)", lambda: DictInventory(load_csv(csv_path))),
+        ]:
+            inv, t_open, mem = timed(load)
+            get = inv.get
+            t0 = time.perf_counter()
+            hits = sum(1 for name in names if get(name) is not None)
+            t_lookup = time.perf_counter() - t0
+            print(f"{label}\t{t_open:.4f}\t{mem:.1f}\t"
+                  f"{args.lookups / t_lookup:,.0f}\t(hits {hits})")
+            inv.close()
+
+
+if __name__ == "__main__":
+    main()
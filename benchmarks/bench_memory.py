@@ -0,0 +1,58 @@
+# bench_memory.py
+#
+# semantic model 메모리 비교: 문장마다 dict (예전 방식) vs ir __slots__ 객체
+#
+#   python benchmarks/bench_memory.py [-n 1000000]
+
+from pathlib import Path
+import argparse
+import gc
+import sys
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import compiler  # noqa: E402
+from corpus import generate  # noqa: E402
+from fastpath import FastRecognizer  # noqa: E402
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    models = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del models
+    gc.collect()
+    return size
+
+
+def main():
+    ap = argparse.ArgumentParser(description="dict vs slots model memory")
+    ap.add_argument("-n", type=int, default=1_000_000, help="문장 수")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    lines = list(generate(args.n, args.seed))
+    fast = FastRecognizer(compiler.IntentToJSON())
+    parser = compiler.get_parser(inline=True)
+
+    def models():
+        for line in lines:
+            yield from fast.recognize(line) or parser.parse(line)
+
+    sizes = {
+        "dict": measure(lambda: [m.to_dict() for m in models()]),
+        "slots": measure(lambda: list(models())),
+    }
+
+    per_million = 1_000_000 / args.n
+    print("model\tMB/1M stmts\tbytes/stmt")
+    for name, size in sizes.items():
+        print(f"{name}\t{size * per_million / 2**20:.1f}\t{size / args.n:.1f}")
+    print(f"ratio\t{sizes['dict'] / sizes['slots']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
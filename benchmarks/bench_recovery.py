@@ -0,0 +1,112 @@
+# bench_recovery.py
+#
+# 프로그램 전체 에러 복구 (compile_intent(..., diagnostics=[])) 를 줄 단위 복구
+# (iter_compile, --stream -k) 와 대조하고 속도를 비교
+#
+#   python benchmarks/bench_recovery.py [-n 100000] [--noise 0.1]
+#
+# 검증
+#   1) CASES: 에러 줄 바로 앞 문장이 host / IDENT / NUMBER 로 끝나는 경우 (LALR 이
+#      아직 리듀스하지 않은 문장을 버리던 것) 등 고정된 프로그램
+#   2) 변형 코퍼스: 혼자서 파싱되는 줄은 (앞 줄도 혼자서 파싱되면) 전체 복구에서도
+#      살아남아 같은 model 이 순서대로 나와야 한다. 앞 줄이 끝나지 않은 문장이면
+#      문장이 줄을 넘어 이어지므로 (다음 줄 첫 단어를 IDENT 로 읽는다) 대조하지 않는다.
+
+from pathlib import Path
+import argparse
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lark import UnexpectedInput  # noqa: E402
+
+import compiler  # noqa: E402
+from corpus import generate  # noqa: E402
+
+# (프로그램, 남아야 하는 줄, 에러 줄)
+CASES = [
+    ("allow tcp from A to B\nfoo\nblock icmp", [1, 3], [2]),
+    ("limit bandwidth 10Mbps for hostA\nbogus\nblock icmp", [1, 3], [2]),
+    ("create vlan 20 name eng\nfoo bar\ndelete vlan 20", [1, 3], [2]),
+    ("delete vlan 20\nfoo\ncreate vlan 10-20\n9", [1, 3], [2, 4]),
+    ("set route 10.0.0.0/24 via 192.168.1.1\n@@\nbackup configuration now", [1, 3], [2]),
+    ("define group web as A, B\nweb\nallow tcp from @web to B", [1, 3], [2]),
+    # group / each / per 는 호스트 이름으로 쓸 수 있다 (그룹은 @이름)
+    ("allow tcp from group to each\nlimit bandwidth 10Mbps for per", [1, 2], []),
+    # 문법은 맞지만 VLAN 범위가 틀린 문장도 버리고 에러 (같은 줄은 한 번만)
+    ("create vlan 20-10 name eng\nblock icmp\ndelete vlan 0-5", [2], [1, 3]),
+    ("create vlan 5000-5001 name 9\nblock icmp", [2], [1]),
+    ("delete vlan\nblock icmp", [2], [2]),  # "block" 에서 알게 된다
+    ("allow tcp from A to B junk\nblock icmp", [2], [1]),
+]
+
+
+def alone(parser, line):
+    try:
+        return parser.parse(line)
+    except UnexpectedInput:
+        return None
+
+
+def check_cases(parser):
+    for code, kept, bad in CASES:
+        diagnostics = []
+        models = compiler.compile_intent(code, diagnostics=diagnostics)
+        lines = code.split("\n")
+        want = [m for no in kept for m in alone(parser, lines[no - 1])]
+        got_bad = [d.line for d in diagnostics]
+        if models != want or got_bad != bad:
+            sys.exit(
+                f"MISMATCH: {code!r}\n  models: {models}\n  want: {want}\n"
+                f"  errors on {got_bad}, want {bad}"
+            )
+    print(f"verified\t{len(CASES)} cases")
+
+
+def check_corpus(parser, lines):
+    diagnostics = []
+    models = compiler.compile_intent("\n".join(lines), diagnostics=diagnostics)
+    # 대조할 줄의 model 이 전체 결과에 순서대로 들어 있는지 (사이의 줄은 건너뛴다)
+    it = iter(models)
+    prev_ok = True
+    checked = 0
+    for no, line in enumerate(lines, start=1):
+        want = alone(parser, line)
+        if want is not None and prev_ok:
+            checked += 1
+            if not all(any(m == w for m in it) for w in want):
+                sys.exit(f"MISSING line {no}: {line!r} -> {want}")
+        prev_ok = want is not None or not line.strip()
+    print(f"verified\t{len(lines)} lines, {checked} compared, {len(diagnostics)} errors")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="whole-program vs line-at-a-time recovery")
+    ap.add_argument("-n", type=int, default=100_000, help="문장 수")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--noise", type=float, default=0.1, help="변형(대부분 에러) 줄 비율")
+    args = ap.parse_args()
+
+    parser = compiler.get_parser(inline=True)
+    check_cases(parser)
+    lines = list(generate(args.n, args.seed, args.noise))
+    check_corpus(parser, lines)
+
+    code = "\n".join(lines)
+    t0 = time.perf_counter()
+    compiler.compile_intent(code, diagnostics=[])
+    t_whole = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in compiler.iter_compile(lines, diagnostics=[]):
+        pass
+    t_line = time.perf_counter() - t0
+
+    print("path\tseconds\tlines/s")
+    print(f"whole\t{t_whole:.3f}\t{args.n / t_whole:,.0f}")
+    print(f"line\t{t_line:.3f}\t{args.n / t_line:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
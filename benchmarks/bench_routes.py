@@ -0,0 +1,102 @@
+# bench_routes.py
+#
+# route 합치기 pass: 규칙 수 before/after + 걸린 시간 (최대 1M routes)
+#
+# 파싱 시간을 빼고 pass 만 재기 위해 Route model 을 직접 만든다.
+# 주소 체계는 사이트 몇 개에 /16 을 나눠 주고, 그 안의 서브넷을 순서대로
+# 할당한 것처럼 (인접한 서브넷이 같은 next hop 으로 가는 경우가 많다).
+# 일부는 중복, 일부는 같은 prefix 다른 next hop (충돌) 으로 섞는다.
+#
+#   python benchmarks/bench_routes.py [--sizes 1e4,1e5,1e6] [--check]
+
+from pathlib import Path
+import argparse
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ir  # noqa: E402
+from routes import aggregate_routes  # noqa: E402
+
+
+def generate(n, rng, sites=256, hops=8):
+    """n 개의 Route model (seed 고정)"""
+    gateways = [(192 << 24) | (168 << 16) | (i << 8) | 1 for i in range(hops)]
+    cursor = {}  # site → 다음에 할당할 주소
+    models = []
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.03 and models:
+            models.append(rng.choice(models))  # 중복
+            continue
+        if r < 0.04 and models:
+            m = rng.choice(models)
+            models.append(ir.Route(m.net, m.plen, rng.choice(gateways)))  # 충돌 가능
+            continue
+        site = rng.randrange(sites)
+        plen = rng.choice([22, 23, 24, 24, 24, 25, 26, 27, 28, 30, 32])
+        size = 1 << (32 - plen)
+        base = (10 << 24) | (site << 16)
+        start = cursor.get(site, 0)
+        start = (start + size - 1) & ~(size - 1)  # 정렬
+        if start + size > 1 << 16:
+            start = 0  # 다 썼으면 처음부터 (겹치는 prefix)
+        cursor[site] = start + size
+        hop = gateways[site % hops] if rng.random() < 0.8 else rng.choice(gateways)
+        models.append(ir.Route(base + start, plen, hop))
+    return models
+
+
+def lpm(table, addr):
+    """(net, plen, hop) 목록에서 longest-prefix match (검증용, plen 별 dict)"""
+    for plen in range(32, -1, -1):
+        hop = table[plen].get(addr & ir.netmask(plen))
+        if hop is not None:
+            return hop
+    return None
+
+
+def by_len(triples):
+    table = [{} for _ in range(33)]
+    for net, plen, hop in triples:
+        table[plen].setdefault(net & ir.netmask(plen), hop)
+    return table
+
+
+def main():
+    ap = argparse.ArgumentParser(description="route aggregation before/after")
+    ap.add_argument("--sizes", default="1e4,1e5,1e6", help="route 수 (쉼표 구분)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--check", action="store_true", help="임의 주소로 LPM 결과 비교")
+    args = ap.parse_args()
+
+    print("n\tdup\tconflict\tmerged\tcovered\tafter\treduction\tseconds"
+          + ("\twrong" if args.check else ""))
+    for n in (int(float(s)) for s in args.sizes.split(",")):
+        rng = random.Random(args.seed)
+        models = generate(n, rng)
+        t0 = time.perf_counter()
+        plan = aggregate_routes(models)
+        dt = time.perf_counter() - t0
+        stats = plan.stats()
+        line = (
+            f"{n}\t{stats['duplicates']}\t{stats['conflicts']}\t{stats['merged']}\t"
+            f"{stats['covered']}\t{stats['routes_after']}\t"
+            f"{100 * (1 - stats['routes_after'] / n):.1f}%\t{dt:.2f}"
+        )
+        if args.check:
+            before = by_len((m.net, m.plen, m.next_hop) for m in models)
+            after = by_len(plan.routes)
+            wrong = 0
+            for _ in range(100_000):
+                addr = (10 << 24) | rng.getrandbits(22)
+                if lpm(before, addr) != lpm(after, addr):
+                    wrong += 1
+            line += f"\t{wrong}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# bench_semantics.py
+#
+# 의미 검사 (semantics.analyze, 색인) vs 문장 쌍을 모두 비교하는 검사:
+# 문장 수를 늘려 가며 시간. 쌍 비교는 --pairwise-max 문장까지만 잰다.
+#
+#   python benchmarks/bench_semantics.py [--sizes 1000,10000,100000]
+
+from pathlib import Path
+import argparse
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import compiler  # noqa: E402
+import ir  # noqa: E402
+import semantics  # noqa: E402
+from corpus import generate  # noqa: E402
+
+
+def _covers(outer, inner):
+    if isinstance(outer, str) or isinstance(inner, str):
+        return outer == semantics.ANY or outer == inner
+    net, plen = outer
+    return plen <= inner[1] and inner[0] & ir.netmask(plen) == net
+
+
+def pairwise(models):
+    """같은 검사 (중복, VLAN 모순, ACL 덮임, route 겹침) 를 앞 문장 전부와 비교"""
+    found = 0
+    for i, model in enumerate(models):
+        cls = type(model)
+        for prev in models[:i]:
+            if prev == model:
+                found += 1
+                break
+            if type(prev) is not cls:
+                continue
+            if cls is ir.VlanDelete and prev.id == model.id:
+                found += 1
+                break
+            if cls is ir.Allow and _covers(
+                semantics.addr_key(prev.src), semantics.addr_key(model.src)
+            ) and _covers(semantics.addr_key(prev.dst), semantics.addr_key(model.dst)):
+                found += 1
+                break
+            if cls is ir.Route:
+                outer = semantics.addr_key((prev.net, prev.plen or 32))
+                inner = semantics.addr_key((model.net, model.plen or 32))
+                if not isinstance(outer, str) and not isinstance(inner, str):
+                    if _covers(outer, inner) or _covers(inner, outer):
+                        found += 1
+                        break
+    return found
+
+
+def best_of(fn, models, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(models)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="indexed vs pairwise semantic checks")
+    ap.add_argument("--sizes", default="1000,10000,100000")
+    ap.add_argument("--pairwise-max", type=int, default=10000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print("stmts\tindexed_s\tdiagnostics\tpairwise_s\tfindings")
+    for n in map(int, args.sizes.split(",")):
+        models = compiler.compile_intent("\n".join(generate(n, seed=1)), fast=True)
+        indexed, found = best_of(semantics.analyze, models, args.repeat)
+        line = f"{n}\t{indexed:.3f}\t{len(found)}"
+        if n <= args.pairwise_max:
+            slow, count = best_of(pairwise, models, 1)
+            line += f"\t{slow:.3f}\t{count}"
+        else:
+            line += "\t-\t-"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# bench_server.py
+#
+# server.py (warm 데몬) 에 작은 요청을 동시에 보내 latency / 처리량 측정,
+# 같은 요청을 매번 CLI (compiler.py) 로 돌리는 경우와 비교
+#
+#   python benchmarks/bench_server.py [-c 32] [-r 200] [-k 3] [--window-ms 0]
+
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from corpus import generate  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def start_server(window_ms, memo):
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            str(ROOT / "server.py"),
+            "--port",
+            "0",
+            "--batch-window-ms",
+            str(window_ms),
+            "--memo",
+            str(memo),
+        ],
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    line = proc.stderr.readline()  # "... listening on http://127.0.0.1:PORT"
+    if "listening" not in line:
+        proc.kill()
+        sys.exit(f"server did not start: {line}")
+    return proc, int(line.rsplit(":", 1)[1])
+
+
+async def request(reader, writer, method, path, body=b""):
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: x\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+    return json.loads(await reader.readexactly(length))
+
+
+async def client(port, bodies, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for body in bodies:
+        t0 = time.perf_counter()
+        await request(reader, writer, "POST", "/compile", body)
+        latencies.append(time.perf_counter() - t0)
+    writer.close()
+
+
+async def run(port, requests):
+    latencies = []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(port, bodies, latencies) for bodies in requests))
+    wall = time.perf_counter() - t0
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    stats = await request(reader, writer, "GET", "/stats")
+    writer.close()
+    return latencies, wall, stats
+
+
+def cli_once(code) -> float:
+    t0 = time.perf_counter()
+    subprocess.run(
+        [sys.executable, str(ROOT / "compiler.py"), "-"],
+        input=code,
+        text=True,
+        stdout=subprocess.DEVNULL,
+        check=False,
+    )
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="compile daemon latency/throughput")
+    ap.add_argument("-c", type=int, default=32, help="동시 연결 수")
+    ap.add_argument("-r", type=int, default=200, help="연결마다 요청 수")
+    ap.add_argument("-k", type=int, default=3, help="요청마다 문장 수")
+    ap.add_argument("--window-ms", type=float, default=0.0)
+    ap.add_argument("--memo", type=int, default=65536, help="0 이면 줄 단위 LRU 끔")
+    ap.add_argument("--cli", type=int, default=5, help="비교용 CLI 실행 횟수 (0 이면 생략)")
+    args = ap.parse_args()
+
+    pool = list(generate(5000, seed=1))
+    rng = random.Random(1)
+    requests = [
+        [
+            json.dumps({"code": "\n".join(rng.sample(pool, args.k))}).encode()
+            for _ in range(args.r)
+        ]
+        for _ in range(args.c)
+    ]
+
+    proc, port = start_server(args.window_ms, args.memo)
+    try:
+        latencies, wall, stats = asyncio.run(run(port, requests))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    latencies.sort()
+    total = len(latencies)
+    print("mode\trequests\treq_per_s\tp50_ms\tp99_ms\tavg_batch\tmemo_hits")
+    print(
+        f"server\t{total}\t{total / wall:.0f}"
+        f"\t{latencies[total // 2] * 1000:.3f}"
+        f"\t{latencies[min(total - 1, int(total * 0.99))] * 1000:.3f}"
+        f"\t{stats['avg_batch']}\t{stats['memo_hits']}"
+    )
+    if args.cli:
+        code = json.loads(requests[0][0])["code"]
+        times = [cli_once(code) for _ in range(args.cli)]
+        print(
+            f"cli\t{args.cli}\t{1 / statistics.mean(times):.1f}"
+            f"\t{statistics.median(times) * 1000:.1f}\t-\t-\t-"
+        )
+
+
+if __name__ == "__main__":
+    main()
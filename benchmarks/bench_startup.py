@@ -0,0 +1,59 @@
+# bench_startup.py
+#
+# 파서 캐시 전/후 CLI 시작 시간 측정
+#   cold: 빈 캐시 디렉터리 (LALR 테이블 생성 + 캐시 저장)
+#   warm: 이전 실행이 만든 캐시를 읽기만 함
+#
+#   python benchmarks/bench_startup.py [-n 10]
+
+from pathlib import Path
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = {
+    "compiler.py": ROOT / "compiler.py",
+    "dja/main.py": ROOT / "dja" / "main.py",
+}
+
+
+def run_once(script: Path, cache: str) -> float:
+    env = dict(os.environ, INTENTLANG_CACHE_DIR=cache)
+    t0 = time.perf_counter()
+    subprocess.run(
+        [sys.executable, str(script)],
+        env=env,
+        cwd=tempfile.gettempdir(),  # 다른 디렉터리에서 실행해도 동작해야 함
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+    return time.perf_counter() - t0
+
+
+def bench(script: Path, n: int):
+    cold, warm = [], []
+    for _ in range(n):
+        with tempfile.TemporaryDirectory() as cache:
+            cold.append(run_once(script, cache))
+            warm.append(run_once(script, cache))
+    return statistics.median(cold), statistics.median(warm)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="cold/warm startup benchmark")
+    ap.add_argument("-n", type=int, default=10, help="반복 횟수")
+    args = ap.parse_args()
+
+    print("script\tcold_ms\twarm_ms\tspeedup")
+    for name, script in SCRIPTS.items():
+        cold, warm = bench(script, args.n)
+        print(f"{name}\t{cold * 1000:.1f}\t{warm * 1000:.1f}\t{cold / warm:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# bench_writers.py
+#
+# 표 쓰기 비교: 행마다 print() (예전 방식) vs writers.TsvWriter / JsonlWriter,
+# 그리고 ThreadedWriter 로 감싼 경우. 출력은 임시 파일.
+#
+#   python benchmarks/bench_writers.py [-n 200000]
+
+from pathlib import Path
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import compiler  # noqa: E402
+import writers  # noqa: E402
+from corpus import generate  # noqa: E402
+
+
+def print_rows(path, header, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        print("\t".join(header), file=f)
+        for no, intent, outputs in rows:
+            print(compiler.join_row(no, intent, outputs), file=f)
+
+
+def writer_rows(fmt, thread):
+    def run(path, header, rows):
+        names = [b.name for b in compiler.get_emitter().backends]
+        with writers.open_output(path) as f, writers.threaded(f, thread) as out:
+            writer = writers.table_writer(fmt, out, header, names)
+            writer.begin()
+            for no, intent, outputs in rows:
+                writer.row(no, intent, outputs)
+            writer.close()
+
+    return run
+
+
+CASES = {
+    "print": print_rows,
+    "tsv": writer_rows("tsv", False),
+    "tsv+thread": writer_rows("tsv", True),
+    "jsonl": writer_rows("jsonl", False),
+    "jsonl+thread": writer_rows("jsonl", True),
+}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="table writer benchmark")
+    ap.add_argument("-n", type=int, default=200_000, help="문장 수")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    code = "\n".join(generate(args.n, seed=1))
+    models = compiler.compile_intent(code, fast=True)
+    intents = compiler.source_lines(code)
+    emitted = compiler.get_emitter().emit_all(models)
+    rows = [(i, intent, out) for i, (intent, out) in enumerate(zip(intents, emitted), 1)]
+    header = compiler.table_header()
+
+    print("writer\tbest_s\trows_per_s\tMB")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "out"
+        for name, run in CASES.items():
+            best = float("inf")
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                run(path, header, rows)
+                best = min(best, time.perf_counter() - t0)
+            size = os.path.getsize(path) / 2**20
+            print(f"{name}\t{best:.3f}\t{len(rows) / best:.0f}\t{size:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# corpus.py
+#
+# 벤치마크/검증용 IntentLang 문장 생성기 (seed 고정)
+#
+#   python benchmarks/corpus.py -n 1000000 --seed 1 -o big.intent
+#   python benchmarks/corpus.py -n 1000 --mix uniform --noise 0.1
+#
+# mix
+#   realistic: 실제 사이트 덤프 비율에 가깝게 (ACL/route 위주, 주소는 사이트
+#              서브넷 안에서, route 는 정렬된 prefix + 소수의 next hop)
+#   uniform  : 열 가지 문장을 같은 비율로, 슬롯 값은 완전 랜덤
+
+import argparse
+import random
+import sys
+
+HOSTS = ["A", "B", "hostA", "hostB"]
+
+# 슬롯에 들어가도 lark 가 받아들이는 애매한 값들 (키워드와 같은 이름 등)
+ODD_IDENTS = ["to", "from", "vlan", "Mbps", "and", "name", "_x", "h0st_9"]
+
+KINDS = [
+    "allow",
+    "block",
+    "limit",
+    "qos",
+    "connectivity",
+    "create_vlan",
+    "delete_vlan",
+    "route",
+    "monitor",
+    "backup",
+]
+
+MIXES = {
+    "uniform": {kind: 1 for kind in KINDS},
+    "realistic": {
+        "allow": 35,
+        "block": 1,
+        "limit": 8,
+        "qos": 4,
+        "connectivity": 10,
+        "create_vlan": 8,
+        "delete_vlan": 2,
+        "route": 25,
+        "monitor": 6,
+        "backup": 1,
+    },
+}
+
+
+# -----------------------------
+# uniform: 완전 랜덤 슬롯
+# -----------------------------
+def _ip(rng):
+    return ".".join(str(rng.randrange(256)) for _ in range(4))
+
+
+def _host(rng):
+    r = rng.random()
+    if r < 0.4:
+        return rng.choice(HOSTS)
+    if r < 0.8:
+        return _ip(rng)
+    return f"h{rng.randrange(100000)}"
+
+
+UNIFORM = {
+    "allow": lambda r: f"allow tcp from {_host(r)} to {_host(r)}",
+    "block": lambda r: "block icmp",
+    "limit": lambda r: f"limit bandwidth {r.randrange(1, 10000)}Mbps for {_host(r)}",
+    "qos": lambda r: f"assign qos high to vlan {r.randrange(1, 4095)}",
+    "connectivity": lambda r: f"ensure connectivity between {_host(r)} and {_host(r)}",
+    "create_vlan": lambda r: (
+        f"create vlan {r.randrange(1, 4095)} name VLAN{r.randrange(1000)}"
+    ),
+    "delete_vlan": lambda r: f"delete vlan {r.randrange(1, 4095)}",
+    "route": lambda r: f"set route {_ip(r)}/{r.randrange(8, 33)} via {_ip(r)}",
+    "monitor": lambda r: f"monitor latency between {_host(r)} and {_host(r)}",
+    "backup": lambda r: "backup configuration now",
+}
+
+
+# -----------------------------
+# realistic: 사이트 하나 분량의 주소 체계
+# -----------------------------
+class _Site:
+    RATES = [10, 20, 50, 100, 200, 500, 1000]
+    VLAN_NAMES = ["Engineering", "Sales", "Voice", "Guest", "Mgmt", "Storage", "Lab"]
+
+    def __init__(self, rng, n):
+        self.rng = rng
+        # 규모에 맞춰 호스트/랙/VLAN 수를 키운다
+        self.racks = max(4, min(250, n // 2000))
+        self.vlans = rng.sample(range(2, 4095), k=min(4000, max(16, n // 500)))
+        self.gateways = [f"192.168.{i}.1" for i in range(max(2, min(64, n // 50000)))]
+
+    def host(self):
+        rng = self.rng
+        r = rng.random()
+        if r < 0.05:
+            return rng.choice(HOSTS)
+        if r < 0.25:
+            return f"web{rng.randrange(1, 100):02d}"
+        return f"10.{rng.randrange(self.racks)}.{rng.randrange(1, 255)}.{rng.randrange(1, 255)}"
+
+    def prefix(self):
+        rng = self.rng
+        plen = rng.choice([16, 20, 22, 23, 24, 24, 24, 25, 26, 28, 32])
+        addr = (10 << 24) | rng.getrandbits(24)
+        addr &= ~((1 << (32 - plen)) - 1) & 0xFFFFFFFF
+        return f"{addr >> 24}.{(addr >> 16) & 255}.{(addr >> 8) & 255}.{addr & 255}/{plen}"
+
+    def line(self, kind):
+        rng = self.rng
+        if kind == "allow":
+            return f"allow tcp from {self.host()} to {self.host()}"
+        if kind == "block":
+            return "block icmp"
+        if kind == "limit":
+            return f"limit bandwidth {rng.choice(self.RATES)}Mbps for {self.host()}"
+        if kind == "qos":
+            return f"assign qos high to vlan {rng.choice(self.vlans)}"
+        if kind == "connectivity":
+            return f"ensure connectivity between {self.host()} and {self.host()}"
+        if kind == "create_vlan":
+            vid = rng.choice(self.vlans)
+            return f"create vlan {vid} name {rng.choice(self.VLAN_NAMES)}{vid}"
+        if kind == "delete_vlan":
+            return f"delete vlan {rng.choice(self.vlans)}"
+        if kind == "route":
+            return f"set route {self.prefix()} via {rng.choice(self.gateways)}"
+        if kind == "monitor":
+            return f"monitor latency between {self.host()} and {self.host()}"
+        return "backup configuration now"
+
+
+def _mangle(rng, line):
+    """fastpath 경계 검증용 변형 (공백, 붙여쓰기, 오타, 이상한 슬롯 값)"""
+    words = line.split(" ")
+    r = rng.random()
+    if r < 0.2:
+        return "\t".join(words)
+    if r < 0.3:
+        return "  ".join(words)
+    if r < 0.4 and len(words) > 2:
+        i = rng.randrange(len(words) - 1)
+        return " ".join(words[:i] + [words[i] + words[i + 1]] + words[i + 2:])
+    if r < 0.5:
+        return " ".join(words[:-1])
+    if r < 0.6:
+        i = rng.randrange(len(words))
+        return " ".join(words[:i] + [words[i].upper()] + words[i + 1:])
+    if r < 0.7:
+        return line.replace("Mbps", " Mbps").replace("vlan ", "vlan 0")
+    if r < 0.85:
+        return " ".join(w if rng.random() < 0.7 else rng.choice(ODD_IDENTS)
+                        for w in words)
+    return line + " " + rng.choice(["now", "x", "1.2.3.4", "@"])
+
+
+def generate(n: int, seed: int = 0, noise: float = 0.0, mix: str = "realistic"):
+    """
+    n 개의 문장을 만드는 generator (메모리 사용량은 n 과 무관).
+    noise 비율만큼은 _mangle() 로 변형한 줄 (대부분 문법 에러)
+    """
+    rng = random.Random(seed)
+    weights = MIXES[mix]
+    kinds = list(weights)
+    cum = []
+    total = 0
+    for kind in kinds:
+        total += weights[kind]
+        cum.append(total)
+
+    if mix == "uniform":
+        make = lambda kind: UNIFORM[kind](rng)  # noqa: E731
+    else:
+        make = _Site(rng, n).line
+
+    for _ in range(n):
+        kind = rng.choices(kinds, cum_weights=cum)[0]
+        line = make(kind)
+        if noise and rng.random() < noise:
+            line = _mangle(rng, line)
+        yield line
+
+
+def write_corpus(path, n, seed=0, noise=0.0, mix="realistic"):
+    out = sys.stdout if path in (None, "-") else open(path, "w", encoding="utf-8")
+    try:
+        for line in generate(n, seed, noise, mix):
+            out.write(line)
+            out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="IntentLang corpus generator")
+    ap.add_argument("-n", type=int, default=1000, help="문장 수 (10^3 ~ 10^7)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--noise", type=float, default=0.0, help="변형 줄 비율")
+    ap.add_argument("--mix", choices=sorted(MIXES), default="realistic")
+    ap.add_argument("-o", "--output", help="출력 파일 (없으면 stdout)")
+    args = ap.parse_args()
+    write_corpus(args.output, args.n, args.seed, args.noise, args.mix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# run_bench.py
+#
+# 단계별 벤치마크: compiler.py / dja/main.py 를 같은 코퍼스로 측정해서 JSON 으로 저장
+#
+#   python benchmarks/run_bench.py                         # 10^3, 10^4, 10^5 줄
+#   python benchmarks/run_bench.py --sizes 1e3,1e6 -o new.json
+#   python benchmarks/run_bench.py --compare old.json new.json
+#
+# 단계
+#   grammar_cold / grammar_warm : 빈 캐시에서 파서 생성 / 캐시에서 읽기
+#   parse, transform            : 프로그램 전체를 트리로 파싱 / IntentToJSON
+#   parse_inline, fastpath      : (compiler.py 만) 인라인 변환 / fastpath + lark
+#   backend_<name>              : 타깃 하나씩 (json, p4, cisco, linux)
+#   tsv_write                   : 표 전체를 UTF-8 파일로 쓰기
+# 그 밖에 문장 단위 지연시간 (p50/p95/p99, 앞쪽 최대 --sample 줄) 과 peak RSS.
+#
+# 크기/구현마다 별도 프로세스에서 돌려서 peak RSS 와 파서 상태가 섞이지 않게 한다.
+
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+IMPLS = ["compiler", "dja"]
+TARGETS = ["json", "p4", "cisco", "linux"]
+
+
+# -----------------------------
+# worker (구현 하나, 크기 하나)
+# -----------------------------
+def _load(impl):
+    sys.path.insert(0, str(ROOT))
+    if impl == "compiler":
+        import compiler
+
+        return compiler
+    # dja/main.py 는 같은 디렉터리의 json_to_*.py 를 import 한다
+    sys.path.insert(0, str(ROOT / "dja"))
+    spec = importlib.util.spec_from_file_location("dja_main", ROOT / "dja" / "main.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _timed(stages, name, fn):
+    t0 = time.perf_counter()
+    result = fn()
+    stages[name] = time.perf_counter() - t0
+    return result
+
+
+def _percentiles(samples):
+    if not samples:
+        return {}
+    samples = sorted(samples)
+    last = len(samples) - 1
+    return {
+        f"p{p}": samples[min(last, round(last * p / 100))] * 1e6 for p in (50, 95, 99)
+    }
+
+
+def run_worker(impl, n, seed, mix, sample):
+    from corpus import generate
+
+    cache = tempfile.TemporaryDirectory()
+    os.environ["INTENTLANG_CACHE_DIR"] = cache.name
+    mod = _load(impl)
+    lines = list(generate(n, seed, mix=mix))
+    code = "\n".join(lines)
+    stages = {}
+
+    _timed(stages, "grammar_cold", mod.build_parser)
+    parser = _timed(stages, "grammar_warm", mod.build_parser)
+    tree = _timed(stages, "parse", lambda: parser.parse(code))
+    models = _timed(stages, "transform", lambda: mod.IntentToJSON().transform(tree))
+    del tree
+
+    if impl == "compiler":
+        inline = mod.get_parser(inline=True)
+        _timed(stages, "parse_inline", lambda: inline.parse(code))
+        _timed(stages, "fastpath", lambda: list(mod.iter_compile(lines, fast=True)))
+        backends = {t: mod.get_emitter([t]) for t in TARGETS}
+        emit_all = mod.get_emitter()
+
+        def compile_one(line):
+            for model in inline.parse(line):
+                emit_all(model)
+
+    else:
+        backends = {
+            "json": json.dumps,
+            "p4": mod.json_to_p4,
+            "cisco": mod.json_to_cisco,
+            "linux": mod.json_to_linux,
+        }
+        transformer = mod.IntentToJSON()
+
+        def compile_one(line):
+            for model in transformer.transform(parser.parse(line)):
+                for fn in backends.values():
+                    fn(model)
+
+    for target, fn in backends.items():
+        _timed(stages, f"backend_{target}", lambda: [fn(m) for m in models])
+
+    with tempfile.TemporaryFile("w", encoding="utf-8") as f:
+        if impl == "compiler":
+            _timed(stages, "tsv_write", lambda: mod.print_table(models, lines, out=f))
+        else:
+            with redirect_stdout(f):
+                _timed(stages, "tsv_write", lambda: mod.print_table(models, lines))
+
+    latencies = []
+    for line in lines[:sample]:
+        t0 = time.perf_counter()
+        compile_one(line)
+        latencies.append(time.perf_counter() - t0)
+
+    cache.cleanup()
+    return {
+        "impl": impl,
+        "lines": n,
+        "stages": {
+            name: {
+                "seconds": round(sec, 6),
+                "lines_per_s": round(n / sec) if sec and not name.startswith("grammar") else None,
+            }
+            for name, sec in stages.items()
+        },
+        "latency_us": {k: round(v, 2) for k, v in _percentiles(latencies).items()},
+        # linux 는 KB 단위
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+# -----------------------------
+# 실행 / 비교
+# -----------------------------
+def git_rev():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_all(sizes, impls, seed, mix, sample):
+    runs = []
+    for n in sizes:
+        for impl in impls:
+            cmd = [
+                sys.executable, __file__, "--worker", impl, "-n", str(n),
+                "--seed", str(seed), "--mix", mix, "--sample", str(sample),
+            ]
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                err = (proc.stderr.strip().splitlines() or ["killed"])[-1]
+                print(f"{impl}\t{n}\tFAILED: {err}", file=sys.stderr)
+                runs.append({"impl": impl, "lines": n, "error": err})
+                continue
+            run = json.loads(proc.stdout)
+            print_run(run)
+            runs.append(run)
+    return runs
+
+
+def print_run(run):
+    print(f"== {run['impl']} {run['lines']:,} lines  peak RSS {run['peak_rss_mb']} MB")
+    for name, st in run["stages"].items():
+        rate = f"{st['lines_per_s']:,}" if st["lines_per_s"] else "-"
+        print(f"  {name:<16}{st['seconds']:>10.4f}s {rate:>14} lines/s")
+    lat = run["latency_us"]
+    if lat:
+        print("  latency/stmt    " + "  ".join(f"{k} {v:.0f}us" for k, v in lat.items()))
+
+
+def compare(old_path, new_path):
+    old = json.loads(Path(old_path).read_text(encoding="utf-8"))
+    new = json.loads(Path(new_path).read_text(encoding="utf-8"))
+    print(f"# {old['meta']['git_rev']} -> {new['meta']['git_rev']}  (old/new, >1 = faster)")
+    before = {(r["impl"], r["lines"]): r for r in old["runs"] if "error" not in r}
+    for run in new["runs"]:
+        prev = before.get((run["impl"], run["lines"]))
+        if prev is None or "error" in run:
+            continue
+        print(f"== {run['impl']} {run['lines']:,} lines")
+        for name, st in run["stages"].items():
+            if name in prev["stages"] and st["seconds"]:
+                ratio = prev["stages"][name]["seconds"] / st["seconds"]
+                print(f"  {name:<16}{ratio:>8.2f}x")
+        print(f"  {'peak_rss_mb':<16}{prev['peak_rss_mb']:>8} -> {run['peak_rss_mb']}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="IntentLang stage benchmarks")
+    ap.add_argument("--sizes", default="1e3,1e4,1e5", help="줄 수 목록 (최대 1e7)")
+    ap.add_argument("--impl", default=",".join(IMPLS), help="compiler,dja")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--mix", default="realistic", help="corpus.py 의 mix")
+    ap.add_argument("--sample", type=int, default=10_000, help="지연시간 측정 줄 수")
+    ap.add_argument("-o", "--out", help="결과 JSON (기본 bench-<git rev>.json)")
+    ap.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    ap.add_argument("--worker", choices=IMPLS, help=argparse.SUPPRESS)
+    ap.add_argument("-n", type=int, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.worker:
+        json.dump(run_worker(args.worker, args.n, args.seed, args.mix, args.sample), sys.stdout)
+        return
+
+    sizes = [int(float(s)) for s in args.sizes.split(",")]
+    impls = [s.strip() for s in args.impl.split(",")]
+    rev = git_rev()
+    import lark
+
+    result = {
+        "meta": {
+            "git_rev": rev,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "lark": lark.__version__,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "mix": args.mix,
+        },
+        "runs": run_all(sizes, impls, args.seed, args.mix, args.sample),
+    }
+    out = Path(args.out or f"bench-{rev}.json")
+    out.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    print(f"saved {out}")
+
+
+if __name__ == "__main__":
+    main()
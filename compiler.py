@@ -1,16 +1,110 @@
-from lark import Lark, Transformer, UnexpectedInput
+from lark import Lark, Token, Transformer, Tree, UnexpectedInput
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager, nullcontext, redirect_stderr
+from functools import partial
 from pathlib import Path
+import hashlib
+import io
 import json
+import os
 import sys
 import argparse
 
+import backends
+import delta
+import linux_check
+import metrics
+import parser_cache
+import semantics
+import writers
+from backends import Emitter, get_backend
+from diagnostics import (
+    ERROR,
+    WARNING,
+    Diagnostic,
+    count_severity,
+    print_diagnostics,
+    syntax_error,
+    terminal_names,
+    write_report,
+)
+from fastpath import FastRecognizer
+from inventory import (
+    UNKNOWN_POLICIES,
+    DictInventory,
+    HostResolver,
+    UnknownHostError,
+    open_inventory,
+)
+from ir import (
+    Allow,
+    Backup,
+    Block,
+    Connectivity,
+    GroupAllow,
+    GroupRef,
+    HostGroup,
+    Meter,
+    MeterEach,
+    Monitor,
+    Qos,
+    Route,
+    VlanCreate,
+    VlanDelete,
+    VlanRangeCreate,
+    VlanRangeDelete,
+    pack_ip,
+    pack_prefix,
+)
+from passes import Passes
+from stmt_cache import StatementCache
+from writers import tsv_row
+
+COMPILER_VERSION = "0.2.0"
+
 # -----------------------------
 # 1) Lark 파서 준비
 # -----------------------------
-GRAMMAR = Path("intentlang.lark").read_text(encoding="utf-8")
-parser = Lark(GRAMMAR, parser="lalr", start="start")
+# 문법 파일은 현재 디렉터리가 아니라 이 모듈 위치 기준으로 찾는다.
+GRAMMAR_PATH = Path(__file__).resolve().parent / "intentlang.lark"
+GRAMMAR = GRAMMAR_PATH.read_text(encoding="utf-8")
+
+_parsers = {}
+
+
+def build_parser(**options) -> Lark:
+    """intentlang.lark 의 LALR 파서 (parser_cache: 디스크 캐시에서 읽거나 만들어 저장)"""
+    return parser_cache.build_parser(GRAMMAR, **options)
+
+
+def get_parser(inline: bool = False) -> Lark:
+    """
+    처음 필요할 때 한 번만 파서를 만든다.
+    inline=True 이면 IntentToJSON 을 LALR 리듀스 콜백으로 직접 붙여서
+    parse() 가 Tree 대신 semantic model 리스트를 바로 돌려준다.
+    """
+    # --profile 이면 종류별 transform 시간을 재는 콜백으로 따로 만든다
+    # (inline 파서는 만들 때 transformer 메서드를 콜백으로 묶어 둔다)
+    m = metrics.active() if inline else None
+    key = inline if m is None else m
+    parser = _parsers.get(key)
+    if parser is None:
+        if inline:
+            parser = build_parser(transformer=make_transformer())
+        else:
+            parser = build_parser()
+        _parsers[key] = parser
+    return parser
+
 
-# host명 -> IP 매핑
+def __getattr__(name):
+    # 예전 코드의 `compiler.parser` 접근 호환용
+    if name == "parser":
+        return get_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# host명 -> IP 매핑 (--inventory 가 없을 때)
 HOST_MAP = {
     "A": "10.0.0.1",
     "B": "10.0.0.2",
@@ -18,11 +112,92 @@ HOST_MAP = {
     "hostB": "10.0.0.2",
 }
 
+# 문법은 맞지만 값이 틀린 문장 (VLAN 범위): 변환기가 모으고 문장은 버린다
+_value_errors = []
+
+
+class IntentValueError(ValueError):
+    """--keep-going 없이 값이 틀린 문장을 만났을 때 (첫 Diagnostic)"""
+
+    def __init__(self, diag):
+        super().__init__(f"line {diag.line}: {diag.message}")
+        self.diagnostic = diag
+
+
+# set_inventory() 로 바꾼 HostResolver (None 이면 HOST_MAP)
+_resolver = None
+_unknown_severity = WARNING
+
+
+def resolve_host(name):
+    """호스트 이름 → int IPv4 (모르는 이름은 문자열 그대로)"""
+    if _resolver is None:
+        return pack_ip(HOST_MAP.get(name, name))
+    return _resolver(name)
+
+
+def set_inventory(path=None, on_unknown="keep", keep_going=False):
+    """
+    호스트 이름을 풀 인벤토리를 정한다.
+    path: CSV/JSON 또는 inventory.py 로 만든 인덱스 (None 이면 HOST_MAP)
+    on_unknown: keep / warn / error (inventory.HostResolver 참고).
+    keep_going 이면 error 도 멈추지 않고 모아서 에러로 보고한다.
+    """
+    global _resolver, _unknown_severity
+    if path is None and on_unknown == "keep":
+        _resolver = None
+        return
+    inv = open_inventory(path) if path else DictInventory(HOST_MAP.items())
+    collect = keep_going and on_unknown == "error"
+    _resolver = HostResolver(inv, "warn" if collect else on_unknown)
+    _unknown_severity = ERROR if collect else WARNING
+
+
+def inventory_digest() -> str:
+    if _resolver is None:
+        return json.dumps(HOST_MAP, sort_keys=True)
+    # warn/error 에서는 미등록 이름이 든 줄을 캐시하지 않는다 (iter_rows).
+    # keep 으로 만든 캐시에는 그런 줄도 들어 있으므로 정책마다 캐시를 따로 쓴다
+    return f"{_resolver.inventory.digest}:{_resolver.on_unknown}"
+
+
+def _unresolved() -> int:
+    # 지금까지 풀지 못한 호스트 이름 수 (on_unknown=warn 일 때만 센다)
+    return 0 if _resolver is None else _resolver.unresolved
+
+
+def input_errors(diagnostics=()) -> bool:
+    """지금까지의 컴파일에 에러가 있었는지 (건너뛴 문법 에러, 에러로 모은 미등록 호스트)"""
+    return bool(count_severity(diagnostics)) or (
+        _unknown_severity == ERROR and _unresolved() > 0
+    )
+
+
+def unknown_host_diagnostics(path=None) -> list:
+    """on_unknown=warn 으로 모은 미등록 이름들 (이름마다 Diagnostic 하나)"""
+    if _resolver is None:
+        return []
+    return [
+        Diagnostic(
+            f"unknown host {name!r} ({count} uses)",
+            severity=_unknown_severity,
+            code="unknown-host",
+            path=path,
+        )
+        for name, count in sorted(_resolver.take_unknown().items())
+    ]
+
 
 # -----------------------------
 # 2) IntentLang → JSON Semantic Model
 # -----------------------------
 class IntentToJSON(Transformer):
+    """
+    파스 트리 → ir 모듈의 문장 객체.
+    JSON 은 필요할 때 model.to_dict() 로 만든다.
+    """
+
+    # inline 파서에서는 NUMBER/IDENT/IPADDR/GROUP_REF 메서드가 lexer 콜백으로 쓰인다
     def NUMBER(self, token):
         return int(token)
 
@@ -32,303 +207,445 @@ class IntentToJSON(Transformer):
     def IPADDR(self, token):
         return str(token)
 
+    def GROUP_REF(self, token):
+        return str(token)[1:]  # @web -> web
+
     # host, endpoint
     def host(self, items):
         (name,) = items
-        return HOST_MAP.get(name, name)
+        return resolve_host(name)
 
     def endpoint(self, items):
         return items[0]
 
-    # 1. allow tcp from A to B
+    def group_ref(self, items):
+        (name,) = items
+        return GroupRef(name)
+
+    def vlan_range(self, items):
+        first, dash, last = items
+        error = semantics.vlan_range_error(first, last)
+        if error is not None:
+            # 문장은 버리고 Diagnostic 만 남긴다 (_report_value_errors 참고)
+            _value_errors.append(Diagnostic(error, dash.line, dash.column, code="vlan-range"))
+            return None
+        return first, last
+
+    # 1. allow tcp from A to B (from @web to @db)
     def allow_stmt(self, items):
         src, dst = items
-        return {
-            "type": "acl",
-            "action": "allow",
-            "protocol": "tcp",
-            "src": src,
-            "dst": dst,
-        }
+        if type(src) is GroupRef or type(dst) is GroupRef:
+            return GroupAllow(src, dst)
+        return Allow(src, dst)
 
     # 2. block icmp
     def block_stmt(self, items):
-        return {
-            "type": "acl",
-            "action": "deny",
-            "protocol": "icmp",
-        }
+        return Block()
 
     # 3. limit bandwidth 10Mbps for hostA
     def limit_stmt(self, items):
         rate, host_ip = items
-        return {
-            "type": "meter",
-            "host": host_ip,
-            "rate": f"{rate}Mbps",
-        }
+        return Meter(host_ip, rate)
+
+    # limit bandwidth 10Mbps per host in @rack7
+    def limit_each_stmt(self, items):
+        rate, group = items
+        return MeterEach(GroupRef(group), rate)
 
     # 4. assign qos high to vlan10
     def qos_stmt(self, items):
         (vlan_id,) = items
-        return {
-            "type": "qos",
-            "Vlan": vlan_id,
-            "priority": "high",
-        }
+        return Qos(vlan_id)
 
     # 5. ensure connectivity between hostA and hostB
     def connectivity_stmt(self, items):
         src, dst = items
-        return {
-            "type": "connectivity",
-            "src": src,
-            "dst": dst,
-        }
+        return Connectivity(src, dst)
 
     # 6. create vlan 20 name Engineering
     def create_vlan_stmt(self, items):
         vid, name = items
-        return {
-            "type": "vlan",
-            "id": vid,
-            "name": name,
-            "action": "create",
-        }
+        return VlanCreate(vid, name)
+
+    # create vlan 100-3999 [name Web]
+    def create_vlan_range_stmt(self, items):
+        vlans, name = items
+        if vlans is None:
+            return None
+        return VlanRangeCreate(*vlans, name)
 
     # 7. delete vlan 10
     def delete_vlan_stmt(self, items):
         (vid,) = items
-        return {
-            "type": "vlan",
-            "id": vid,
-            "action": "delete",
-        }
+        return VlanDelete(vid)
+
+    # delete vlan 100-3999
+    def delete_vlan_range_stmt(self, items):
+        (vlans,) = items
+        if vlans is None:
+            return None
+        return VlanRangeDelete(*vlans)
 
     # 8. set route 10.0.0.0/24 via 192.168.1.1
     def route_stmt(self, items):
         dst, next_hop = items
-        return {
-            "type": "route",
-            "dst": dst,
-            "next_hop": next_hop,
-        }
+        net, plen = pack_prefix(dst)
+        return Route(net, plen, pack_ip(next_hop))
 
     # 9. monitor latency between hostA and hostB
     def monitor_stmt(self, items):
         src, dst = items
-        return {
-            "type": "monitor",
-            "metric": "latency",
-            "src": src,
-            "dst": dst,
-        }
+        return Monitor(src, dst)
 
     # 10. backup configuration now
     def backup_stmt(self, items):
-        return {
-            "type": "backup",
-            "action": "now",
-        }
+        return Backup()
+
+    # define group web as A, B, 10.0.1.0/28
+    def group_stmt(self, items):
+        name, *hosts = items
+        members = []
+        for host in hosts:
+            if isinstance(host, str) and "/" in host:
+                net, plen = pack_prefix(host)
+                if plen is not None and plen < 32:
+                    host = (net, plen)
+                elif plen is not None:
+                    host = net
+            members.append(host)
+        return HostGroup(name, members)
 
     def stmt(self, items):
         return items[0]
 
     def start(self, items):
-        return items
-
-
-def compile_intent(code: str):
+        # 값이 틀려서 버린 문장 (None) 은 뺀다
+        return [m for m in items if m is not None]
+
+
+def compile_intent(
+    code: str, inline: bool = True, fast: bool = False, diagnostics=None
+):
+    """
+    inline=True (기본): Tree 를 만들지 않고 파싱 중에 바로 model 생성
+    inline=False: parse() → Tree → IntentToJSON().transform() 두 단계
+    fast=True: 줄마다 fastpath 인식기를 먼저 시도 (실패하면 lark)
+    diagnostics (list): 문법 에러에서 멈추지 않고 다음 문장부터 계속 파싱.
+        에러는 Diagnostic 으로 diagnostics 에 추가되고, 성공한 문장만 돌려준다.
+    """
+    if fast:
+        with metrics.stage("fastpath"):
+            models = _compile_fast(code)
+        if models is not None:
+            return models
+
+    found = len(diagnostics) if diagnostics is not None else 0
+    _value_errors.clear()
     try:
-        tree = parser.parse(code)
+        with metrics.stage("parse+transform" if inline else "parse"):
+            if diagnostics is not None:
+                result = parse_recovering(get_parser(inline), code, diagnostics)
+            else:
+                result = get_parser(inline).parse(code)
     except UnexpectedInput as e:
         # 파싱 에러 위치를 보기 좋게 출력
         print("=== Parse Error ===", file=sys.stderr)
         print(e.get_context(code), file=sys.stderr)
         raise
 
-    json_models = IntentToJSON().transform(tree)
-    return json_models
-
-
-# -----------------------------
-# 3) JSON → P4 / OpenFlow
-# -----------------------------
-def json_to_p4(model: dict) -> str:
-    t = model["type"]
-
-    if t == "acl":
-        if model["action"] == "allow":
-            return (
-                "acl_table: match={"
-                f"'src':'{model['src']}',"
-                f"'dst':'{model['dst']}',"
-                f"'proto':'{model['protocol']}'"
-                "}, action=allow"
-            )
-        else:
-            return (
-                "acl_table: match={"
-                f"'proto':'{model['protocol']}'"
-                "}, action=deny"
-            )
+    if not inline and not isinstance(result, list):
+        with metrics.stage("transform"):
+            result = make_transformer().transform(result)
+    _report_value_errors(code, diagnostics, found)
+    return result
+
+
+def _report_value_errors(code: str, diagnostics=None, found=0, line=None):
+    """
+    변환기가 모은 값 에러 (_value_errors) 를 꺼낸다.
+    diagnostics 가 없으면 첫 에러로 IntentValueError, 있으면 문법 에러와
+    줄 순서대로 섞어서 추가한다 (found: 이번 컴파일이 추가하기 시작한 위치).
+    line: code 가 한 줄뿐일 때 파일 기준 줄 번호
+    """
+    if not _value_errors:
+        return
+    errors = _value_errors[:]
+    _value_errors.clear()
+    lines = code.split("\n")
+    for diag in errors:
+        if 1 <= diag.line <= len(lines):
+            diag.source = lines[diag.line - 1].rstrip("\r")
+        if line is not None:
+            diag.line = line
+        diag.skipped = (diag.line, diag.line)
+    if diagnostics is None:
+        raise IntentValueError(errors[0])
+    # 문법 에러로 이미 버린 줄이면 (문장이 끝나기 전에 에러) 같은 줄을 두 번 보고하지 않는다
+    skipped = set()
+    for d in diagnostics[found:]:
+        if d.skipped is not None:
+            skipped.update(range(d.skipped[0], d.skipped[1] + 1))
+    diagnostics.extend(d for d in errors if d.line not in skipped)
+    diagnostics[found:] = sorted(diagnostics[found:], key=lambda d: d.line or 0)
+
+
+def _is_stmt_list(value) -> bool:
+    # start: stmt+ 의 반복 부분 (지금까지 완성된 문장들)
+    return isinstance(value, Tree) and value.data.startswith("__start_plus")
+
+
+def parse_recovering(parser, code: str, diagnostics: list):
+    """
+    문법 에러가 나도 다음 문장에서 다시 시작하는 파싱 (lark on_error).
+      1) 파서 스택에서 만들다 만 문장을 버린다 (완성된 문장 목록까지 pop)
+      2) 에러 토큰이 다음 줄의 문장 첫 키워드면 그 토큰부터 다시 파싱하고,
+         아니면 그 줄의 나머지를 건너뛴다
+    버린 줄 범위는 Diagnostic.skipped 에 남는다 (source_lines() 참고).
+    성공한 문장이 하나도 없으면 빈 결과.
+    """
+    terminals = terminal_names(parser)
+    starts = None
+    found = len(diagnostics)
+
+    def on_error(e):
+        nonlocal starts
+        ip = e.interactive_parser
+        state = ip.parser_state
+        if starts is None:
+            table = state.parse_conf.parse_table
+            starts = set(table.states[state.parse_conf.start_state]) - {"$END"}
+
+        token = getattr(e, "token", None)
+        pos = token.start_pos if token is not None else e.pos_in_stream
+        if pos is not None and not code[code.rfind("\n", 0, pos) + 1 : pos].strip():
+            # 줄 첫 토큰에서 난 에러: LALR 은 다음 토큰을 봐야 앞 문장을 리듀스하므로
+            # 앞 문장이 끝났으면 문장 첫 키워드를 하나 넣어 리듀스시킨다 (넣은 키워드는
+            # 아래에서 버린다). 기대하는 것도 다음 문장의 첫 키워드뿐이다.
+            actions = state.parse_conf.parse_table.states[state.position]
+            end = next((t for t in sorted(starts) if t in actions), None)
+            if end is not None:
+                state.feed_token(Token(end, "", pos, e.line, e.column))
+                e.expected = starts
+                e.allowed = starts
+
+        first = None
+        while len(state.state_stack) > 1 and not _is_stmt_list(state.value_stack[-1]):
+            state.state_stack.pop()
+            value = state.value_stack.pop()
+            if isinstance(value, Token):
+                first = value.line
+
+        if token is not None and token.type == "$END" and first is None:
+            # 문장이 하나도 없음: 앞에서 보고한 에러가 없으면 이것을 보고
+            if len(diagnostics) == found:
+                diagnostics.append(syntax_error(e, code, terminals))
+            return False
+
+        diag = syntax_error(e, code, terminals)
+        diagnostics.append(diag)
+        line = diag.line or 1
+        first = min(first or line, line)
+        if token is not None and token.type in starts and token.line > first:
+            # "delete vlan" + 다음 줄 "block icmp": 다음 줄은 그대로 살린다
+            diag.skipped = (first, token.line - 1)
+            ip.feed_token(token)
+            return True
+
+        diag.skipped = (first, line)
+        lexer = ip.lexer_thread.state
+        text = lexer.text.text
+        pos = lexer.line_ctr.char_pos
+        end = text.find("\n", pos)
+        lexer.line_ctr.feed(text[pos : len(text) if end < 0 else end])
+        return True
 
-    if t == "meter":
-        return (
-            "meter_table: match={"
-            f"'src':'{model['host']}'"
-            "}, action={'set_rate':'" + model["rate"] + "'}"
-        )
-
-    if t == "qos":
-        return (
-            "qos_table: match={"
-            f"'Vlan':{model['Vlan']}"
-            "}, action={'set_priority':'high'}"
-        )
-
-    if t == "connectivity":
-        return (
-            "flow_table: match={"
-            f"'src':'{model['src']}',"
-            f"'dst':'{model['dst']}'"
-            "}, action='forward', path=['SW1','SW3']"
-        )
-
-    if t == "vlan":
-        if model["action"] == "create":
-            return "VLAN setup via P4 metadata (optional)"
-        else:
-            return "Remove VLAN metadata in tables"
-
-    if t == "route":
-        return (
-            "flow_table: match={"
-            f"'dst':'{model['dst']}'"
-            "}, action='forward'"
-        )
-
-    if t == "monitor":
-        return "monitor_table: timestamps/counters to measure RTT"
+    try:
+        result = parser.parse(code, on_error=on_error)
+    except UnexpectedInput:
+        return []
+    return [] if result is None else result
+
+
+def _statement_lines(code: str, diagnostics=()):
+    # 문장 (model) 이 나온 줄: 빈 줄과 복구하면서 버린 줄은 뺀다
+    skipped = set()
+    for d in diagnostics:
+        if d.skipped is not None:
+            skipped.update(range(d.skipped[0], d.skipped[1] + 1))
+    for no, line in enumerate(code.splitlines(), start=1):
+        if line.strip() and no not in skipped:
+            yield no, line.strip()
+
+
+def source_lines(code: str, diagnostics=()) -> list:
+    """표의 IntentLang 칸에 쓸 줄 목록 (빈 줄과 복구하면서 버린 줄은 뺀다)"""
+    return [line for _, line in _statement_lines(code, diagnostics)]
+
+
+def check_semantics(models, code: str, diagnostics=()) -> list:
+    """semantics.analyze() 에 model 마다 줄 번호와 원문을 붙여서"""
+    numbered = list(_statement_lines(code, diagnostics))
+    if len(numbered) != len(models):
+        # 한 문장이 여러 줄에 걸친 경우: 줄 번호 없이 "statement N"
+        return semantics.analyze(models)
+    return semantics.analyze(
+        models, [no for no, _ in numbered], [line for _, line in numbered]
+    )
 
-    if t == "backup":
-        return "Save controller switch state to JSON/YAML"
 
-    return "// unsupported for P4/OpenFlow"
+def make_transformer() -> IntentToJSON:
+    """
+    IntentToJSON(). --profile 이면 문장 규칙마다 종류별 시간을 잰다
+    (transform 단계, inline 파서와 fastpath 도 이것을 쓴다).
+    """
+    transformer = IntentToJSON()
+    m = metrics.active()
+    if m is not None:
+        for name in dir(IntentToJSON):
+            if name.endswith("_stmt"):
+                fn = getattr(transformer, name)
+                # 전체 시간은 compile_intent 에서 재므로 종류별로만
+                setattr(
+                    transformer,
+                    name,
+                    m.wrap("transform", fn, by_result=True, total=False),
+                )
+    return transformer
+
+
+def _compile_fast(code: str):
+    """
+    줄 단위로 fastpath → lark 순서로 컴파일.
+    lark 로도 실패한 줄이 있으면 None 을 돌려주고, 호출 쪽이 전체를
+    다시 파싱해서 기존과 똑같은 에러를 내게 한다.
+    """
+    fast = FastRecognizer(make_transformer())
+    parser = get_parser(inline=True)
+    models = []
+    _value_errors.clear()
+    for line in code.splitlines():
+        if not line.strip():
+            continue
+        found = fast.recognize(line)
+        if found is None:
+            try:
+                found = parser.parse(line)
+            except UnexpectedInput:
+                return None
+            if _value_errors:
+                return None
+        models.extend(found)
+    return models
+
+
+def iter_compile(lines, fast: bool = False, diagnostics=None):
+    """
+    줄 단위 스트리밍 컴파일.
+    lines 는 파일 객체처럼 한 줄씩 읽히는 iterable 이면 되고,
+    (문장 번호, IntentLang 원문, model) 을 하나씩 내보낸다.
+    이전 줄의 결과를 들고 있지 않으므로 메모리는 입력 크기와 무관하다.
+    fast=True 이면 fastpath 인식기를 먼저 시도한다.
+    diagnostics (list) 가 있으면 에러 난 줄은 건너뛰고 Diagnostic 을 모은다.
+    """
+    parser = get_parser(inline=True)
+    recognizer = FastRecognizer(make_transformer()) if fast else None
+    compile_one = _timed_compile_line()
+    no = 0
+    for lineno, line in enumerate(lines, start=1):
+        intent = line.strip()
+        if not intent:
+            continue
+        for model in compile_one(intent, lineno, parser, recognizer, diagnostics):
+            no += 1
+            yield no, intent, model
+
+
+def _timed_compile_line():
+    # --profile 이면 줄마다 parse 시간을 결과 문장 종류별로 기록
+    m = metrics.active()
+    if m is None:
+        return compile_line
+    return m.wrap("parse", compile_line, by_result=True)
+
+
+def compile_line(intent, lineno, parser, recognizer=None, diagnostics=None):
+    """
+    한 줄 컴파일. 에러는 파일 기준 줄 번호로 보고한다.
+    diagnostics (list) 가 있으면 예외 대신 Diagnostic 을 추가하고 [] 를 돌려준다.
+    """
+    models = recognizer.recognize(intent) if recognizer else None
+    if models is not None:
+        return models
+    _value_errors.clear()
+    try:
+        models = parser.parse(intent)
+    except UnexpectedInput as e:
+        if diagnostics is not None:
+            diag = syntax_error(e, intent, terminal_names(parser), line=lineno)
+            diag.skipped = (lineno, lineno)
+            diagnostics.append(diag)
+            return []
+        print("=== Parse Error ===", file=sys.stderr)
+        print(f"line {lineno}:", file=sys.stderr)
+        print(e.get_context(intent), file=sys.stderr)
+        # 에러 메시지의 줄 번호를 파일 기준으로 맞춘다
+        e.line = lineno
+        raise
+    _report_value_errors(intent, diagnostics, len(diagnostics or ()), lineno)
+    return models
 
 
 # -----------------------------
-# 4) JSON → Cisco Config
+# 3) JSON → P4 / Cisco / Linux
 # -----------------------------
-def json_to_cisco(model: dict) -> str:
-    t = model["type"]
-
-    if t == "acl":
-        proto = model["protocol"]
-        if model["action"] == "allow":
-            return (
-                "ip access-list extended ALLOW_TRAFFIC\n"
-                f" permit {proto} host {model['src']} host {model['dst']}"
-            )
-        else:
-            return (
-                "ip access-list extended BLOCK_TRAFFIC\n"
-                f" deny {proto} any any"
-            )
-
-    if t == "meter":
-        return (
-            "class-map match-any HOSTA\n"
-            " match ip address HOSTA_ACL\n"
-            "policy-map LIMIT_HOSTA\n"
-            f" class HOSTA police {model['rate']} conform-action transmit"
-        )
-
-    if t == "qos":
-        return (
-            f"interface vlan{model['Vlan']}\n"
-            " priority-queue out\n"
-            " mls qos trust cos"
-        )
-
-    if t == "connectivity":
-        return "Controller installs static routes or ACLs"
-
-    if t == "vlan":
-        if model["action"] == "create":
-            return f"vlan {model['id']} name {model['name']}"
-        else:
-            return f"no vlan {model['id']}"
+# 생성 함수는 backends/ 패키지에 타깃별로 등록되어 있다.
+# 아래 함수들은 예전 이름 그대로 쓰던 코드를 위한 것.
+def json_to_p4(model) -> str:
+    return get_backend("p4").emit(model)
 
-    if t == "route":
-        dst = model["dst"]
-        network, prefix = dst.split("/")
-        netmask = "255.255.255.0" if prefix == "24" else "255.255.255.255"
-        return f"ip route {network} {netmask} {model['next_hop']}"
 
-    if t == "monitor":
-        return "Use IP SLA or controller probe"
+def json_to_cisco(model) -> str:
+    return get_backend("cisco").emit(model)
 
-    if t == "backup":
-        return "copy running-config startup-config"
 
-    return "! unsupported for cisco"
+def json_to_linux(model) -> str:
+    return get_backend("linux").emit(model)
 
 
-# -----------------------------
-# 5) JSON → Linux Config
-# -----------------------------
-def json_to_linux(model: dict) -> str:
-    t = model["type"]
-
-    if t == "acl":
-        proto = model["protocol"]
-        if model["action"] == "allow":
-            return (
-                "iptables -A INPUT "
-                f"-p {proto} -s {model['src']} -d {model['dst']} -j ACCEPT"
-            )
-        else:
-            return f"iptables -A INPUT -p {proto} -j DROP"
+_emitters = {}
 
-    if t == "meter":
-        return (
-            "tc qdisc add dev eth0 root handle 1: htb default 10; "
-            f"tc class add dev eth0 parent 1: classid 1:1 htb rate {model['rate']}"
-        )
 
-    if t == "qos":
-        return (
-            "tc class add dev eth0 parent 1: classid 1:10 "
-            "htb rate 100mbit prio 0"
-        )
+def parse_targets(text: str) -> list:
+    """'linux,cisco' -> ['linux', 'cisco'] (알 수 없는 이름이면 ValueError)"""
+    targets = [t.strip() for t in text.split(",") if t.strip()]
+    for name in targets:
+        try:
+            get_backend(name)
+        except KeyError:
+            raise ValueError(f"unknown target: {name!r}") from None
+    return targets
 
-    if t == "connectivity":
-        return f"ip route add {model['dst']}/32 via 10.0.0.254"
 
-    if t == "vlan":
-        if model["action"] == "create":
-            return (
-                f"ip link add link eth0 name eth0.{model['id']} "
-                f"type vlan id {model['id']}"
-            )
+def get_emitter(targets=None) -> Emitter:
+    """
+    targets (예: ["linux", "json"]) 만 만드는 Emitter. 처음 쓸 때 생성.
+    None 이면 등록된 모든 타깃 (json, p4, cisco, linux, 플러그인).
+    고른 타깃의 백엔드 모듈만 import 된다.
+    """
+    key = tuple(targets) if targets is not None else None
+    emitter = _emitters.get(key)
+    if emitter is None:
+        m = metrics.active()
+        if targets is None:
+            emitter = Emitter(metrics=m)
         else:
-            return f"ip link delete eth0.{model['id']}"
-
-    if t == "route":
-        return f"ip route add {model['dst']} via {model['next_hop']}"
-
-    if t == "monitor":
-        return f"ping -c 4 {model['dst']}"
-
-    if t == "backup":
-        return "cp /etc/network/interfaces /backup/interfaces.bak"
-
-    return "# unsupported for linux"
+            emitter = Emitter([get_backend(name) for name in targets], m)
+        _emitters[key] = emitter
+    return emitter
 
 
 # -----------------------------
-# 6) 샘플 Intent 리스트
+# 4) 샘플 Intent 리스트
 # -----------------------------
 INTENTS = [
     "allow tcp from A to B",
@@ -345,26 +662,358 @@ INTENTS = [
 
 
 # -----------------------------
-# 7) 표 출력 / CLI
+# 5) 표 출력 / CLI
 # -----------------------------
-def print_table(models, intents):
-    header = [
-        "No.",
-        "IntentLang",
-        "JSON Semantic Model",
-        "P4/OpenFlow",
-        "Cisco Config",
-        "Linux Config",
-    ]
-    print("\t".join(header))
+HEADER = [
+    "No.",
+    "IntentLang",
+]
+
+
+def table_header(targets=None) -> list:
+    # 기본: JSON Semantic Model, P4/OpenFlow, Cisco Config, Linux Config
+    return HEADER + get_emitter(targets).columns
+
+
+def emit_model(model, targets=None) -> list:
+    """model 하나의 타깃별 출력 (기본: [JSON, P4, Cisco, Linux])"""
+    return get_emitter(targets)(model)
+
+
+def format_row(no, intent, model, targets=None) -> str:
+    return join_row(no, intent, emit_model(model, targets))
+
+
+def join_row(no, intent, outputs) -> str:
+    return tsv_row(no, intent, outputs)
+
+
+@contextmanager
+def open_table(out=None, targets=None, fmt="tsv", thread=False):
+    """
+    행 writer (writers.TableWriter). out 이 없으면 stdout (UTF-8).
+    thread=True 이면 실제 쓰기는 별도 스레드에서.
+    """
+    with ExitStack() as stack:
+        if out is None:
+            out = stack.enter_context(writers.open_output())
+        out = stack.enter_context(writers.threaded(out, thread))
+        names = [b.name for b in get_emitter(targets).backends]
+        writer = writers.table_writer(fmt, out, table_header(targets), names)
+        m = metrics.active()
+        if m is not None:
+            writer.row = m.wrap("write", writer.row)
+        writer.begin()
+        try:
+            yield writer
+        finally:
+            # 에러로 멈춰도 그때까지의 행은 남긴다
+            writer.close()
+
+
+def print_table(models, intents, out=None, targets=None, fmt="tsv", thread=False):
+    emitted = get_emitter(targets).emit_all(models)
+    with open_table(out, targets, fmt, thread) as writer:
+        for i, (intent, outputs) in enumerate(zip(intents, emitted), start=1):
+            writer.row(i, intent, outputs)
+
+
+def iter_rows(lines, fast: bool = False, cache=None, targets=None, diagnostics=None):
+    """
+    (문장 번호, IntentLang 원문, 타깃별 출력 리스트) 를 하나씩 내보낸다.
+    cache (StatementCache) 가 있으면 캐시에 없는 줄만 파싱/생성한다
+    (미등록 호스트가 나온 줄은 캐시하지 않고 매번 다시 컴파일한다).
+    diagnostics (list) 가 있으면 에러 난 줄은 건너뛴다 (iter_compile 참고).
+    """
+    emit = get_emitter(targets)
+    if cache is None:
+        for no, intent, model in iter_compile(lines, fast, diagnostics):
+            yield no, intent, emit(model)
+        return
+
+    parser = get_parser(inline=True)
+    recognizer = FastRecognizer(make_transformer()) if fast else None
+    compile_one = _timed_compile_line()
+    lookup = cache.get
+    if metrics.active() is not None:
+        lookup = metrics.active().wrap("cache", lookup)
+    no = 0
+    for lineno, line in enumerate(lines, start=1):
+        intent = line.strip()
+        if not intent:
+            continue
+        outputs = lookup(intent)
+        if outputs is None:
+            unresolved = _unresolved()
+            models = compile_one(intent, lineno, parser, recognizer, diagnostics)
+            outputs = [emit(model) for model in models]
+            if outputs and _unresolved() == unresolved:
+                # 에러 난 줄과 미등록 호스트가 있는 줄은 캐시에 넣지 않는다
+                # (캐시에서 꺼내면 미등록 경고 / 에러가 다시 나오지 않으므로)
+                cache.put(intent, outputs)
+        for out in outputs:
+            no += 1
+            yield no, intent, out
+
+
+def stream_table(rows, out=None, targets=None, fmt="tsv", thread=False):
+    """iter_rows() 결과를 받는 대로 쓴다 (CHUNK_ROWS 행씩 모아서)"""
+    with open_table(out, targets, fmt, thread) as writer:
+        for no, intent, outputs in rows:
+            writer.row(no, intent, outputs)
+
+
+# 증분 캐시 fingerprint 에 들어가는 소스 (내용이 바뀌면 캐시 전체 무효)
+CACHE_SOURCES = [
+    Path(__file__).resolve(),
+    Path(__file__).resolve().parent / "fastpath.py",
+    Path(__file__).resolve().parent / "ir.py",
+]
+
+
+def write_configs(
+    models,
+    out_dir,
+    targets=None,
+    optimize=True,
+    diagnostics=None,
+    batch=False,
+    state_dir=None,
+    thread=False,
+    checked=False,
+    failed=False,
+) -> dict:
+    """
+    타깃마다 설정 파일 하나 (linux.sh, cisco.cfg, ...) 를 out_dir 에 쓴다.
+    batch=True 이면 batch 출력이 있는 타깃은 도구별 파일 여러 개로.
+    thread=True 이면 파일 쓰기는 별도 스레드에서 (writers.ThreadedWriter).
+    state_dir 를 주면 그 안의 스냅샷과의 차이만 담은 delta 파일 (linux.delta.sh, ...)
+    와 pending 스냅샷을 쓴다 (통계는 '<타깃> delta'). failed=True (입력에 에러가
+    있었음) 이거나 백엔드 에러가 있으면 delta 와 pending 은 쓰지 않는다.
+    돌려주는 값: {타깃 이름: 통계 dict}. route 충돌은 diagnostics 에 경고로.
+    checked=True 이면 route 충돌 / 없는 그룹은 semantics 가 줄 번호와 함께 이미
+    보고했으므로 다시 넣지 않는다.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    passes = Passes(models, optimize)
+    stats = {}
+    selected = get_emitter(targets).backends
+    if state_dir is not None:
+        # 지난 배포의 값 (P4 ACL priority) 을 이어받아 전체 파일과 delta 가 같은 값을 쓴다
+        passes.state = delta.load_states(state_dir, selected)
+    for backend in selected:
+        with metrics.stage(f"program:{backend.name}"):
+            if batch and backend.batch_fn is not None:
+                stats[backend.name] = backend.batch_fn(models, out_dir, passes)
+                continue
+            with writers.open_output(out_dir / backend.filename) as f:
+                with writers.threaded(f, thread) as out:
+                    stats[backend.name] = backend.emit_program(models, out, passes)
+    if diagnostics is not None:
+        passes.groups  # 정의 없이 쓴 그룹 (unknown-group)
+        if not checked:
+            for conflict in passes.routes.conflicts:
+                diagnostics.append(
+                    Diagnostic(conflict.message(), severity=WARNING, code="route-conflict")
+                )
+        diagnostics.extend(
+            d for d in passes.diagnostics if not (checked and d.code in semantics.PROGRAM_CODES)
+        )
+    if state_dir is not None:
+        with metrics.stage("delta"):
+            found = delta.write_deltas(
+                passes, state_dir, out_dir, selected, diagnostics, failed
+            )
+        for name, values in found.items():
+            stats[f"{name} delta"] = values
+    return stats
 
-    for i, (intent, model) in enumerate(zip(intents, models), start=1):
-        json_str = json.dumps(model)
-        p4 = json_to_p4(model)
-        cisco = json_to_cisco(model).replace("\n", "\\n")
-        linux = json_to_linux(model)
-        row = [str(i), intent, json_str, p4, cisco, linux]
-        print("\t".join(row))
+
+def cache_sources(targets=None) -> list:
+    # 출력에 쓰이는 백엔드 모듈 (플러그인 포함) 도 fingerprint 에 넣는다
+    selected = get_emitter(targets).backends
+    return CACHE_SOURCES + [Path(p) for p in backends.source_files(selected)]
+
+
+def cache_fingerprint(targets=None) -> str:
+    h = hashlib.sha256()
+    h.update(COMPILER_VERSION.encode("utf-8"))
+    h.update(GRAMMAR.encode("utf-8"))
+    h.update(inventory_digest().encode("utf-8"))
+    for path in cache_sources(targets):
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+# -----------------------------
+# 6) 여러 파일 / 디렉터리 병렬 컴파일
+# -----------------------------
+def expand_inputs(paths, pattern="*.intent", names=None):
+    """
+    파일은 그대로, 디렉터리는 pattern 에 맞는 파일을 이름순으로 펼친다.
+    names (list) 를 주면 파일마다 --out-dir 아래 이름을 채운다:
+    디렉터리에서 찾은 파일은 그 디렉터리 기준 상대 경로, 직접 준 파일은 파일 이름.
+    """
+    files = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            found = sorted(f for f in p.rglob(pattern) if f.is_file())
+            files.extend(found)
+            if names is not None:
+                names.extend(f.relative_to(p) for f in found)
+        else:
+            files.append(p)
+            if names is not None:
+                names.append(Path(p.name))
+    return files
+
+
+def output_paths(out_dir, files, names, suffix) -> list:
+    """
+    names (expand_inputs) → out_dir 아래 출력 경로 (하위 디렉터리도 만든다).
+    두 입력이 같은 출력 경로가 되면 하나가 덮어써지므로 ValueError.
+    """
+    paths = [out_dir / name.with_suffix(suffix) for name in names]
+    seen = {}
+    for i, path in enumerate(paths):
+        first = seen.setdefault(path, i)
+        if first != i:
+            raise ValueError(f"{files[first]} and {files[i]} would both write {path}")
+    for parent in {path.parent for path in paths}:
+        parent.mkdir(parents=True, exist_ok=True)
+    return paths
+
+
+def _init_worker(plugins=(), targets=None, profile=False, inventory=None):
+    # 워커마다 한 번만 파서/백엔드를 올려 둔다 (파서는 디스크 캐시에서 읽음)
+    if profile:
+        metrics.enable()
+    if inventory is not None:
+        set_inventory(*inventory)
+    for name in plugins:
+        backends.load_plugin(name)
+    get_parser(inline=True)
+    get_emitter(targets)
+
+
+def compile_file(
+    path,
+    out_path=None,
+    fast=False,
+    stream=False,
+    targets=None,
+    keep_going=False,
+    fmt="tsv",
+):
+    """
+    파일 하나를 컴파일해서 (path, 표 텍스트, 에러 텍스트, 진단 목록) 을 돌려준다.
+    out_path 가 있으면 표를 그 파일에 쓰고 표 텍스트는 None. fmt: tsv / jsonl
+    예외는 밖으로 던지지 않는다 (파일 하나가 배치 전체를 멈추지 않게).
+    keep_going=True 이면 문법 에러가 난 문장만 빼고 표를 만들고,
+    에러는 진단 목록으로 돌려준다. 미등록 호스트 경고도 진단 목록에 들어간다.
+    """
+    err = io.StringIO()
+    buf = None
+    diagnostics = [] if keep_going else None
+    try:
+        with redirect_stderr(err):
+            if out_path is not None:
+                out = writers.open_output(out_path)
+            else:
+                out = buf = io.StringIO()
+            with out as out:
+                if stream:
+                    with open(path, encoding="utf-8") as f:
+                        rows = iter_rows(f, fast, targets=targets, diagnostics=diagnostics)
+                        stream_table(rows, out, targets, fmt)
+                else:
+                    with metrics.stage("read"):
+                        code = Path(path).read_text(encoding="utf-8")
+                    models = compile_intent(code, fast=fast, diagnostics=diagnostics)
+                    intents = source_lines(code, diagnostics or ())
+                    print_table(models, intents, out, targets, fmt)
+                text = buf.getvalue() if buf is not None else None
+    except Exception as e:
+        print(f"{type(e).__name__}: {e}", file=err)
+        if out_path is not None:
+            # 반쯤 쓴 출력 파일은 남기지 않는다
+            Path(out_path).unlink(missing_ok=True)
+        unknown_host_diagnostics()
+        return str(path), None, err.getvalue(), []
+    found = (diagnostics or []) + unknown_host_diagnostics()
+    for diag in found:
+        diag.path = str(path)
+    return str(path), text, None, found
+
+
+def _compile_file_profiled(path, out_path=None, **options):
+    # 워커의 계측 결과를 파일마다 돌려받아 부모 쪽 Metrics 에 합친다
+    result = compile_file(path, out_path, **options)
+    return result, metrics.active().take()
+
+
+def compile_files(
+    files, jobs=None, out_dir=None, plugins=(), diagnostics=None, inventory=None,
+    names=None, **options
+):
+    """
+    파일 여러 개를 ProcessPoolExecutor 로 나눠 컴파일.
+    결과는 입력 순서대로 stdout 에 쓰거나 (out_dir 가 없을 때)
+    out_dir/<이름>.tsv (jsonl 이면 .jsonl) 로 파일마다 따로 쓴다. 실패한 파일 수를 돌려준다.
+    names: out_dir 아래 이름 (expand_inputs 가 채운 것, 없으면 파일 이름).
+    출력 경로가 겹치면 컴파일 전에 ValueError.
+    options 는 compile_file() 로 그대로 넘어간다 (fast, stream, targets, keep_going, fmt).
+    파일별 진단은 diagnostics (list) 에 모으고, out_dir 가 있으면
+    진단이 있는 파일마다 <이름>.errors.txt 도 쓴다.
+    inventory: 워커에서 set_inventory() 에 넘길 (path, on_unknown, keep_going)
+    """
+    out_paths = [None] * len(files)
+    if out_dir is not None:
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        if names is None:
+            names = [Path(f.name) for f in files]
+        suffix = "." + options.get("fmt", "tsv")
+        out_paths = output_paths(out_dir, files, names, suffix)
+
+    m = metrics.active()
+    if jobs == 1:
+        results = map(partial(compile_file, **options), files, out_paths)
+        pool = None
+    else:
+        work = compile_file if m is None else _compile_file_profiled
+        pool = ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(tuple(plugins), options.get("targets"), m is not None, inventory),
+        )
+        results = pool.map(partial(work, **options), files, out_paths)
+
+    failed = 0
+    try:
+        for out_path, result in zip(out_paths, results):
+            if m is not None and pool is not None:
+                result, snapshot = result
+                m.merge(snapshot)
+            path, text, error, found = result
+            if found:
+                if diagnostics is not None:
+                    diagnostics.extend(found)
+                if out_path is not None:
+                    write_report(found, out_path.with_suffix(".errors.txt"))
+            if error is not None:
+                failed += 1
+                print(f"=== {path}: FAILED ===", file=sys.stderr)
+                print(error, end="", file=sys.stderr)
+            elif text is not None:
+                print(f"# {path}")
+                sys.stdout.write(text)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    print(f"=== {len(files)} files, {failed} failed ===", file=sys.stderr)
+    return failed
 
 
 def main():
@@ -372,22 +1021,352 @@ def main():
         description="IntentLang compiler: Intent → JSON → P4/Cisco/Linux"
     )
     ap.add_argument(
-        "file",
-        nargs="?",
-        help="IntentLang 프로그램 파일 (없으면 기본 샘플 사용)",
+        "files",
+        nargs="*",
+        metavar="file",
+        help="IntentLang 프로그램 파일 또는 디렉터리 "
+        "(없으면 기본 샘플 사용, '-' 는 stdin)",
+    )
+    ap.add_argument(
+        "--stream",
+        action="store_true",
+        help="한 줄씩 읽고 컴파일해서 바로 출력 (메모리 사용량 일정)",
+    )
+    ap.add_argument(
+        "--fast",
+        action="store_true",
+        help="고정 모양 문장은 lark 대신 빠른 인식기로 처리",
+    )
+    ap.add_argument(
+        "--cache",
+        metavar="PATH",
+        help="문장 단위 증분 캐시 파일 (sqlite). 바뀐 줄만 다시 컴파일",
+    )
+    ap.add_argument(
+        "--cache-size",
+        type=int,
+        default=1_000_000,
+        help="캐시 최대 항목 수 (넘으면 LRU 로 정리, 기본 1000000)",
+    )
+    ap.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="여러 파일을 컴파일할 프로세스 수 (기본: CPU 수)",
+    )
+    ap.add_argument(
+        "--glob",
+        default="*.intent",
+        help="디렉터리 입력에서 고를 파일 패턴 (기본 *.intent)",
+    )
+    ap.add_argument(
+        "-o",
+        "--output",
+        metavar="PATH",
+        help="표를 stdout 대신 PATH 에 (UTF-8, 셸 인코딩과 무관)",
+    )
+    ap.add_argument(
+        "--format",
+        choices=writers.FORMATS,
+        default="tsv",
+        help="표 형식: tsv (기본) 또는 jsonl (문장마다 JSON 한 줄)",
+    )
+    ap.add_argument(
+        "--writer-thread",
+        action="store_true",
+        help="출력 쓰기를 별도 스레드에서 (컴파일과 겹쳐서)",
+    )
+    ap.add_argument(
+        "--out-dir",
+        metavar="DIR",
+        help="파일마다 DIR/<이름>.tsv 로 따로 출력",
+    )
+    ap.add_argument(
+        "--plugin",
+        action="append",
+        default=[],
+        metavar="MODULE",
+        help="추가 백엔드 모듈 import (모듈이 backends 레지스트리에 스스로 등록)",
+    )
+    ap.add_argument(
+        "--target",
+        metavar="LIST",
+        help="출력할 타깃 (쉼표 구분, 예: linux,json). "
+        "기본: json,p4,cisco,linux + 플러그인",
+    )
+    ap.add_argument(
+        "--profile",
+        action="store_true",
+        help="단계별/문장 종류별 시간, 호출 횟수, peak 메모리를 stderr 로 출력",
+    )
+    ap.add_argument(
+        "--metrics-json",
+        metavar="PATH",
+        help="--profile 과 같은 계측 결과를 JSON 파일로 저장",
+    )
+    ap.add_argument(
+        "--cprofile",
+        metavar="PATH",
+        help="cProfile 결과를 pstats 파일로 저장 ('-' 는 상위 25개를 stderr 로)",
+    )
+    ap.add_argument(
+        "-k",
+        "--keep-going",
+        action="store_true",
+        help="문법 에러가 난 문장은 건너뛰고 나머지를 모두 컴파일 "
+        "(에러는 모아서 stderr 로, 종료 코드 1)",
+    )
+    ap.add_argument(
+        "--errors",
+        metavar="PATH",
+        help="에러 보고서 파일 (.json 이면 JSON). --keep-going 을 켠다",
+    )
+    ap.add_argument(
+        "--inventory",
+        metavar="PATH",
+        help="호스트 인벤토리 (CSV/JSON, 또는 inventory.py build 로 만든 인덱스). "
+        "주면 HOST_MAP 대신 쓴다",
+    )
+    ap.add_argument(
+        "--unknown-host",
+        choices=UNKNOWN_POLICIES,
+        default="keep",
+        help="인벤토리에 없는 호스트 이름: keep (그대로, 기본), "
+        "warn (경고), error (에러로 중단)",
+    )
+    ap.add_argument(
+        "--config-dir",
+        metavar="DIR",
+        help="표 대신 타깃별 설정 파일 (linux.sh, cisco.cfg, ...) 을 DIR 에 생성. "
+        "ACL 은 중복/shadow 제거 후 묶는다",
+    )
+    ap.add_argument(
+        "--batch",
+        action="store_true",
+        help="--config-dir 에서 Linux 는 iptables-restore/nft/ip -batch/tc -batch "
+        "파일로 (적용은 linux.sh 가 도구마다 한 번씩)",
+    )
+    ap.add_argument(
+        "--validate",
+        action="store_true",
+        help="--config-dir 로 만든 batch 파일의 문법을 오프라인으로 확인 (linux_check.py)",
+    )
+    ap.add_argument(
+        "--state",
+        metavar="DIR",
+        help="--config-dir 에서 DIR 의 지난 스냅샷과 비교한 delta 파일 "
+        "(linux.delta.sh, cisco.delta.cfg, p4.delta.json, ...) 도 쓰고 이번 model 은 "
+        "pending 스냅샷으로 (적용한 뒤 --commit-state 또는 deploy.py --state)",
+    )
+    ap.add_argument(
+        "--commit-state",
+        metavar="DIR",
+        help="적용이 끝난 뒤 DIR 의 pending 스냅샷을 스냅샷으로 올리고 끝낸다 "
+        "(--target 으로 타깃 제한, 컴파일은 하지 않는다)",
+    )
+    ap.add_argument(
+        "--p4-table-size",
+        action="append",
+        default=[],
+        metavar="TABLE=N",
+        help="--config-dir 의 P4 테이블 크기 (여러 번 가능, 예: acl_table=2048). "
+        "항목이 크기를 넘으면 에러",
+    )
+    ap.add_argument(
+        "--check",
+        action="store_true",
+        help="백엔드 출력 전에 프로그램 전체 의미 검사 (중복, 모순, shadow 된 ACL, "
+        "겹치는 route, meter 충돌 ...) 를 진단으로",
+    )
+    ap.add_argument(
+        "--no-optimize",
+        action="store_true",
+        help="--config-dir 에서 ACL 최적화를 하지 않음 (문장 하나당 규칙 하나)",
     )
     args = ap.parse_args()
 
-    if args.file:
-        code = Path(args.file).read_text(encoding="utf-8")
-        intents = [line.strip() for line in code.splitlines() if line.strip()]
-    else:
-        # 기본 샘플
-        code = "\n".join(INTENTS)
-        intents = INTENTS
-
-    models = compile_intent(code)
-    print_table(models, intents)
+    m = metrics.enable() if args.profile or args.metrics_json else None
+    profiler = metrics.cprofile(args.cprofile) if args.cprofile else nullcontext()
+    try:
+        with profiler:
+            run(ap, args)
+    finally:
+        if m is not None:
+            if args.profile:
+                m.report()
+            if args.metrics_json:
+                m.write_json(args.metrics_json)
+
+
+def report_diagnostics(diagnostics, errors_path=None):
+    """진단 목록을 stderr 로, errors_path 가 있으면 보고서 파일로"""
+    if errors_path:
+        write_report(diagnostics, errors_path)
+    if diagnostics:
+        print_diagnostics(diagnostics)
+
+
+def run(ap, args):
+    for name in args.plugin:
+        backends.load_plugin(name)
+    targets = None
+    if args.target:
+        try:
+            targets = parse_targets(args.target)
+        except ValueError as e:
+            ap.error(str(e))
+    if args.commit_state:
+        promoted = delta.commit_state(args.commit_state, targets)
+        if not promoted:
+            sys.exit(f"error: no pending snapshot in {args.commit_state}")
+        print(f"=== state === committed={','.join(promoted)}", file=sys.stderr)
+        return
+    # --errors 만 줘도 에러 복구 모드
+    keep_going = bool(args.keep_going or args.errors)
+    diagnostics = [] if keep_going else None
+    inventory = None
+    if args.inventory or args.unknown_host != "keep":
+        inventory = (args.inventory, args.unknown_host, keep_going)
+        try:
+            set_inventory(*inventory)
+        except (OSError, ValueError) as e:
+            ap.error(f"--inventory: {e}")
+
+    if len(args.files) > 1 or args.out_dir or any(Path(f).is_dir() for f in args.files):
+        if args.config_dir:
+            ap.error("--config-dir 는 파일 하나를 컴파일할 때만 쓸 수 있습니다")
+        if args.cache:
+            ap.error("--cache 는 파일 하나를 컴파일할 때만 쓸 수 있습니다")
+        if args.output:
+            ap.error("-o 는 파일 하나를 컴파일할 때만 쓸 수 있습니다 (여러 파일은 --out-dir)")
+        if args.check:
+            ap.error("--check 는 파일 하나를 컴파일할 때만 쓸 수 있습니다")
+        names = []
+        files = expand_inputs(args.files, args.glob, names)
+        found = []
+        try:
+            failed = compile_files(
+                files,
+                args.jobs,
+                args.out_dir,
+                args.plugin,
+                found,
+                inventory,
+                names,
+                fast=args.fast,
+                stream=args.stream,
+                targets=targets,
+                keep_going=keep_going,
+                fmt=args.format,
+            )
+        except ValueError as e:
+            ap.error(f"--out-dir: {e}")
+        if found or args.errors:
+            report_diagnostics(found, args.errors)
+        sys.exit(1 if failed or count_severity(found) else 0)
+
+    if args.config_dir and (args.stream or args.cache or args.output):
+        ap.error("--config-dir 는 --stream/--cache/-o 와 같이 쓸 수 없습니다")
+    if args.check and (args.stream or args.cache):
+        ap.error("--check 는 프로그램 전체가 필요하므로 --stream/--cache 와 같이 쓸 수 없습니다")
+    if (args.batch or args.validate or args.state) and not args.config_dir:
+        ap.error("--batch/--validate/--state 는 --config-dir 와 같이 써야 합니다")
+    if args.p4_table_size:
+        # P4 백엔드는 고른 타깃일 때만 import 한다 (--target linux 등에서는 안 씀)
+        from backends import p4_runtime
+
+        try:
+            p4_runtime.set_table_sizes(p4_runtime.parse_table_sizes(args.p4_table_size))
+        except ValueError as e:
+            ap.error(f"--p4-table-size: {e}")
+    args.file = args.files[0] if args.files else None
+    try:
+        warnings = compile_single(args, targets, diagnostics)
+    except UnknownHostError as e:
+        # --unknown-host error (--keep-going 없이): 첫 미등록 이름에서 멈춘다
+        sys.exit(f"error: {e}")
+    except IntentValueError as e:
+        # --keep-going 없이: 문법 에러처럼 첫 에러에서 멈춘다
+        sys.exit(f"error: {e}")
+
+    found = (diagnostics or []) + warnings + unknown_host_diagnostics()
+    for diag in found:
+        if diag.path is None:
+            diag.path = "<stdin>" if args.file == "-" else args.file
+    if found or args.errors:
+        report_diagnostics(found, args.errors)
+    if count_severity(found):
+        sys.exit(1)
+
+
+def compile_single(args, targets, diagnostics):
+    if args.stream or args.cache:
+        cache = None
+        if args.cache:
+            cache = StatementCache(
+                args.cache,
+                cache_fingerprint(targets),
+                args.cache_size,
+                namespace=",".join(b.name for b in get_emitter(targets).backends),
+            )
+        try:
+            with writers.open_output(args.output) as out:
+                table = partial(
+                    stream_table, out=out, targets=targets, fmt=args.format,
+                    thread=args.writer_thread,
+                )
+                if args.file == "-":
+                    table(iter_rows(sys.stdin, args.fast, cache, targets, diagnostics))
+                elif args.file:
+                    with open(args.file, encoding="utf-8") as f:
+                        table(iter_rows(f, args.fast, cache, targets, diagnostics))
+                else:
+                    table(iter_rows(INTENTS, args.fast, cache, targets, diagnostics))
+        finally:
+            if cache is not None:
+                cache.close()
+                stats = " ".join(f"{k}={v}" for k, v in cache.stats().items())
+                print(f"=== Cache === {stats}", file=sys.stderr)
+        return []
+
+    with metrics.stage("read"):
+        if args.file == "-":
+            code = sys.stdin.read()
+        elif args.file:
+            code = Path(args.file).read_text(encoding="utf-8")
+        else:
+            # 기본 샘플
+            code = "\n".join(INTENTS)
+
+    models = compile_intent(code, fast=args.fast, diagnostics=diagnostics)
+    warnings = []
+    if args.check:
+        with metrics.stage("semantics"):
+            warnings.extend(check_semantics(models, code, diagnostics or ()))
+    if args.config_dir:
+        stats = write_configs(
+            models,
+            args.config_dir,
+            targets,
+            not args.no_optimize,
+            warnings,
+            args.batch,
+            args.state,
+            args.writer_thread,
+            args.check,
+            input_errors(diagnostics or ()),
+        )
+        for name, values in stats.items():
+            line = " ".join(f"{k}={v}" for k, v in values.items())
+            print(f"=== {name} === {line}", file=sys.stderr)
+        if args.validate:
+            warnings.extend(linux_check.check_dir(args.config_dir))
+        return warnings
+    intents = source_lines(code, diagnostics or ())
+    with writers.open_output(args.output) as out:
+        print_table(models, intents, out, targets, args.format, args.writer_thread)
+    return warnings
 
 
 if __name__ == "__main__":
@@ -0,0 +1,234 @@
+# delta.py
+#
+# 지난 배포 이후 바뀐 것만 내보내기 (--config-dir DIR --state STATE)
+#
+#   STATE/<타깃>.snapshot.jsonl          마지막으로 적용한 semantic model (문장 순서 그대로)
+#   STATE/<타깃>.snapshot.pending.jsonl  이번 실행의 model (적용이 끝나면 위로 올린다)
+#   STATE/<타깃>.state[.pending].json    백엔드가 다음 배포로 넘기는 값 (P4 ACL priority)
+#   DIR/<파일>.delta.<확장자>             이번 model 과의 차이만 (linux.delta.sh, ...)
+#
+# 비교는 ir 문장 (주소는 int 로 정규화된 값) 의 hash 로 하는 집합 차이라서 문장 수에
+# 선형이다. 스냅샷은 전체 출력과 같은 pass (ACL 묶기, route 합치기) 를 다시 돌릴 수
+# 있게 순서와 중복까지 그대로 둔다 (ipset / object-group 이름이 문장 위치에서 나온다).
+# 타깃마다 @BACKEND.delta 로 등록한 함수가 (old Passes, new Passes) 를 받아
+# 자기 단위 (iptables 규칙, ACE, P4 항목 ...) 로 다시 비교해서 안전한 순서로 쓴다:
+#   의존하는 것 (VLAN) 을 먼저 만들고, 지운 뒤 넣고, 의존되는 것은 마지막에 지운다.
+# delta 와 스냅샷은 에러가 없을 때만 쓴다 (입력 에러도 포함).
+# 컴파일만 하고 적용하지 않았거나 적용이 실패하면 스냅샷은 그대로라서 다음 delta 도
+# 장치에 실제로 있는 것과 비교한다. pending 은 deploy.py --state 가 (그 타깃의 장치가
+# 모두 성공했을 때) 또는 compiler.py --commit-state 가 스냅샷으로 올린다.
+
+from pathlib import Path
+import bisect
+import json
+
+import ir
+import writers
+from diagnostics import WARNING, Diagnostic, count_severity
+from passes import Passes
+
+
+def diff(old, new):
+    """
+    (old 에만 있는 것 (old 순서), new 에만 있는 것 (new 순서)).
+    원소는 hash 가능해야 한다. 같은 원소가 여러 번 있어도 한 번으로 본다.
+    """
+    old_set, new_set = set(old), set(new)
+    removed = [x for x in dict.fromkeys(old) if x not in new_set]
+    added = [x for x in dict.fromkeys(new) if x not in old_set]
+    return removed, added
+
+
+def reordered(old, new) -> set:
+    """
+    양쪽에 다 있지만 순서가 바뀐 원소 (위치가 중요한 목록, 예: iptables 규칙).
+    new 순서로 본 old 위치들의 가장 긴 증가 부분열에 들지 못한 것. O(n log n)
+    """
+    where = {x: i for i, x in enumerate(old)}
+    kept = [x for x in dict.fromkeys(new) if x in where]
+    tails, tail_at, prev = [], [], [None] * len(kept)
+    for k, x in enumerate(kept):
+        pos = bisect.bisect_left(tails, where[x])
+        if pos == len(tails):
+            tails.append(where[x])
+            tail_at.append(k)
+        else:
+            tails[pos] = where[x]
+            tail_at[pos] = k
+        prev[k] = tail_at[pos - 1] if pos else None
+    in_order = set()
+    k = tail_at[-1] if tail_at else None
+    while k is not None:
+        in_order.add(kept[k])
+        k = prev[k]
+    return {x for x in kept if x not in in_order}
+
+
+ADD = "add"
+REMOVE = "remove"
+
+
+# 다른 문장보다 먼저 만들고 나중에 지우는 것 (VLAN, 규칙이 쓰는 그룹)
+_CREATES = (ir.VlanCreate, ir.VlanRangeCreate, ir.HostGroup)
+_DELETES = (ir.VlanDelete, ir.VlanRangeDelete)
+
+
+def _is_vlan_removal(op, model) -> bool:
+    cls = type(model)
+    return (op == REMOVE and cls in _CREATES) or (op == ADD and cls in _DELETES)
+
+
+def ordered_ops(old, new) -> list:
+    """
+    문장 단위 [(ADD|REMOVE, model)]: 새 VLAN / 그룹 → 지우기 (old 역순) → 넣기 (new 순서)
+    → VLAN / 그룹 지우기. 같은 키 (prefix, 호스트) 가 바뀐 것은 지운 뒤 넣는다.
+    """
+    removed, added = diff(old, new)
+    ops = [(REMOVE, m) for m in reversed(removed)] + [(ADD, m) for m in added]
+    first = [(op, m) for op, m in ops if op == ADD and type(m) in _CREATES]
+    last = [(op, m) for op, m in ops if _is_vlan_removal(op, m)]
+    middle = [
+        (op, m)
+        for op, m in ops
+        if not _is_vlan_removal(op, m) and not (op == ADD and type(m) in _CREATES)
+    ]
+    return first + middle + last
+
+
+# -----------------------------
+# 스냅샷
+# -----------------------------
+SNAPSHOT_SUFFIX = ".snapshot.jsonl"
+PENDING_SUFFIX = ".snapshot.pending.jsonl"
+STATE_SUFFIX = ".state.json"
+PENDING_STATE_SUFFIX = ".state.pending.json"
+
+
+def snapshot_path(state_dir, backend) -> Path:
+    return Path(state_dir) / f"{backend.name}{SNAPSHOT_SUFFIX}"
+
+
+def pending_path(state_dir, backend) -> Path:
+    return Path(state_dir) / f"{backend.name}{PENDING_SUFFIX}"
+
+
+def load_snapshot(path) -> list:
+    """없으면 빈 목록 (처음 배포: 전부 추가)"""
+    try:
+        f = open(path, encoding="utf-8")
+    except FileNotFoundError:
+        return []
+    with f:
+        return [ir.from_dict(json.loads(line)) for line in f if line.strip()]
+
+
+def save_snapshot(path, models):
+    # 쓰다가 멈춰도 지난 스냅샷이 남도록 임시 파일에 쓰고 바꾼다
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for model in models:
+            f.write(json.dumps(model.to_dict()) + "\n")
+    tmp.replace(path)
+
+
+def load_states(state_dir, selected) -> dict:
+    """타깃 이름 -> 지난 배포에서 넘겨받은 값 (passes.state). 없으면 빠진다"""
+    states = {}
+    for backend in selected:
+        try:
+            text = (Path(state_dir) / f"{backend.name}{STATE_SUFFIX}").read_text("utf-8")
+        except FileNotFoundError:
+            continue
+        states[backend.name] = json.loads(text)
+    return states
+
+
+def _save_state(path, value):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(value), encoding="utf-8")
+    tmp.replace(path)
+
+
+def commit_state(state_dir, names=None) -> list:
+    """
+    적용이 끝난 타깃의 pending 스냅샷을 스냅샷으로 올린다 (names 가 None 이면 있는 것 전부).
+    돌려주는 값: 올린 타깃 이름 (pending 이 없는 타깃은 빠진다)
+    """
+    state_dir = Path(state_dir)
+    if names is None:
+        names = sorted(
+            p.name.removesuffix(PENDING_SUFFIX) for p in state_dir.glob("*" + PENDING_SUFFIX)
+        )
+    promoted = []
+    for name in names:
+        pending = state_dir / f"{name}{PENDING_SUFFIX}"
+        try:
+            pending.replace(state_dir / f"{name}{SNAPSHOT_SUFFIX}")
+        except FileNotFoundError:
+            continue
+        # 백엔드 값은 스냅샷과 같이 (이번 실행에 없었으면 지난 것도 지운다)
+        state = state_dir / f"{name}{STATE_SUFFIX}"
+        try:
+            (state_dir / f"{name}{PENDING_STATE_SUFFIX}").replace(state)
+        except FileNotFoundError:
+            state.unlink(missing_ok=True)
+        promoted.append(name)
+    return promoted
+
+
+def delta_filename(backend) -> str:
+    # linux.sh -> linux.delta.sh
+    stem, dot, suffix = backend.filename.rpartition(".")
+    if not dot:
+        return f"{backend.filename}.delta"
+    return f"{stem}.delta.{suffix}"
+
+
+def write_deltas(passes, state_dir, out_dir, selected, diagnostics=None, failed=False) -> dict:
+    """
+    타깃마다 스냅샷과 비교한 delta 파일을 out_dir 에 쓰고 이번 model 을 pending
+    스냅샷으로 남긴다 (스냅샷은 적용이 끝난 뒤 commit_state 로 바꾼다).
+    돌려주는 값: {타깃 이름: 통계 dict}
+    failed: 입력에 에러가 있었음 (-k 로 건너뛴 문법 에러, 미등록 호스트 등).
+    에러가 있으면 delta 도 pending 도 쓰지 않는다: 건너뛴 문장이 이미 배포된 것이면
+    delta 가 그것을 지우고 스냅샷에서도 빠지기 때문이다. 지난 delta 파일과 pending 은
+    지운다 (예전 실행의 pending 이 나중에 올라가지 않게).
+    """
+    # 백엔드 진단 (P4 용량 초과 등) 이 있어도 배포하지 않을 것이므로 같다
+    if failed or count_severity(passes.diagnostics):
+        for backend in selected:
+            (Path(out_dir) / delta_filename(backend)).unlink(missing_ok=True)
+            pending_path(state_dir, backend).unlink(missing_ok=True)
+            (Path(state_dir) / f"{backend.name}{PENDING_STATE_SUFFIX}").unlink(missing_ok=True)
+        if diagnostics is not None:
+            where = "input" if failed else "generated config"
+            diagnostics.append(
+                Diagnostic(
+                    f"delta files not written, state in {state_dir} not updated "
+                    f"(errors in {where})",
+                    severity=WARNING,
+                    code="delta",
+                )
+            )
+        return {}
+
+    new = passes.models
+    stats = {}
+    for backend in selected:
+        old = load_snapshot(snapshot_path(state_dir, backend))
+        removed, added = diff(old, new)
+        before = Passes(old, passes.optimize)
+        before.state = passes.state  # 지난 배포에 쓴 값 그대로
+        with writers.open_output(Path(out_dir) / delta_filename(backend)) as f:
+            values = backend.emit_delta(before, passes, f)
+        values = {"removed": len(removed), "added": len(added), **values}
+        stats[backend.name] = values
+        save_snapshot(pending_path(state_dir, backend), new)
+        state = Path(state_dir) / f"{backend.name}{PENDING_STATE_SUFFIX}"
+        if backend.name in passes.next_state:
+            _save_state(state, passes.next_state[backend.name])
+        else:
+            state.unlink(missing_ok=True)
+    return stats
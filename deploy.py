@@ -0,0 +1,361 @@
+# deploy.py
+#
+# 설정 파일 (compiler.py --config-dir) 을 장치 여러 대에 동시에 적용 (asyncio)
+#
+#   python deploy.py devices.csv out/ --transport local --exec "ssh {address} sh"
+#   python deploy.py devices.csv out/ --delta        # linux.delta.sh, cisco.delta.cfg, ...
+#   python deploy.py devices.csv out/ --delta --state state/   # 성공한 타깃의 스냅샷 갱신
+#   python deploy.py devices.csv out/ --transport mock --mock-latency 0.05 --mock-fail 0.1
+#
+# devices.csv: name,target[,address] (헤더가 없으면 이 순서). target 은 백엔드 이름
+# (linux, cisco, p4, json, 플러그인) 이고 그 타깃의 설정 파일이 장치의 payload 가 된다.
+# 같은 장치가 여러 줄이면 payload 를 그 순서대로 하나씩 적용한다 (payload 마다 그 줄의
+# target / address 로).
+#
+#   - 장치 하나의 payload 는 항상 순서대로 (앞의 것이 끝나야 다음 것)
+#   - 장치끼리는 semaphore 로 최대 -j 개까지 동시에
+#   - 실패하면 지수 backoff (+ jitter) 뒤 --retries 번까지 다시 (기다리는 동안 자리는 비운다)
+#   - 장치마다 시작/끝 시각, 시도 횟수, 에러를 남긴다
+# 그래서 전체 시간은 장치 시간의 합이 아니라 가장 느린 장치 쪽으로 수렴한다.
+#
+# transport 는 apply(device, payload) 코루틴 하나만 있으면 된다:
+#   LocalTransport  장치마다 명령 하나를 실행하고 payload 를 stdin 으로 넣는다
+#   MockTransport   메모리에만 기록 (지연 / 실패 확률) — 장비 없이 확인할 때
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+import argparse
+import asyncio
+import csv
+import json
+import random
+import sys
+import time
+
+import backends
+import delta
+
+# 장치 파일의 열 이름 (헤더가 없으면 이 순서)
+_COLUMNS = ("name", "target", "address")
+
+
+class DeployError(Exception):
+    pass
+
+
+class Device:
+    __slots__ = ("name", "target", "address")
+
+    def __init__(self, name, target, address=None):
+        self.name = name
+        self.target = target
+        self.address = address or name
+
+    def __repr__(self):
+        return f"Device({self.name!r}, {self.target!r}, {self.address!r})"
+
+
+def load_devices(path) -> list:
+    """devices.csv → [Device]. 같은 이름이 여러 번 나와도 그대로 (payload 순서)"""
+    devices = []
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = [r for r in csv.reader(f) if r and not r[0].startswith("#")]
+    if not rows:
+        return devices
+    header = [c.strip().lower() for c in rows[0]]
+    if "name" in header and "target" in header:
+        cols = [header.index(c) if c in header else None for c in _COLUMNS]
+        rows = rows[1:]
+    else:
+        cols = [0, 1, 2]
+    for row in rows:
+        if len(row) < 2:
+            raise ValueError(f"{path}: expected name,target[,address]: {','.join(row)}")
+        values = [row[c].strip() if c is not None and c < len(row) else None for c in cols]
+        devices.append(Device(*values))
+    return devices
+
+
+# -----------------------------
+# transport
+# -----------------------------
+class Transport(ABC):
+    @abstractmethod
+    async def apply(self, device, payload: str):
+        """payload 를 장치에 적용. 실패하면 DeployError"""
+
+    async def close(self):
+        pass
+
+
+class LocalTransport(Transport):
+    """
+    장치마다 command 를 shell 로 실행하고 payload 를 stdin 으로 넣는다.
+    command 안의 {name} {address} {target} 은 장치 값으로 바뀐다.
+    """
+
+    def __init__(self, command, timeout=None):
+        self.command = command
+        self.timeout = timeout
+
+    async def apply(self, device, payload):
+        command = self.command.format(
+            name=device.name, address=device.address, target=device.target
+        )
+        proc = await asyncio.create_subprocess_shell(
+            command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            _, err = await asyncio.wait_for(
+                proc.communicate(payload.encode("utf-8")), self.timeout
+            )
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise DeployError(f"timed out after {self.timeout}s") from None
+        if proc.returncode != 0:
+            lines = err.decode("utf-8", "replace").strip().splitlines()
+            detail = lines[-1] if lines else "no output"
+            raise DeployError(f"exit status {proc.returncode}: {detail}")
+
+
+class MockTransport(Transport):
+    """
+    메모리에만 적용한다. applied[장치 이름] = [payload, ...] (적용된 순서).
+    latency: 초 (또는 device -> 초 함수), fail_rate: 시도마다 실패할 확률
+    """
+
+    def __init__(self, latency=0.0, fail_rate=0.0, seed=None):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.applied = {}
+        self.calls = 0
+
+    async def apply(self, device, payload):
+        self.calls += 1
+        latency = self.latency(device) if callable(self.latency) else self.latency
+        if latency:
+            await asyncio.sleep(latency)
+        if self.fail_rate and self.random.random() < self.fail_rate:
+            raise DeployError("mock failure")
+        self.applied.setdefault(device.name, []).append(payload)
+
+
+# -----------------------------
+# 실행
+# -----------------------------
+class Result:
+    """
+    장치 하나의 결과. started/finished 는 deploy() 시작부터의 초.
+    targets: payload 들의 타깃 (처음 나온 순서, 중복 없이)
+    """
+
+    __slots__ = (
+        "device", "targets", "ok", "attempts", "applied", "started", "finished", "error"
+    )
+
+    def __init__(self, device, targets=()):
+        self.device = device
+        self.targets = list(targets) or [device.target]
+        self.ok = False
+        self.attempts = 0
+        self.applied = 0  # 끝까지 적용된 payload 수
+        self.started = None
+        self.finished = None
+        self.error = None
+
+    @property
+    def seconds(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    def to_dict(self) -> dict:
+        return {
+            "device": self.device.name,
+            "target": ",".join(self.targets),
+            "ok": self.ok,
+            "attempts": self.attempts,
+            "applied": self.applied,
+            "seconds": round(self.seconds, 6),
+            "error": self.error,
+        }
+
+
+class Executor:
+    def __init__(self, transport, concurrency=32, retries=3, backoff=0.5, max_backoff=30.0):
+        self.transport = transport
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.random = random.Random()
+
+    def _delay(self, attempt) -> float:
+        # 지수 backoff + full jitter (같이 실패한 장치들이 한꺼번에 다시 몰리지 않게)
+        return self.random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    async def _device(self, device, payloads, sem, t0):
+        result = Result(device, dict.fromkeys(d.target for d, _ in payloads))
+        for target, payload in payloads:
+            for attempt in range(1, self.retries + 2):
+                async with sem:
+                    if result.started is None:
+                        result.started = time.perf_counter() - t0
+                    result.attempts += 1
+                    try:
+                        await self.transport.apply(target, payload)
+                        error = None
+                    except DeployError as e:
+                        error = str(e)
+                    except OSError as e:
+                        error = f"{type(e).__name__}: {e}"
+                if error is None:
+                    break
+                result.error = error
+                if attempt <= self.retries:
+                    await asyncio.sleep(self._delay(attempt))
+            else:
+                # 재시도를 다 쓰면 이 장치의 남은 payload 는 적용하지 않는다 (순서 보장)
+                result.finished = time.perf_counter() - t0
+                return result
+            result.applied += 1
+        result.ok = True
+        result.error = None
+        result.finished = time.perf_counter() - t0
+        return result
+
+    async def run(self, jobs) -> list:
+        """
+        jobs: [(Device, [(Device, payload), ...])] → 같은 순서의 [Result].
+        payload 는 짝지은 Device (그 줄의 target / address) 로 적용한다.
+        """
+        sem = asyncio.Semaphore(self.concurrency)
+        t0 = time.perf_counter()
+        tasks = [self._device(device, payloads, sem, t0) for device, payloads in jobs]
+        try:
+            return await asyncio.gather(*tasks)
+        finally:
+            await self.transport.close()
+
+
+def deploy(jobs, transport, concurrency=32, retries=3, backoff=0.5) -> list:
+    """동기 진입점: [(Device, [(Device, payload), ...])] → [Result]"""
+    executor = Executor(transport, concurrency, retries, backoff)
+    return asyncio.run(executor.run(jobs))
+
+
+def jobs_from_dir(devices, config_dir, use_delta=False) -> list:
+    """
+    장치마다 타깃 설정 파일 내용을 payload 로. 같은 장치 이름은 한 job 으로 합치고
+    payload 마다 그 줄의 Device 를 짝지어 둔다 (타깃 / 주소가 줄마다 다를 수 있다).
+    파일은 타깃마다 한 번만 읽는다.
+    """
+    texts = {}
+    jobs = {}
+    for device in devices:
+        text = texts.get(device.target)
+        if text is None:
+            backend = backends.get_backend(device.target)
+            name = delta.delta_filename(backend) if use_delta else backend.filename
+            text = texts[device.target] = (Path(config_dir) / name).read_text(encoding="utf-8")
+        job = jobs.get(device.name)
+        if job is None:
+            job = jobs[device.name] = (device, [])
+        job[1].append((device, text))
+    return list(jobs.values())
+
+
+def applied_targets(results) -> list:
+    """장치가 모두 성공한 타깃 (실패한 장치의 타깃은 어느 payload 에서 멈췄든 뺀다)"""
+    targets = {t: None for r in results for t in r.targets}
+    failed = {t for r in results if not r.ok for t in r.targets}
+    return [t for t in targets if t not in failed]
+
+
+def summary(results, wall) -> dict:
+    times = [r.seconds for r in results]
+    return {
+        "devices": len(results),
+        "ok": sum(1 for r in results if r.ok),
+        "failed": sum(1 for r in results if not r.ok),
+        "attempts": sum(r.attempts for r in results),
+        "wall_s": round(wall, 3),
+        "slowest_s": round(max(times, default=0.0), 3),
+        "sum_s": round(sum(times), 3),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="apply generated configs to many devices")
+    ap.add_argument("devices", help="name,target[,address] CSV")
+    ap.add_argument("config_dir", help="compiler.py --config-dir 로 만든 디렉터리")
+    ap.add_argument("--delta", action="store_true", help="전체 파일 대신 *.delta.* 파일 (--state)")
+    ap.add_argument(
+        "--state",
+        metavar="DIR",
+        help="장치가 모두 성공한 타깃은 DIR 의 pending 스냅샷 (compiler.py --state) 을 "
+        "스냅샷으로 올린다",
+    )
+    ap.add_argument("-j", "--jobs", type=int, default=32, help="동시에 적용할 장치 수 (기본 32)")
+    ap.add_argument("--retries", type=int, default=3, help="장치마다 다시 시도할 횟수 (기본 3)")
+    ap.add_argument("--backoff", type=float, default=0.5, help="첫 재시도 대기 상한 (초)")
+    ap.add_argument("--transport", choices=("local", "mock"), default="local")
+    ap.add_argument(
+        "--exec",
+        default="sh",
+        metavar="CMD",
+        help="local: 장치마다 실행할 명령, payload 는 stdin ({name} {address} {target}). "
+        '예: "ssh {address} sh"',
+    )
+    ap.add_argument("--timeout", type=float, help="local: 시도 한 번의 제한 시간 (초)")
+    ap.add_argument("--mock-latency", type=float, default=0.0, help="mock: 적용마다 지연 (초)")
+    ap.add_argument("--mock-fail", type=float, default=0.0, help="mock: 실패 확률")
+    ap.add_argument("--report", metavar="PATH", help="장치별 결과 JSON")
+    ap.add_argument("--plugin", action="append", default=[], metavar="MODULE")
+    args = ap.parse_args()
+    if args.jobs < 1:
+        ap.error("--jobs 는 1 이상이어야 합니다")
+    if args.retries < 0:
+        ap.error("--retries 는 0 이상이어야 합니다")
+
+    for name in args.plugin:
+        backends.load_plugin(name)
+    try:
+        jobs = jobs_from_dir(load_devices(args.devices), args.config_dir, args.delta)
+    except (OSError, KeyError, ValueError) as e:
+        sys.exit(f"error: {e}")
+    if args.transport == "mock":
+        transport = MockTransport(args.mock_latency, args.mock_fail)
+    else:
+        transport = LocalTransport(args.exec, args.timeout)
+
+    t0 = time.perf_counter()
+    results = deploy(jobs, transport, args.jobs, args.retries, args.backoff)
+    wall = time.perf_counter() - t0
+    for r in results:
+        status = "ok" if r.ok else f"FAILED ({r.error})"
+        print(f"{r.device.name}\t{','.join(r.targets)}\t{r.attempts}\t{r.seconds:.3f}s\t{status}")
+    stats = summary(results, wall)
+    print("=== deploy === " + " ".join(f"{k}={v}" for k, v in stats.items()), file=sys.stderr)
+    if args.state:
+        # 실패한 타깃은 pending 을 남겨 둔다 (고친 뒤 compiler.py --commit-state)
+        ok = applied_targets(results)
+        committed = delta.commit_state(args.state, ok)
+        kept = sorted({t for r in results for t in r.targets} - set(ok))
+        print(
+            f"=== state === committed={','.join(committed)} kept={','.join(kept)}",
+            file=sys.stderr,
+        )
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"summary": stats, "devices": [r.to_dict() for r in results]}, f, indent=1)
+    sys.exit(1 if stats["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# diagnostics.py
+#
+# 컴파일 진단 (문법 에러 등) 을 모아서 보고하기 위한 클래스
+#
+#   site.intent:12:17: error: unexpected 'too', expected "to"
+#
+# --keep-going 으로 에러가 난 문장을 건너뛰고 계속 컴파일할 때 쓴다.
+
+import json
+import sys
+
+from lark import UnexpectedCharacters, UnexpectedEOF, UnexpectedToken
+
+ERROR = "error"
+WARNING = "warning"
+NOTE = "note"  # 참고 (--check 의 route-overlap 등), 종료 코드와 무관
+
+
+class Diagnostic:
+    """
+    line/column: 보고 위치 (1부터)
+    skipped: 복구하면서 버린 원문 줄 범위 (first, last), 없으면 None
+    """
+
+    __slots__ = ("severity", "code", "message", "line", "column", "source", "path", "skipped")
+
+    def __init__(
+        self,
+        message,
+        line=None,
+        column=None,
+        severity=ERROR,
+        code="syntax",
+        source=None,
+        path=None,
+        skipped=None,
+    ):
+        self.severity = severity
+        self.code = code
+        self.message = message
+        self.line = line
+        self.column = column
+        self.source = source
+        self.path = path
+        self.skipped = skipped
+
+    def __repr__(self):
+        return f"Diagnostic({self.format()!r})"
+
+    def location(self) -> str:
+        parts = [str(self.path) if self.path is not None else "<input>"]
+        if self.line is not None:
+            parts.append(str(self.line))
+            if self.column is not None:
+                parts.append(str(self.column))
+        return ":".join(parts)
+
+    def format(self) -> str:
+        return f"{self.location()}: {self.severity}: {self.message}"
+
+    def to_dict(self) -> dict:
+        d = {
+            "severity": self.severity,
+            "code": self.code,
+            "message": self.message,
+            "path": str(self.path) if self.path is not None else None,
+            "line": self.line,
+            "column": self.column,
+            "source": self.source,
+        }
+        return {k: v for k, v in d.items() if v is not None}
+
+
+# -----------------------------
+# lark 예외 → Diagnostic
+# -----------------------------
+def _expected(names, terminals):
+    shown = sorted(terminals.get(n, n) for n in names if n != "$END")
+    if "$END" in names:
+        shown.append("end of input")
+    if len(shown) > 6:
+        shown = shown[:6] + ["..."]
+    return ", ".join(shown)
+
+
+def syntax_error(e, text, terminals=None, line=None) -> Diagnostic:
+    """
+    lark UnexpectedInput 하나를 Diagnostic 으로.
+    terminals: {터미널 이름: 표시용 문자열} (예: ALLOW -> '"allow"')
+    line: text 가 한 줄뿐일 때 파일 기준 줄 번호
+    """
+    terminals = terminals or {}
+    if isinstance(e, UnexpectedToken) and e.token.type == "$END":
+        message = f"unexpected end of input, expected {_expected(e.expected, terminals)}"
+    elif isinstance(e, UnexpectedToken):
+        message = f"unexpected {str(e.token)!r}, expected {_expected(e.expected, terminals)}"
+    elif isinstance(e, UnexpectedCharacters):
+        message = f"unexpected character {e.char!r}"
+    elif isinstance(e, UnexpectedEOF):
+        message = "unexpected end of input"
+    else:
+        message = str(e).strip().splitlines()[0]
+
+    lineno = getattr(e, "line", None)
+    column = getattr(e, "column", None)
+    if not isinstance(lineno, int) or lineno < 1:
+        lineno = column = None
+    source = None
+    pos = getattr(e, "pos_in_stream", None)
+    if lineno is not None and pos is not None and 0 <= pos <= len(text):
+        # 프로그램 전체를 줄로 나누지 않는다 (에러마다 O(전체) 가 된다)
+        start = text.rfind("\n", 0, pos) + 1
+        end = text.find("\n", pos)
+        source = text[start : len(text) if end < 0 else end].rstrip("\r")
+    elif lineno is not None:
+        lines = text.split("\n")
+        if lineno <= len(lines):
+            source = lines[lineno - 1].rstrip("\r")
+    if line is not None:
+        lineno = line
+    return Diagnostic(message, lineno, column, source=source)
+
+
+def terminal_names(parser) -> dict:
+    """키워드 터미널은 원문 그대로 ("allow"), 나머지는 이름 (IDENT)"""
+    names = {}
+    for t in parser.terminals:
+        if t.pattern.type == "str":
+            names[t.name] = f'"{t.pattern.value}"'
+    return names
+
+
+# -----------------------------
+# 보고서
+# -----------------------------
+def count_severity(diagnostics, severity=ERROR) -> int:
+    return sum(1 for d in diagnostics if d.severity == severity)
+
+
+def print_diagnostics(diagnostics, out=None):
+    out = out or sys.stderr
+    for d in diagnostics:
+        print(d.format(), file=out)
+    errors = count_severity(diagnostics)
+    warnings = count_severity(diagnostics, WARNING)
+    print(f"=== {errors} errors, {warnings} warnings ===", file=out)
+
+
+def write_report(diagnostics, path):
+    """path 가 .json 이면 JSON, 아니면 줄마다 'file:line:col: error: ...' + 원문"""
+    with open(path, "w", encoding="utf-8") as f:
+        if str(path).endswith(".json"):
+            report = {
+                "errors": count_severity(diagnostics),
+                "warnings": count_severity(diagnostics, WARNING),
+                "diagnostics": [d.to_dict() for d in diagnostics],
+            }
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+            return
+        for d in diagnostics:
+            f.write(d.format() + "\n")
+            if d.source is not None:
+                f.write(f"    {d.source}\n")
+                if d.column is not None:
+                    f.write("    " + " " * (d.column - 1) + "^\n")
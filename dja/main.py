@@ -6,15 +6,42 @@ import json
 import sys
 import argparse
 
+# backends/, ir.py 는 저장소 루트에 있다 (compiler.py 와 공유)
+sys.path.insert(1, str(Path(__file__).resolve().parent.parent))
+
 from json_to_linux import json_to_linux
 from json_to_p4 import json_to_p4
 from json_to_cisco import json_to_cisco
+import parser_cache  # 파서 캐시는 compiler.py 와 같이 쓴다
 
 # -----------------------------
 # 1) Lark 파서 준비
 # -----------------------------
-GRAMMAR = Path("intentlang.lark").read_text(encoding="utf-8")
-parser = Lark(GRAMMAR, parser="lalr", start="start")
+# 문법 파일은 현재 디렉터리가 아니라 이 모듈 위치 기준으로 찾는다.
+GRAMMAR_PATH = Path(__file__).resolve().parent / "intentlang.lark"
+GRAMMAR = GRAMMAR_PATH.read_text(encoding="utf-8")
+
+_parser = None
+
+
+def build_parser(**options) -> Lark:
+    """이 디렉터리 문법의 LALR 파서 (디스크 캐시는 parser_cache)"""
+    return parser_cache.build_parser(GRAMMAR, **options)
+
+
+def get_parser() -> Lark:
+    """처음 필요할 때 한 번만 파서를 만든다."""
+    global _parser
+    if _parser is None:
+        _parser = build_parser()
+    return _parser
+
+
+def __getattr__(name):
+    # 예전 코드의 `main.parser` 접근 호환용
+    if name == "parser":
+        return get_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # host명 -> IP 매핑
 HOST_MAP = {
@@ -146,7 +173,7 @@ class IntentToJSON(Transformer):
 
 def compile_intent(code: str):
     try:
-        tree = parser.parse(code)
+        tree = get_parser().parse(code)
     except UnexpectedInput as e:
         print("=== Parse Error ===", file=sys.stderr)
         print(e.get_context(code), file=sys.stderr)
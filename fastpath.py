@@ -0,0 +1,116 @@
+# fastpath.py
+#
+# IntentLang 빠른 인식기
+#
+# intentlang.lark 의 문장은 모두 "고정 키워드 + 변수 슬롯 1~2개" 모양이라
+# 첫 단어로 모양을 고르고 공백으로 자른 토큰을 비교하는 것만으로 인식된다.
+# 인식 못 한 줄은 None 을 돌려주고, 호출 쪽이 lark 파서로 넘긴다.
+# (그래서 에러 메시지는 항상 lark 경로와 같다)
+#
+# model 은 IntentToJSON 의 메서드를 그대로 불러서 만들기 때문에
+# lark 경로와 결과가 같다.
+
+import re
+
+# common.WS 와 같은 공백 집합
+_WS = re.compile(r"[ \t\f\r\n]+")
+
+_IDENT = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*\Z")
+_IPADDR = re.compile(r"[0-9]+(\.[0-9]+){3}(\/[0-9]+)?\Z")
+_NUMBER = re.compile(r"[0-9]+\Z")
+_RATE = re.compile(r"([0-9]+)Mbps\Z")
+
+# 슬롯 종류
+HOST = "HOST"
+ENDPOINT = "ENDPOINT"
+NUMBER = "NUMBER"
+RATE = "RATE"  # NUMBER 바로 뒤에 붙은 "Mbps"
+IDENT = "IDENT"
+IPADDR = "IPADDR"
+
+# 첫 키워드 -> (규칙 이름, 토큰 모양)
+SHAPES = {
+    "allow": ("allow_stmt", ("allow", "tcp", "from", ENDPOINT, "to", ENDPOINT)),
+    "block": ("block_stmt", ("block", "icmp")),
+    "limit": ("limit_stmt", ("limit", "bandwidth", RATE, "for", HOST)),
+    "assign": ("qos_stmt", ("assign", "qos", "high", "to", "vlan", NUMBER)),
+    "ensure": (
+        "connectivity_stmt",
+        ("ensure", "connectivity", "between", HOST, "and", HOST),
+    ),
+    "create": ("create_vlan_stmt", ("create", "vlan", NUMBER, "name", IDENT)),
+    "delete": ("delete_vlan_stmt", ("delete", "vlan", NUMBER)),
+    "set": ("route_stmt", ("set", "route", IPADDR, "via", IPADDR)),
+    "monitor": ("monitor_stmt", ("monitor", "latency", "between", HOST, "and", HOST)),
+    "backup": ("backup_stmt", ("backup", "configuration", "now")),
+}
+
+
+class FastRecognizer:
+    """
+    recognize(line) -> [model] 또는 None (lark 로 넘겨야 함)
+    transformer 는 IntentToJSON 인스턴스
+    """
+
+    def __init__(self, transformer):
+        t = transformer
+
+        def host(tok):
+            if _IDENT.match(tok):
+                return t.host([t.IDENT(tok)])
+            if _IPADDR.match(tok):
+                return t.host([t.IPADDR(tok)])
+            return None
+
+        def endpoint(tok):
+            h = host(tok)
+            return None if h is None else t.endpoint([h])
+
+        def number(tok):
+            return t.NUMBER(tok) if _NUMBER.match(tok) else None
+
+        def rate(tok):
+            m = _RATE.match(tok)
+            return t.NUMBER(m.group(1)) if m else None
+
+        def ident(tok):
+            return t.IDENT(tok) if _IDENT.match(tok) else None
+
+        def ipaddr(tok):
+            return t.IPADDR(tok) if _IPADDR.match(tok) else None
+
+        slots = {
+            HOST: host,
+            ENDPOINT: endpoint,
+            NUMBER: number,
+            RATE: rate,
+            IDENT: ident,
+            IPADDR: ipaddr,
+        }
+        # 모양마다 (길이, [(위치, 키워드 또는 슬롯 함수)], 규칙 메서드)
+        self._table = {}
+        for first, (rule, shape) in SHAPES.items():
+            parts = [(i, slots.get(p, p)) for i, p in enumerate(shape)]
+            self._table[first] = (len(shape), parts, getattr(t, rule))
+
+    def recognize(self, line: str):
+        toks = _WS.split(line.strip())
+        entry = self._table.get(toks[0])
+        if entry is None:
+            return None
+        size, parts, rule = entry
+        if len(toks) != size:
+            return None
+
+        items = []
+        for i, part in parts:
+            tok = toks[i]
+            if isinstance(part, str):
+                if tok != part:
+                    return None
+            else:
+                value = part(tok)
+                if value is None:
+                    return None
+                items.append(value)
+        return [rule(items)]
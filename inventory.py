@@ -0,0 +1,303 @@
+# inventory.py
+#
+# 호스트 인벤토리 (이름 → IPv4)
+#
+# HOST_MAP 처럼 dict 로 들고 있기에는 너무 큰 인벤토리 (수십만~수백만 호스트) 를
+# 정렬된 디스크 인덱스로 만들어 두고 mmap 으로 연다.
+#
+#   python inventory.py build hosts.csv -o hosts.idx     # CSV/JSON → 인덱스
+#   python inventory.py lookup hosts.idx web01 db07
+#   python compiler.py --inventory hosts.idx --unknown-host warn site.intent
+#
+# 인덱스 파일 형식 (little-endian)
+#   header  : magic(8) count(u32) nbuckets(u32) digest(16)
+#   ips     : u32 * count              (이름 순서대로)
+#   offsets : u32 * (count + 1)        (names 안에서 각 이름의 시작 위치)
+#   buckets : u32 * nbuckets           (crc32(이름) 해시 테이블, 이름 번호 + 1, 0 은 빈 칸)
+#   names   : UTF-8 이름을 정렬해서 이어 붙인 것
+# 여는 데는 header 만 읽으므로 크기와 무관하다. 조회는 해시 테이블 (선형 탐사),
+# 정렬 순서는 출력/비교를 결정적으로 만들기 위한 것.
+
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+import argparse
+import csv
+import hashlib
+import json
+import mmap
+import struct
+import sys
+import zlib
+
+from ir import ip_str, pack_ip
+
+MAGIC = b"ILINV01\0"
+_HEADER = struct.Struct("<8sII16s")
+
+UNKNOWN_POLICIES = ("keep", "warn", "error")
+
+
+class UnknownHostError(KeyError):
+    def __init__(self, name):
+        super().__init__(name)
+        self.name = name
+
+    def __str__(self):
+        return f"unknown host {self.name!r}"
+
+
+# -----------------------------
+# 로더 (CSV / JSON)
+# -----------------------------
+_NAME_COLUMNS = ("name", "host", "hostname")
+_IP_COLUMNS = ("ip", "ipv4", "address", "addr")
+
+
+def load_csv(path):
+    """
+    (이름, IPv4 문자열) 을 한 줄씩. 첫 줄이 헤더 (name/host/hostname,
+    ip/ipv4/address) 이면 그 열을 쓰고, 아니면 앞의 두 열.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = csv.reader(f)
+        first = next(rows, None)
+        if first is None:
+            return
+        header = [c.strip().lower() for c in first]
+        name_col = next((header.index(c) for c in _NAME_COLUMNS if c in header), None)
+        ip_col = next((header.index(c) for c in _IP_COLUMNS if c in header), None)
+        if name_col is None or ip_col is None:
+            name_col, ip_col = 0, 1
+            yield first[0].strip(), first[1].strip()
+        for row in rows:
+            if row and not row[0].startswith("#"):
+                yield row[name_col].strip(), row[ip_col].strip()
+
+
+def load_json(path):
+    """{"web01": "10.0.0.1", ...} 또는 [{"name": ..., "ip": ...}, ...]"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        yield from data.items()
+        return
+    for item in data:
+        name = next(item[c] for c in _NAME_COLUMNS if c in item)
+        ip = next(item[c] for c in _IP_COLUMNS if c in item)
+        yield name, ip
+
+
+LOADERS = {
+    ".csv": load_csv,
+    ".json": load_json,
+}
+
+
+def load_pairs(path):
+    loader = LOADERS.get(Path(path).suffix.lower())
+    if loader is None:
+        raise ValueError(f"unsupported inventory format: {path} (csv, json, idx)")
+    return loader(path)
+
+
+# -----------------------------
+# 인덱스 생성 / 열기
+# -----------------------------
+def build_index(pairs, out_path) -> int:
+    """(이름, IPv4) 들로 인덱스 파일을 만든다. 같은 이름은 마지막 값. 항목 수를 돌려준다."""
+    table = {}
+    for name, ip in pairs:
+        value = pack_ip(ip)
+        if not isinstance(value, int):
+            raise ValueError(f"invalid IPv4 address for {name!r}: {ip!r}")
+        table[name.encode("utf-8")] = value
+    names = sorted(table)
+
+    offsets = [0]
+    for name in names:
+        offsets.append(offsets[-1] + len(name))
+    blob = b"".join(names)
+    ips = struct.pack(f"<{len(names)}I", *(table[n] for n in names))
+    offs = struct.pack(f"<{len(offsets)}I", *offsets)
+    digest = hashlib.blake2b(ips + offs + blob, digest_size=16).digest()
+
+    # 채움률 50% 이하가 되게 2의 거듭제곱 크기
+    nbuckets = 1
+    while nbuckets < 2 * len(names):
+        nbuckets <<= 1
+    mask = nbuckets - 1
+    buckets = [0] * nbuckets
+    for i, name in enumerate(names):
+        slot = zlib.crc32(name) & mask
+        while buckets[slot]:
+            slot = (slot + 1) & mask
+        buckets[slot] = i + 1
+
+    tmp = Path(f"{out_path}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(names), nbuckets, digest))
+        f.write(ips)
+        f.write(offs)
+        f.write(struct.pack(f"<{nbuckets}I", *buckets))
+        f.write(blob)
+    tmp.replace(out_path)
+    return len(names)
+
+
+class IndexInventory:
+    """mmap 으로 연 인덱스. 이름 하나당 해시 조회 한 번, 메모리는 OS 페이지 캐시."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, nbuckets, digest = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or nbuckets < 1 or nbuckets & (nbuckets - 1):
+            raise ValueError(f"not an inventory index: {path}")
+        self.digest = digest.hex()
+        self._mask = nbuckets - 1
+        ips = _HEADER.size
+        offsets = ips + 4 * self.count
+        buckets = offsets + 4 * (self.count + 1)
+        self._names = buckets + 4 * nbuckets
+        if sys.byteorder == "little":
+            # 파일 그대로 u32 배열로 본다 (복사 없음)
+            view = memoryview(self._mm)
+            self._ip = view[ips:offsets].cast("I")
+            self._off = view[offsets:buckets].cast("I")
+            self._buckets = view[buckets : self._names].cast("I")
+        else:
+            self._ip = struct.unpack_from(f"<{self.count}I", self._mm, ips)
+            self._off = struct.unpack_from(f"<{self.count + 1}I", self._mm, offsets)
+            self._buckets = struct.unpack_from(f"<{nbuckets}I", self._mm, buckets)
+
+    def get(self, name):
+        """이름 → int IPv4, 없으면 None"""
+        key = name.encode("utf-8")
+        mm, off, buckets, base, mask = (
+            self._mm, self._off, self._buckets, self._names, self._mask
+        )
+        slot = zlib.crc32(key) & mask
+        while True:
+            i = buckets[slot]
+            if not i:
+                return None
+            i -= 1
+            if mm[base + off[i] : base + off[i + 1]] == key:
+                return self._ip[i]
+            slot = (slot + 1) & mask
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        if isinstance(self._off, memoryview):
+            self._ip.release()
+            self._off.release()
+            self._buckets.release()
+        self._mm.close()
+
+
+class DictInventory:
+    """작은 인벤토리 (HOST_MAP, 직접 읽은 CSV/JSON) 용"""
+
+    def __init__(self, pairs):
+        self._table = {}
+        for name, ip in pairs:
+            value = pack_ip(ip)
+            if not isinstance(value, int):
+                raise ValueError(f"invalid IPv4 address for {name!r}: {ip!r}")
+            self._table[name] = value
+        self.digest = hashlib.blake2b(
+            json.dumps(sorted(self._table.items())).encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+    def get(self, name):
+        return self._table.get(name)
+
+    def __len__(self):
+        return len(self._table)
+
+    def close(self):
+        pass
+
+
+def open_inventory(path):
+    """인덱스 파일이면 mmap 으로, CSV/JSON 이면 읽어서 dict 로"""
+    with open(path, "rb") as f:
+        is_index = f.read(len(MAGIC)) == MAGIC
+    if is_index:
+        return IndexInventory(path)
+    return DictInventory(load_pairs(path))
+
+
+# -----------------------------
+# 변환 중 이름 풀기
+# -----------------------------
+class HostResolver:
+    """
+    IntentToJSON.host 가 부르는 이름 풀이.
+    on_unknown: keep (이름 그대로), warn (그대로 두고 이름별 횟수를 모음),
+                error (UnknownHostError)
+    """
+
+    CACHE_SIZE = 1 << 16
+
+    def __init__(self, inventory, on_unknown="keep"):
+        if on_unknown not in UNKNOWN_POLICIES:
+            raise ValueError(f"on_unknown must be one of {UNKNOWN_POLICIES}")
+        self.inventory = inventory
+        self.on_unknown = on_unknown
+        self.unknown = Counter()
+        self.unresolved = 0  # 지금까지 풀지 못한 횟수 (take_unknown 으로 비우지 않음)
+        # 자주 나오는 이름은 해시 조회 (mmap 읽기 + 이름 비교) 없이
+        self._lookup = lru_cache(maxsize=self.CACHE_SIZE)(inventory.get)
+
+    def __call__(self, name):
+        if name[:1].isdigit():
+            # IP 주소를 직접 쓴 경우 (IDENT 는 숫자로 시작하지 않는다)
+            return pack_ip(name)
+        value = self._lookup(name)
+        if value is not None:
+            return value
+        if self.on_unknown == "keep":
+            return name
+        if self.on_unknown == "error":
+            raise UnknownHostError(name)
+        self.unknown[name] += 1
+        self.unresolved += 1
+        return name
+
+    def take_unknown(self) -> Counter:
+        """모은 미등록 이름 (이름 → 횟수) 을 꺼내고 비운다"""
+        unknown, self.unknown = self.unknown, Counter()
+        return unknown
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main():
+    ap = argparse.ArgumentParser(description="IntentLang host inventory index")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="CSV/JSON → 인덱스 파일")
+    b.add_argument("source")
+    b.add_argument("-o", "--output", required=True)
+    q = sub.add_parser("lookup", help="이름 조회")
+    q.add_argument("index")
+    q.add_argument("names", nargs="+")
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        count = build_index(load_pairs(args.source), args.output)
+        print(f"{args.output}: {count} hosts", file=sys.stderr)
+        return
+    inv = open_inventory(args.index)
+    for name in args.names:
+        value = inv.get(name)
+        print(f"{name}\t{ip_str(value) if value is not None else '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,581 @@
+# ir.py
+#
+# IntentLang semantic model (IR)
+#
+# 문장마다 dict 를 만들던 것을 종류별 __slots__ 클래스로 바꾼 것.
+#  - type/action/protocol 처럼 종류마다 고정인 값은 클래스 속성 (인스턴스에 없음)
+#  - 정규형 IPv4 주소는 int 로 저장 (호스트 이름 등은 문자열 그대로)
+#  - to_dict() 가 예전 JSON Semantic Model 과 키 순서까지 같은 dict 를 만든다
+#  - 범위 / 그룹 / 반복 문장 (VlanRangeCreate, GroupAllow, MeterEach ...) 은 펼치지
+#    않고 하나로 들고 있다가 expand(groups) generator 로 기본 문장을 하나씩 낸다
+
+from abc import ABC, abstractmethod
+from enum import Enum
+
+
+class _Symbol(str, Enum):
+    # 문자열 비교/출력은 값 그대로 ("acl" == Kind.ACL, f"{Kind.ACL}" == "acl")
+    def __str__(self):
+        return self.value
+
+    __format__ = str.__format__
+
+
+class Kind(_Symbol):
+    ACL = "acl"
+    METER = "meter"
+    QOS = "qos"
+    CONNECTIVITY = "connectivity"
+    VLAN = "vlan"
+    ROUTE = "route"
+    MONITOR = "monitor"
+    BACKUP = "backup"
+    GROUP = "group"
+
+
+class Action(_Symbol):
+    ALLOW = "allow"
+    DENY = "deny"
+    CREATE = "create"
+    DELETE = "delete"
+    NOW = "now"
+
+
+class Protocol(_Symbol):
+    TCP = "tcp"
+    ICMP = "icmp"
+
+
+# -----------------------------
+# 주소 변환
+# -----------------------------
+def pack_ip(text):
+    """'10.0.0.1' -> 167772161. 정규형 IPv4 가 아니면 문자열 그대로."""
+    parts = text.split(".")
+    if len(parts) != 4:
+        return text
+    value = 0
+    for p in parts:
+        # 앞자리 0 ("010") 은 되돌렸을 때 원문과 달라지므로 int 로 바꾸지 않는다
+        if not p.isdigit() or not p.isascii() or (len(p) > 1 and p[0] == "0"):
+            return text
+        octet = int(p)
+        if octet > 255:
+            return text
+        value = (value << 8) | octet
+    return value
+
+
+def ip_str(value) -> str:
+    if isinstance(value, str):
+        return value
+    return f"{value >> 24}.{(value >> 16) & 255}.{(value >> 8) & 255}.{value & 255}"
+
+
+def pack_prefix(text):
+    """'10.0.0.0/24' -> (167772160, 24), '10.0.0.1' -> (167772161, None)"""
+    addr, sep, plen = text.partition("/")
+    net = pack_ip(addr)
+    if isinstance(net, str):
+        return text, None
+    if not sep:
+        return net, None
+    if not plen.isdigit() or (len(plen) > 1 and plen[0] == "0") or int(plen) > 32:
+        return text, None
+    return net, int(plen)
+
+
+def prefix_str(net, plen) -> str:
+    if isinstance(net, str):
+        return net
+    if plen is None:
+        return ip_str(net)
+    return f"{ip_str(net)}/{plen}"
+
+
+def netmask(plen) -> int:
+    """24 -> 0xFFFFFF00"""
+    return (0xFFFFFFFF << (32 - plen)) & 0xFFFFFFFF
+
+
+def covering_prefixes(addrs) -> list:
+    """
+    int IPv4 주소 집합을 정확히 덮는 가장 적은 prefix 목록 [(net, plen), ...].
+    정렬 후 스택에서 짝 (buddy) 블록끼리 합친다. O(n log n)
+    """
+    stack = []
+    for addr in sorted(set(addrs)):
+        net, plen = addr, 32
+        # 바로 앞 블록이 같은 크기의 짝이면 합쳐서 한 단계 큰 블록으로
+        while stack and plen > 0:
+            top_net, top_plen = stack[-1]
+            size = 1 << (32 - plen)
+            if top_plen != plen or top_net + size != net or top_net & size:
+                break
+            stack.pop()
+            net, plen = top_net, plen - 1
+        stack.append((net, plen))
+    return stack
+
+
+def default_vlan_name(vid) -> str:
+    # 이름 없이 만든 VLAN 은 IOS 기본 이름과 같게 (VLAN0100)
+    return f"VLAN{vid:04d}"
+
+
+class GroupRef:
+    """문장 안에서 쓴 호스트 그룹 (define group 으로 정의한 이름)"""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, other):
+        return type(other) is GroupRef and other.name == self.name
+
+    def __hash__(self):
+        return hash((GroupRef, self.name))
+
+    def __repr__(self):
+        return f"GroupRef({self.name!r})"
+
+    def __str__(self):
+        return f"@{self.name}"
+
+
+def member_str(member) -> str:
+    """그룹 원소 (주소, 이름, (net, plen)) → 문자열"""
+    if isinstance(member, tuple):
+        return prefix_str(*member)
+    return ip_str(member)
+
+
+def _endpoint_dict(value):
+    return {"group": value.name} if type(value) is GroupRef else ip_str(value)
+
+
+def _endpoint_from(value):
+    return GroupRef(value["group"]) if isinstance(value, dict) else pack_ip(value)
+
+
+# -----------------------------
+# 문장 종류별 클래스
+# -----------------------------
+class Stmt(ABC):
+    __slots__ = ()
+    kind = None
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self):
+        return hash((type(self), self._values()))
+
+    def __repr__(self):
+        args = ", ".join(f"{n}={getattr(self, n)!r}" for n in self.__slots__)
+        return f"{type(self).__name__}({args})"
+
+    @abstractmethod
+    def to_dict(self) -> dict:
+        """예전 JSON Semantic Model dict (키 순서 포함)"""
+
+
+# 1. allow tcp from A to B
+class Allow(Stmt):
+    __slots__ = ("src", "dst")
+    kind = Kind.ACL
+    action = Action.ALLOW
+    protocol = Protocol.TCP
+
+    def __init__(self, src, dst):
+        self.src = src
+        self.dst = dst
+
+    def to_dict(self):
+        return {
+            "type": "acl",
+            "action": "allow",
+            "protocol": "tcp",
+            "src": ip_str(self.src),
+            "dst": ip_str(self.dst),
+        }
+
+
+# 2. block icmp
+class Block(Stmt):
+    __slots__ = ()
+    kind = Kind.ACL
+    action = Action.DENY
+    protocol = Protocol.ICMP
+
+    def to_dict(self):
+        return {
+            "type": "acl",
+            "action": "deny",
+            "protocol": "icmp",
+        }
+
+
+# 3. limit bandwidth 10Mbps for hostA
+class Meter(Stmt):
+    __slots__ = ("host", "rate_mbps")
+    kind = Kind.METER
+
+    def __init__(self, host, rate_mbps):
+        self.host = host
+        self.rate_mbps = rate_mbps
+
+    @property
+    def rate(self) -> str:
+        return f"{self.rate_mbps}Mbps"
+
+    def to_dict(self):
+        return {
+            "type": "meter",
+            "host": ip_str(self.host),
+            "rate": self.rate,
+        }
+
+
+# 4. assign qos high to vlan 10
+class Qos(Stmt):
+    __slots__ = ("vlan",)
+    kind = Kind.QOS
+    priority = "high"
+
+    def __init__(self, vlan):
+        self.vlan = vlan
+
+    def to_dict(self):
+        return {
+            "type": "qos",
+            "Vlan": self.vlan,
+            "priority": "high",
+        }
+
+
+# 5. ensure connectivity between hostA and hostB
+class Connectivity(Stmt):
+    __slots__ = ("src", "dst")
+    kind = Kind.CONNECTIVITY
+
+    def __init__(self, src, dst):
+        self.src = src
+        self.dst = dst
+
+    def to_dict(self):
+        return {
+            "type": "connectivity",
+            "src": ip_str(self.src),
+            "dst": ip_str(self.dst),
+        }
+
+
+# 6. create vlan 20 name Engineering
+class VlanCreate(Stmt):
+    __slots__ = ("id", "name")
+    kind = Kind.VLAN
+    action = Action.CREATE
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+    def to_dict(self):
+        return {
+            "type": "vlan",
+            "id": self.id,
+            "name": self.name,
+            "action": "create",
+        }
+
+
+# 7. delete vlan 10
+class VlanDelete(Stmt):
+    __slots__ = ("id",)
+    kind = Kind.VLAN
+    action = Action.DELETE
+
+    def __init__(self, id):
+        self.id = id
+
+    def to_dict(self):
+        return {
+            "type": "vlan",
+            "id": self.id,
+            "action": "delete",
+        }
+
+
+# 8. set route 10.0.0.0/24 via 192.168.1.1
+class Route(Stmt):
+    __slots__ = ("net", "plen", "next_hop")
+    kind = Kind.ROUTE
+
+    def __init__(self, net, plen, next_hop):
+        self.net = net
+        self.plen = plen
+        self.next_hop = next_hop
+
+    @property
+    def dst(self) -> str:
+        return prefix_str(self.net, self.plen)
+
+    def to_dict(self):
+        return {
+            "type": "route",
+            "dst": self.dst,
+            "next_hop": ip_str(self.next_hop),
+        }
+
+
+# 9. monitor latency between hostA and hostB
+class Monitor(Stmt):
+    __slots__ = ("src", "dst")
+    kind = Kind.MONITOR
+    metric = "latency"
+
+    def __init__(self, src, dst):
+        self.src = src
+        self.dst = dst
+
+    def to_dict(self):
+        return {
+            "type": "monitor",
+            "metric": "latency",
+            "src": ip_str(self.src),
+            "dst": ip_str(self.dst),
+        }
+
+
+# 10. backup configuration now
+class Backup(Stmt):
+    __slots__ = ()
+    kind = Kind.BACKUP
+    action = Action.NOW
+
+    def to_dict(self):
+        return {
+            "type": "backup",
+            "action": "now",
+        }
+
+
+# -----------------------------
+# 범위 / 그룹 / 반복 (compound) 문장
+#
+# expand(groups) 가 기본 문장을 하나씩 내는 generator 라서 "create vlan 1-4094" 나
+# 큰 그룹의 곱 (src × dst) 도 목록으로 만들지 않는다. groups 는 이름 → HostGroup.
+# 묶음 표현이 있는 백엔드 (VLAN 범위, ipset, object-group) 는 펼치지 않고 그대로 쓴다.
+# -----------------------------
+# define group web as A, B, 10.0.1.0/28
+class HostGroup(Stmt):
+    __slots__ = ("name", "members")
+    kind = Kind.GROUP
+
+    def __init__(self, name, members):
+        self.name = name
+        self.members = tuple(members)  # int 주소, 이름, (net, plen)
+
+    def hosts(self):
+        """원소를 주소 하나씩 (prefix 는 그 안의 주소 전부)"""
+        for member in self.members:
+            if isinstance(member, tuple):
+                net, plen = member
+                start = net & netmask(plen)
+                yield from range(start, start + (1 << (32 - plen)))
+            else:
+                yield member
+
+    def size(self) -> int:
+        return sum(
+            1 << (32 - m[1]) if isinstance(m, tuple) else 1 for m in self.members
+        )
+
+    def to_dict(self):
+        return {
+            "type": "group",
+            "name": self.name,
+            "members": [member_str(m) for m in self.members],
+        }
+
+
+def _side(value, groups):
+    if type(value) is not GroupRef:
+        return (value,)
+    group = groups.get(value.name)
+    return () if group is None else group.hosts()
+
+
+# allow tcp from @web to @db
+class GroupAllow(Stmt):
+    __slots__ = ("src", "dst")  # 한쪽 이상이 GroupRef
+    kind = Kind.ACL
+    action = Action.ALLOW
+    protocol = Protocol.TCP
+
+    def __init__(self, src, dst):
+        self.src = src
+        self.dst = dst
+
+    def refs(self):
+        return [v for v in (self.src, self.dst) if type(v) is GroupRef]
+
+    def expand(self, groups):
+        for src in _side(self.src, groups):
+            for dst in _side(self.dst, groups):
+                yield Allow(src, dst)
+
+    def to_dict(self):
+        return {
+            "type": "acl",
+            "action": "allow",
+            "protocol": "tcp",
+            "src": _endpoint_dict(self.src),
+            "dst": _endpoint_dict(self.dst),
+        }
+
+
+# limit bandwidth 10Mbps per host in @rack7
+class MeterEach(Stmt):
+    __slots__ = ("group", "rate_mbps")
+    kind = Kind.METER
+
+    def __init__(self, group, rate_mbps):
+        self.group = group  # GroupRef
+        self.rate_mbps = rate_mbps
+
+    @property
+    def rate(self) -> str:
+        return f"{self.rate_mbps}Mbps"
+
+    def refs(self):
+        return [self.group]
+
+    def expand(self, groups):
+        for host in _side(self.group, groups):
+            yield Meter(host, self.rate_mbps)
+
+    def to_dict(self):
+        return {
+            "type": "meter",
+            "each": self.group.name,
+            "rate": self.rate,
+        }
+
+
+# create vlan 100-3999 [name Web]
+class VlanRangeCreate(Stmt):
+    __slots__ = ("first", "last", "name")
+    kind = Kind.VLAN
+    action = Action.CREATE
+
+    def __init__(self, first, last, name=None):
+        self.first = first
+        self.last = last
+        self.name = name  # None 이면 VLAN 마다 기본 이름
+
+    @property
+    def ids(self) -> range:
+        return range(self.first, self.last + 1)
+
+    def refs(self):
+        return []
+
+    def expand(self, groups=None):
+        name = self.name
+        for vid in self.ids:
+            yield VlanCreate(vid, name or default_vlan_name(vid))
+
+    def to_dict(self):
+        return {
+            "type": "vlan",
+            "first": self.first,
+            "last": self.last,
+            "name": self.name,
+            "action": "create",
+        }
+
+
+# delete vlan 100-3999
+class VlanRangeDelete(Stmt):
+    __slots__ = ("first", "last")
+    kind = Kind.VLAN
+    action = Action.DELETE
+
+    def __init__(self, first, last):
+        self.first = first
+        self.last = last
+
+    @property
+    def ids(self) -> range:
+        return range(self.first, self.last + 1)
+
+    def refs(self):
+        return []
+
+    def expand(self, groups=None):
+        for vid in self.ids:
+            yield VlanDelete(vid)
+
+    def to_dict(self):
+        return {
+            "type": "vlan",
+            "first": self.first,
+            "last": self.last,
+            "action": "delete",
+        }
+
+
+# expand() 가 있는 문장
+COMPOUND = (GroupAllow, MeterEach, VlanRangeCreate, VlanRangeDelete)
+
+
+def from_dict(d: dict):
+    """to_dict() 의 역변환 (dict 기반 코드용). 모르는 type 이면 None."""
+    t = d.get("type")
+    action = d.get("action")
+    if t == "acl":
+        if action == "allow":
+            src, dst = _endpoint_from(d["src"]), _endpoint_from(d["dst"])
+            if GroupRef in (type(src), type(dst)):
+                return GroupAllow(src, dst)
+            return Allow(src, dst)
+        return Block()
+    if t == "meter":
+        rate = int(d["rate"].removesuffix("Mbps"))
+        if "each" in d:
+            return MeterEach(GroupRef(d["each"]), rate)
+        return Meter(pack_ip(d["host"]), rate)
+    if t == "qos":
+        return Qos(d["Vlan"])
+    if t == "connectivity":
+        return Connectivity(pack_ip(d["src"]), pack_ip(d["dst"]))
+    if t == "vlan" and "first" in d:
+        if action == "create":
+            return VlanRangeCreate(d["first"], d["last"], d["name"])
+        return VlanRangeDelete(d["first"], d["last"])
+    if t == "vlan":
+        if action == "create":
+            return VlanCreate(d["id"], d["name"])
+        return VlanDelete(d["id"])
+    if t == "route":
+        net, plen = pack_prefix(d["dst"])
+        return Route(net, plen, pack_ip(d["next_hop"]))
+    if t == "monitor":
+        return Monitor(pack_ip(d["src"]), pack_ip(d["dst"]))
+    if t == "backup":
+        return Backup()
+    if t == "group":
+        members = []
+        for text in d["members"]:
+            net, plen = pack_prefix(text)
+            members.append((net, plen) if plen is not None and plen < 32 else net)
+        return HostGroup(d["name"], members)
+    return None
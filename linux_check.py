@@ -0,0 +1,509 @@
+# linux_check.py
+#
+# Linux batch 파일 (--config-dir DIR --batch) 오프라인 문법 확인 (dry-run)
+#
+#   python linux_check.py DIR            # DIR/linux.rules, linux.ipset, ...
+#   python compiler.py site.intent --config-dir DIR --batch --validate
+#
+# 커널이나 root 권한 없이, 각 도구가 파일을 읽다가 멈출 만한 것만 본다.
+#   linux.rules : iptables-restore (테이블/COMMIT 짝, 옵션, 체인, 참조하는 ipset)
+#   linux.ipset : ipset restore (create 전 사용, 주소)
+#   linux.nft   : nft -f (괄호 짝, table/set/chain 구조, 규칙 모양, set 참조)
+#   linux.ip    : ip -batch (VLAN id/이름, prefix 의 host 비트, 같은 route 두 번)
+#   linux.tc    : tc -batch (qdisc/class 부모, classid 중복, rate 단위,
+#                 u32 해시 테이블/칸/link, flower vlan_id)
+# 결과는 Diagnostic 목록 (path:line: error: ...).
+
+from pathlib import Path
+import argparse
+import re
+import sys
+
+from diagnostics import ERROR, WARNING, Diagnostic, count_severity, print_diagnostics
+from ir import netmask, pack_ip, pack_prefix
+
+_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_.-]*$")
+_RATE = re.compile(
+    r"^([0-9]+(?:\.[0-9]+)?)(bit|kbit|mbit|gbit|tbit|bps|kbps|mbps|gbps|tbps)?$", re.I
+)
+_HANDLE = re.compile(r"^([0-9a-fA-F]+):([0-9a-fA-F]*)$")
+_CLASS_KINDS = ("htb", "hfsc", "cbq", "drr")
+
+
+class _File:
+    """파일 하나를 읽으면서 진단을 모은다"""
+
+    def __init__(self, path, diagnostics):
+        self.path = str(path)
+        self.diagnostics = diagnostics
+        self.lineno = 0
+        self.line = ""
+
+    def lines(self):
+        with open(self.path, encoding="utf-8") as f:
+            for self.lineno, raw in enumerate(f, start=1):
+                self.line = raw.rstrip("\n")
+                text = self.line.strip()
+                if text and not text.startswith("#"):
+                    yield text
+
+    def report(self, message, severity=ERROR):
+        self.diagnostics.append(
+            Diagnostic(
+                message,
+                self.lineno or None,
+                severity=severity,
+                code="batch",
+                source=self.line if self.lineno else None,
+                path=self.path,
+            )
+        )
+
+
+def _is_addr(token, prefix=True, names=True):
+    """IPv4 (prefix 허용), names=True 이면 적용할 때 풀리는 호스트 이름도"""
+    net, plen = pack_prefix(token) if prefix else (pack_ip(token), None)
+    if isinstance(net, int):
+        return True
+    return names and "/" not in token and bool(_NAME.match(token))
+
+
+# -----------------------------
+# ipset restore
+# -----------------------------
+def check_ipset(f, state):
+    sets = state["sets"]
+    for text in f.lines():
+        words = text.split()
+        cmd, args = words[0], words[1:]
+        if cmd == "create":
+            if len(args) < 2 or not args[1].startswith(("hash:", "bitmap:", "list:")):
+                f.report("usage: create NAME TYPE [options]")
+                continue
+            if args[0] in sets and "-exist" not in args:
+                f.report(f"set {args[0]!r} already exists (add -exist)")
+            sets.add(args[0])
+        elif cmd in ("add", "del", "test"):
+            if len(args) < 2:
+                f.report(f"usage: {cmd} NAME ADDRESS")
+            elif args[0] not in sets:
+                f.report(f"set {args[0]!r} used before create")
+            elif not _is_addr(args[1]):
+                f.report(f"invalid address {args[1]!r}")
+        elif cmd in ("flush", "destroy"):
+            if args and args[0] not in sets:
+                f.report(f"set {args[0]!r} used before create")
+            if cmd == "destroy" and args:
+                sets.discard(args[0])
+        else:
+            f.report(f"unknown ipset command {cmd!r}")
+
+
+# -----------------------------
+# iptables-restore
+# -----------------------------
+_TABLES = {"filter", "nat", "mangle", "raw", "security"}
+_BUILTIN_CHAINS = {"INPUT", "OUTPUT", "FORWARD", "PREROUTING", "POSTROUTING"}
+_TARGETS = {"ACCEPT", "DROP", "REJECT", "RETURN", "LOG"}
+_PROTOCOLS = {"tcp", "udp", "icmp", "all", "sctp"}
+
+
+def _check_rule(f, args, chains, sets):
+    i = 0
+    while i < len(args):
+        opt = args[i]
+        value = args[i + 1] if i + 1 < len(args) else None
+        if opt in ("-p", "-s", "-d", "-j", "-m", "-i", "-o") and value is None:
+            f.report(f"option {opt} needs a value")
+            return
+        if opt == "-p":
+            if value not in _PROTOCOLS and not value.isdigit():
+                f.report(f"unknown protocol {value!r}")
+        elif opt in ("-s", "-d"):
+            if not _is_addr(value):
+                f.report(f"invalid address {value!r}")
+        elif opt == "-j":
+            if value not in _TARGETS and value not in chains:
+                f.report(f"unknown target {value!r}")
+        elif opt == "-m":
+            if value == "set":
+                if args[i + 2 : i + 3] != ["--match-set"] or len(args) < i + 5:
+                    f.report("-m set needs --match-set NAME src|dst")
+                    return
+                name, flags = args[i + 3], args[i + 4]
+                if name not in sets:
+                    f.report(f"ipset {name!r} is not created in linux.ipset")
+                if not all(x in ("src", "dst") for x in flags.split(",")):
+                    f.report(f"--match-set flags must be src/dst, got {flags!r}")
+                i += 3
+        elif opt in ("-i", "-o"):
+            pass
+        else:
+            f.report(f"unknown option {opt!r}")
+            return
+        i += 2
+
+
+def check_iptables_restore(f, state):
+    table = None
+    chains = set()
+    for text in f.lines():
+        if text.startswith("*"):
+            if table is not None:
+                f.report(f"table {table!r} not committed before {text!r}")
+            table = text[1:]
+            if table not in _TABLES:
+                f.report(f"unknown table {table!r}")
+            chains = set(_BUILTIN_CHAINS)
+        elif text == "COMMIT":
+            if table is None:
+                f.report("COMMIT without a table")
+            table = None
+        elif table is None:
+            f.report("rule outside of a *table ... COMMIT block")
+        elif text.startswith(":"):
+            parts = text[1:].split()
+            if len(parts) != 3 or not re.match(r"^\[\d+:\d+\]$", parts[2]):
+                f.report("usage: :CHAIN POLICY [packets:bytes]")
+                continue
+            if parts[1] not in ("ACCEPT", "DROP", "-"):
+                f.report(f"invalid policy {parts[1]!r}")
+            chains.add(parts[0])
+        elif text.startswith("-F "):
+            # --noflush 로 적용할 때 전용 체인만 비운다
+            args = text.split()
+            if len(args) != 2 or args[1] not in chains:
+                f.report(f"unknown chain {args[1] if len(args) > 1 else ''!r}")
+        elif text.startswith(("-A ", "-I ")):
+            args = text.split()
+            if len(args) < 2 or args[1] not in chains:
+                f.report(f"unknown chain {args[1] if len(args) > 1 else ''!r}")
+                continue
+            _check_rule(f, args[2:], chains, state["sets"])
+        else:
+            f.report("expected *table, :CHAIN, -F, -A or COMMIT")
+    if table is not None:
+        f.lineno = 0
+        f.report(f"missing COMMIT for table {table!r}")
+
+
+# -----------------------------
+# nft -f
+# -----------------------------
+_NFT_VERDICTS = {"accept", "drop", "reject", "return"}
+
+
+def _check_nft_rule(f, words, sets):
+    if not words or words[-1] not in _NFT_VERDICTS:
+        f.report("rule must end with a verdict (accept/drop/...)")
+        return
+    words = words[:-1]
+    if len(words) % 3:
+        f.report("expected 'ip <field> <value>' matches")
+        return
+    for i in range(0, len(words), 3):
+        family, field, value = words[i : i + 3]
+        if family != "ip" or field not in ("protocol", "saddr", "daddr"):
+            f.report(f"unknown match {family} {field!r}")
+        elif field == "protocol":
+            if value not in _PROTOCOLS:
+                f.report(f"unknown protocol {value!r}")
+        elif value.startswith("@"):
+            if value[1:] not in sets:
+                f.report(f"set {value[1:]!r} is not defined in this table")
+        elif not _is_addr(value):
+            f.report(f"invalid address {value!r}")
+
+
+def check_nft(f, state):
+    stack = []  # 열린 블록 ("table"/"set"/"chain", 이름)
+    sets = set()
+    for text in f.lines():
+        words = text.replace(";", " ; ").split()
+        where = stack[-1][0] if stack else None
+        if text == "}":
+            if not stack:
+                f.report("unbalanced '}'")
+            else:
+                stack.pop()
+            continue
+        opens = text.endswith("{")
+        if where is None:
+            if words[:2] == ["delete", "table"] and len(words) == 4:
+                continue
+            if words[0] == "table" and len(words) in (3, 4):
+                if words[1] not in ("ip", "ip6", "inet", "arp", "bridge", "netdev"):
+                    f.report(f"unknown family {words[1]!r}")
+                if opens:
+                    stack.append(("table", words[2]))
+                    sets = set()
+                continue
+            f.report("expected 'table FAMILY NAME'")
+        elif where == "table":
+            if opens and len(words) == 3 and words[0] in ("set", "chain"):
+                stack.append((words[0], words[1]))
+                if words[0] == "set":
+                    sets.add(words[1])
+            else:
+                f.report("expected 'set NAME {' or 'chain NAME {'")
+        elif where == "set":
+            if words[:2] == ["type", "ipv4_addr"] or words == ["flags", "interval"]:
+                continue
+            m = re.match(r"^elements\s*=\s*\{(.*)\}$", text)
+            if not m:
+                f.report("expected 'type ipv4_addr', 'flags interval' or 'elements = { ... }'")
+                continue
+            for elem in (e.strip() for e in m.group(1).split(",")):
+                if not _is_addr(elem):
+                    f.report(f"invalid set element {elem!r}")
+        elif where == "chain":
+            if words[0] == "type":
+                chain_type = r"^type \w+ hook \w+ priority -?\d+ ; policy (accept|drop) ;$"
+                if not re.match(chain_type, " ".join(words)):
+                    f.report("expected 'type filter hook HOOK priority N; policy accept|drop;'")
+                continue
+            _check_nft_rule(f, words, sets)
+        if opens and where in ("set", "chain"):
+            f.report("unexpected '{'")
+    if stack:
+        f.lineno = 0
+        f.report(f"unclosed {stack[-1][0]} {stack[-1][1]!r}")
+
+
+# -----------------------------
+# ip -batch
+# -----------------------------
+def _check_route(f, args, routes):
+    if len(args) < 4 or args[2] != "via":
+        f.report(f"usage: route {args[0] if args else 'add'} PREFIX via ADDRESS")
+        return
+    cmd, prefix, hop = args[0], args[1], args[3]
+    net, plen = pack_prefix(prefix)
+    if not isinstance(net, int):
+        f.report(f"invalid prefix {prefix!r} (ip does not resolve host names)")
+        return
+    plen = 32 if plen is None else plen
+    if net & ~netmask(plen) & 0xFFFFFFFF:
+        f.report(f"invalid prefix for given prefix length: {prefix}")
+    if not isinstance(pack_ip(hop), int):
+        f.report(f"invalid gateway {hop!r}")
+    key = (net & netmask(plen), plen)
+    if cmd == "add" and key in routes:
+        f.report(f"route {prefix} already added (File exists)")
+    routes.add(key)
+
+
+def check_ip_batch(f, state):
+    links, routes = set(), set()
+    for text in f.lines():
+        words = text.split()
+        obj, args = words[0], words[1:]
+        if obj == "link" and args[:1] == ["add"]:
+            m = re.match(r"^link add link (\S+) name (\S+) type vlan id (\d+)$", text)
+            if not m:
+                f.report("usage: link add link DEV name NAME type vlan id ID")
+                continue
+            name, vid = m.group(2), int(m.group(3))
+            if not 1 <= vid <= 4094:
+                f.report(f"vlan id {vid} out of range 1-4094")
+            if len(name) > 15:
+                f.report(f"interface name {name!r} longer than 15 characters")
+            if name in links:
+                f.report(f"link {name!r} already added (File exists)")
+            links.add(name)
+        elif obj == "link" and args[:1] in (["delete"], ["del"]):
+            if len(args) != 2:
+                f.report("usage: link delete NAME")
+            else:
+                links.discard(args[1])
+        elif obj == "route" and args[:1] and args[0] in ("add", "replace", "del", "delete"):
+            _check_route(f, args, routes)
+        else:
+            f.report(f"unknown ip command {' '.join(words[:2])!r}")
+
+
+# -----------------------------
+# tc -batch
+# -----------------------------
+def _rate(f, value):
+    m = _RATE.match(value)
+    if not m:
+        f.report(f"invalid rate {value!r}")
+    elif m.group(2) and m.group(2).lower().endswith("bps"):
+        # tc 에서 bps 는 byte/s (10Mbps = 80 Mbit/s)
+        f.report(f"rate {value!r} is bytes per second in tc; use mbit for megabits", WARNING)
+
+
+def _options(f, words, start):
+    """[key value ...] → dict (값 없는 키는 오류)"""
+    opts = {}
+    i = start
+    while i < len(words):
+        if i + 1 >= len(words):
+            f.report(f"option {words[i]!r} needs a value")
+            break
+        opts[words[i]] = words[i + 1]
+        i += 2
+    return opts
+
+
+def check_tc_batch(f, state):
+    qdiscs = {}  # dev -> {major}
+    classes = {}  # dev -> {classid}
+    for text in f.lines():
+        words = text.split()
+        if len(words) < 4 or words[1] not in ("add", "replace", "change") or words[2] != "dev":
+            f.report("usage: qdisc|class|filter add dev DEV ...")
+            continue
+        obj, dev = words[0], words[3]
+        if obj == "qdisc":
+            m = re.match(r"^qdisc \w+ dev \S+ (root|parent \S+) handle (\S+) (\w+)(.*)$", text)
+            if not m or not _HANDLE.match(m.group(2)) or _HANDLE.match(m.group(2)).group(2):
+                f.report("usage: qdisc add dev DEV root handle MAJOR: KIND [options]")
+                continue
+            major = _HANDLE.match(m.group(2)).group(1)
+            if words[1] == "add" and major in qdiscs.get(dev, ()):
+                f.report(f"qdisc {major}: already exists on {dev}")
+            qdiscs.setdefault(dev, set()).add(major)
+        elif obj == "class":
+            # class add dev DEV [parent/classid ...] KIND [KIND 옵션 ...]
+            kind_at = next((i for i, w in enumerate(words) if w in _CLASS_KINDS), len(words))
+            opts = _options(f, words[:kind_at], 4)
+            kind_opts = _options(f, words, kind_at + 1)
+            parent, classid = opts.get("parent"), opts.get("classid")
+            if parent is None or classid is None or not _HANDLE.match(classid):
+                f.report("usage: class add dev DEV parent P classid MAJOR:MINOR htb rate RATE")
+                continue
+            p = _HANDLE.match(parent or "")
+            major = _HANDLE.match(classid).group(1)
+            if p is None or (not p.group(2) and p.group(1) not in qdiscs.get(dev, ())) or (
+                p.group(2) and parent not in classes.get(dev, ())
+            ):
+                f.report(f"parent {parent} does not exist on {dev}")
+            elif p.group(1) != major:
+                f.report(f"classid {classid} is not under qdisc {p.group(1)}:")
+            if words[1] == "add" and classid in classes.get(dev, ()):
+                f.report(f"classid {classid} already exists on {dev}")
+            classes.setdefault(dev, set()).add(classid)
+            if kind_at == len(words) or words[kind_at] != "htb":
+                f.report("only htb classes are generated")
+                continue
+            if "rate" not in kind_opts:
+                f.report("htb class needs a rate")
+            for key in ("rate", "ceil"):
+                if key in kind_opts:
+                    _rate(f, kind_opts[key])
+        elif obj == "filter":
+            check_tc_filter(f, words, qdiscs.get(dev, ()), classes.get(dev, ()), state)
+        else:
+            f.report(f"unknown tc object {obj!r}")
+
+
+def _after(words, key):
+    return words[words.index(key) + 1] if key in words[:-1] else None
+
+
+def check_tc_filter(f, words, qdiscs, classes, state):
+    parent = _after(words, "parent")
+    if parent is None or not _HANDLE.match(parent):
+        f.report("filter needs parent MAJOR:")
+        return
+    if _HANDLE.match(parent).group(1) not in qdiscs:
+        f.report(f"filter parent {parent} does not exist")
+    target = _after(words, "flowid") or _after(words, "classid")
+    if target is not None and target not in classes:
+        f.report(f"class {target} does not exist on this device")
+    if "u32" in words:
+        _check_u32(f, words, state["u32"].setdefault(words[3], {"800": 256}))
+    elif "flower" in words:
+        vlan = _after(words, "vlan_id")
+        if vlan is not None:
+            if _after(words, "protocol") not in ("802.1Q", "802.1q"):
+                f.report("flower vlan_id needs protocol 802.1Q")
+            if not vlan.isdigit() or not 1 <= int(vlan) <= 4094:
+                f.report(f"vlan id {vlan} out of range 1-4094")
+    else:
+        f.report("only u32 and flower filters are generated")
+
+
+def _check_u32(f, words, tables):
+    """tables: 이 장치의 u32 해시 테이블 handle → divisor"""
+    handle, divisor = _after(words, "handle"), _after(words, "divisor")
+    if divisor is not None:
+        if handle is None or not re.match(r"^[0-9a-f]{1,3}:$", handle):
+            f.report("u32 hash table needs handle N: (1-fff)")
+            return
+        if not divisor.isdigit() or int(divisor) not in (1, 2, 4, 8, 16, 32, 64, 128, 256):
+            f.report(f"divisor must be a power of two up to 256, got {divisor}")
+            return
+        if handle[:-1] in tables:
+            f.report(f"u32 table {handle} already exists")
+        tables[handle[:-1]] = int(divisor)
+        return
+    ht = _after(words, "ht")
+    if ht is not None:
+        m = re.match(r"^([0-9a-f]{1,3}):([0-9a-f]*):$", ht)
+        if not m or m.group(1) not in tables:
+            f.report(f"u32 table {ht} does not exist")
+        elif m.group(2) and int(m.group(2), 16) >= tables[m.group(1)]:
+            f.report(f"bucket {ht} is outside divisor {tables[m.group(1)]}")
+    link = _after(words, "link")
+    if link is not None and link.rstrip(":") not in tables:
+        f.report(f"link target {link} does not exist")
+    if "hashkey" in words and link is None:
+        f.report("hashkey without link")
+    if "match" in words:
+        kind = _after(words, "match")
+        if kind == "ip":
+            field = words[words.index("match") + 2 : words.index("match") + 4]
+            if len(field) != 2 or field[0] not in ("src", "dst") or not _is_addr(
+                field[1], names=False
+            ):
+                f.report(f"invalid u32 match {' '.join(field)!r}")
+        elif kind != "u32":
+            f.report(f"unknown u32 match {kind!r}")
+
+
+CHECKERS = {
+    # ipset 을 먼저 읽어야 iptables 규칙의 set 참조를 확인할 수 있다
+    "linux.ipset": check_ipset,
+    "linux.rules": check_iptables_restore,
+    "linux.nft": check_nft,
+    "linux.ip": check_ip_batch,
+    "linux.tc": check_tc_batch,
+}
+
+
+def _state():
+    # 파일 사이에 공유하는 것: ipset 이름, 장치별 u32 해시 테이블
+    return {"sets": set(), "u32": {}}
+
+
+def check_file(path, checker, state=None) -> list:
+    diagnostics = []
+    checker(_File(path, diagnostics), state if state is not None else _state())
+    return diagnostics
+
+
+def check_dir(path) -> list:
+    """DIR 안의 batch 파일들 (있는 것만) 을 확인한 Diagnostic 목록"""
+    state = _state()
+    diagnostics = []
+    for name, checker in CHECKERS.items():
+        file = Path(path) / name
+        if file.exists():
+            diagnostics.extend(check_file(file, checker, state))
+    return diagnostics
+
+
+def main():
+    ap = argparse.ArgumentParser(description="offline syntax check of Linux batch files")
+    ap.add_argument("dir", help="compiler.py --config-dir DIR --batch 로 만든 디렉터리")
+    args = ap.parse_args()
+    diagnostics = check_dir(args.dir)
+    print_diagnostics(diagnostics)
+    sys.exit(1 if count_severity(diagnostics) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# metrics.py
+#
+# 선택적 계측 (--profile / --metrics-json / --cprofile)
+#
+#   단계별 (read, parse, transform, emit:<타깃>, write ...) 시간 + 호출 횟수
+#   문장 종류별 (Allow, Route ...) 시간 + 호출 횟수
+#   peak 메모리 (RSS)
+#
+# 꺼져 있으면 active() 가 None 이다. 계측하는 쪽은 함수나 Emitter 를 만들 때
+# 한 번만 확인하고 감싸므로, 꺼진 상태에서는 문장마다 드는 비용이 없다.
+
+from contextlib import contextmanager, nullcontext
+import cProfile
+import json
+import pstats
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_active = None
+_NULL = nullcontext()
+
+
+def enable():
+    """계측을 켜고 Metrics 를 돌려준다 (이미 켜져 있으면 그대로)"""
+    global _active
+    if _active is None:
+        _active = Metrics()
+    return _active
+
+
+def disable():
+    global _active
+    _active = None
+
+
+def active():
+    return _active
+
+
+def stage(name):
+    """with metrics.stage("parse"): ... (꺼져 있으면 아무것도 안 함)"""
+    return _NULL if _active is None else _active.stage(name)
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux 는 KB, macOS 는 byte
+    return round(rss / (2**20 if sys.platform == "darwin" else 1024), 1)
+
+
+def _stmt_type(result):
+    # parse 결과는 model 리스트, transformer 메서드 결과는 model 하나
+    if isinstance(result, list):
+        if not result:
+            return None
+        result = result[0]
+    return type(result).__name__
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}  # stage -> [초, 호출 수]
+        self.types = {}  # stage -> {문장 종류 -> [초, 호출 수]}
+        self.worker_peak_rss_mb = None
+
+    def add(self, stage, seconds, calls=1):
+        rec = self.stages.get(stage)
+        if rec is None:
+            rec = self.stages[stage] = [0.0, 0]
+        rec[0] += seconds
+        rec[1] += calls
+
+    def add_type(self, stage, stmt_type, seconds, calls=1):
+        by_type = self.types.get(stage)
+        if by_type is None:
+            by_type = self.types[stage] = {}
+        rec = by_type.get(stmt_type)
+        if rec is None:
+            rec = by_type[stmt_type] = [0.0, 0]
+        rec[0] += seconds
+        rec[1] += calls
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t0)
+
+    def wrap(self, stage, fn, stmt_type=None, by_result=False, total=True):
+        """
+        호출마다 걸린 시간을 stage 에 더하는 fn 래퍼.
+        stmt_type: 문장 종류별로도 기록 (by_result=True 이면 결과 model 의 종류)
+        total=False: 종류별로만 기록 (바깥에서 stage 전체를 따로 재는 경우)
+        """
+        clock = time.perf_counter
+        add = self.add
+        add_type = self.add_type
+
+        def timed(*args):
+            t0 = clock()
+            result = fn(*args)
+            dt = clock() - t0
+            if total:
+                add(stage, dt)
+            if by_result:
+                add_type(stage, _stmt_type(result), dt)
+            elif stmt_type is not None:
+                add_type(stage, stmt_type, dt)
+            return result
+
+        return timed
+
+    # -- 여러 프로세스 합치기 --
+    def take(self) -> dict:
+        """지금까지의 기록을 dict 로 꺼내고 비운다 (워커 → 부모)"""
+        snapshot = self.to_dict()
+        self.stages = {}
+        self.types = {}
+        return snapshot
+
+    def merge(self, snapshot: dict):
+        for name, rec in snapshot["stages"].items():
+            self.add(name, rec["seconds"], rec["calls"])
+        for name, by_type in snapshot["by_type"].items():
+            for stmt_type, rec in by_type.items():
+                self.add_type(name, stmt_type, rec["seconds"], rec["calls"])
+        rss = snapshot.get("peak_rss_mb")
+        if rss is not None:
+            self.worker_peak_rss_mb = max(self.worker_peak_rss_mb or 0, rss)
+
+    # -- 출력 --
+    def to_dict(self) -> dict:
+        def rec(r):
+            return {"seconds": round(r[0], 6), "calls": r[1]}
+
+        data = {
+            "wall_seconds": round(time.perf_counter() - self.started, 6),
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": {name: rec(r) for name, r in self.stages.items()},
+            "by_type": {
+                name: {t: rec(r) for t, r in sorted(by_type.items(), key=str)}
+                for name, by_type in self.types.items()
+            },
+        }
+        if self.worker_peak_rss_mb is not None:
+            data["worker_peak_rss_mb"] = self.worker_peak_rss_mb
+        return data
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+    def report(self, out=None):
+        out = out or sys.stderr
+        data = self.to_dict()
+        wall = data["wall_seconds"] or 1e-9
+        rss = data["peak_rss_mb"]
+        line = f"=== Profile === wall {data['wall_seconds']:.3f}s"
+        if rss is not None:
+            line += f"  peak RSS {rss} MB"
+        if "worker_peak_rss_mb" in data:
+            line += f"  (workers {data['worker_peak_rss_mb']} MB)"
+        print(line, file=out)
+
+        rows = sorted(data["stages"].items(), key=lambda kv: -kv[1]["seconds"])
+        print(f"{'stage':<18}{'seconds':>10}{'calls':>10}{'%wall':>8}", file=out)
+        for name, rec in rows:
+            pct = 100 * rec["seconds"] / wall
+            print(
+                f"{name:<18}{rec['seconds']:>10.4f}{rec['calls']:>10}{pct:>8.1f}",
+                file=out,
+            )
+        for name, by_type in data["by_type"].items():
+            print(f"--- {name} by statement type ---", file=out)
+            for stmt_type, rec in by_type.items():
+                per = rec["seconds"] / rec["calls"] * 1e6 if rec["calls"] else 0
+                print(
+                    f"  {str(stmt_type):<16}{rec['seconds']:>10.4f}"
+                    f"{rec['calls']:>10}{per:>9.1f}us",
+                    file=out,
+                )
+
+
+@contextmanager
+def cprofile(path):
+    """
+    cProfile 로 감싸서 실행. path 가 '-' 이면 누적 시간 상위 25개를 stderr 로,
+    아니면 pstats 파일로 저장 (python -m pstats PATH, snakeviz 등으로 보기).
+    """
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield prof
+    finally:
+        prof.disable()
+        if path == "-":
+            pstats.Stats(prof, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
+        else:
+            prof.dump_stats(path)
@@ -0,0 +1,52 @@
+# parser_cache.py
+#
+# LALR 파서 디스크 캐시 (compiler.py, dja/main.py 가 같이 쓴다)
+#
+# lark 의 cache= 로 직렬화된 파서를 읽는다. 파일 이름은 문법 내용 + lark 버전 +
+# Python 버전 + 파서 옵션의 해시라서 문법이 다른 두 파서가 섞이지 않는다.
+# 시작 시간을 재는 모듈이라 lark 말고는 표준 라이브러리만 import 한다.
+
+from lark import Lark
+from lark import __version__ as LARK_VERSION
+from pathlib import Path
+import hashlib
+import os
+import sys
+
+
+def cache_dir() -> Path:
+    """
+    파서 캐시 디렉터리
+    (INTENTLANG_CACHE_DIR > $XDG_CACHE_HOME/intentlang > ~/.cache/intentlang)
+    """
+    env = os.environ.get("INTENTLANG_CACHE_DIR")
+    if env:
+        return Path(env)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "intentlang"
+
+
+def parser_cache_path(grammar: str, **options) -> Path:
+    """문법 내용 + lark 버전 + 파서 옵션 해시로 캐시 파일 이름을 만든다."""
+    key = "\0".join(
+        [grammar, LARK_VERSION, "%d.%d" % sys.version_info[:2]]
+        # transformer 는 캐시된 테이블과 무관하다 (lark 도 해시에서 제외)
+        + [f"{k}={options[k]!r}" for k in sorted(options) if k != "transformer"]
+    )
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return cache_dir() / f"intentlang-lalr-{digest}.cache"
+
+
+def build_parser(grammar: str, **options) -> Lark:
+    """
+    LALR 파서 생성. 직렬화된 파서가 캐시에 있으면 그것을 읽고,
+    없으면 테이블을 만든 뒤 캐시에 저장한다.
+    """
+    options.setdefault("start", "start")
+    path = parser_cache_path(grammar, **options)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        # 캐시 디렉터리를 못 만들면 매번 생성 (기존 동작)
+        return Lark(grammar, parser="lalr", **options)
+    return Lark(grammar, parser="lalr", cache=str(path), **options)
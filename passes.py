@@ -0,0 +1,82 @@
+# passes.py
+#
+# 설정 파일 출력 (--config-dir) 전에 도는 최적화 pass 묶음
+#
+# 타깃 여러 개가 같은 결과를 쓰므로 pass 마다 처음 요청될 때 한 번만 계산한다.
+# 백엔드의 @BACKEND.program 함수가 (models, out, passes) 로 받는다.
+#
+# 범위 / 그룹 문장 (ir.COMPOUND) 은 그대로 두고, 펼친 문장이 필요한 백엔드는
+# expanded() / rest(expand=True) 로 하나씩 받는다 (목록으로 만들지 않음).
+
+from functools import cached_property
+
+from diagnostics import ERROR, Diagnostic
+import acl
+import ir
+import routes
+
+
+class Passes:
+    def __init__(self, models, optimize=True):
+        self.models = models
+        self.optimize = optimize
+        self.diagnostics = []  # 백엔드가 남기는 진단 (P4 테이블 용량 초과 등)
+        # 타깃 이름 -> 지난 배포에서 이어받은 값 / 다음 배포로 넘길 값 (--state,
+        # 스냅샷과 같이 저장된다. 예: P4 ACL priority)
+        self.state = {}
+        self.next_state = {}
+
+    @cached_property
+    def groups(self) -> dict:
+        """그룹 이름 -> 처음 정의한 HostGroup. 정의 없이 쓴 그룹은 진단으로"""
+        groups = {}
+        for model in self.models:
+            if type(model) is ir.HostGroup:
+                groups.setdefault(model.name, model)
+        missing = set()
+        for model in self.models:
+            if isinstance(model, ir.COMPOUND):
+                for ref in model.refs():
+                    if ref.name not in groups and ref.name not in missing:
+                        missing.add(ref.name)
+                        self.diagnostics.append(
+                            Diagnostic(
+                                f"group {ref.name} is used but not defined",
+                                severity=ERROR,
+                                code="unknown-group",
+                            )
+                        )
+        return groups
+
+    def expanded(self, models=None):
+        """범위 / 그룹 / 반복 문장을 기본 문장으로 하나씩 펼친다 (generator)"""
+        groups = self.groups
+        for model in self.models if models is None else models:
+            if isinstance(model, ir.COMPOUND):
+                yield from model.expand(groups)
+            else:
+                yield model
+
+    @cached_property
+    def acl(self) -> acl.AclPlan:
+        if self.optimize:
+            return acl.optimize_acl(self.models)
+        return acl.passthrough_acl(self.models)
+
+    @cached_property
+    def routes(self) -> routes.RoutePlan:
+        if self.optimize:
+            return routes.aggregate_routes(self.models)
+        return routes.passthrough_routes(self.models)
+
+    def rest(self, skip=None, expand=False):
+        """
+        ACL / route 가 아닌 문장 (원래 순서). skip(model) 이 참인 것도 뺀다.
+        expand=True 이면 범위 / 반복 문장을 펼쳐서
+        """
+        models = self.expanded() if expand else self.models
+        for model in models:
+            if acl.is_acl(model) or routes.is_route(model):
+                continue
+            if skip is None or not skip(model):
+                yield model
@@ -0,0 +1,156 @@
+# routes.py
+#
+# route 최적화 pass (semantic model → 백엔드 사이)
+#
+#   1) 정규화   : 10.0.0.5/24 → 10.0.0.0/24 (host 비트 제거), prefix 없는 주소는 /32
+#   2) 충돌     : 같은 prefix 에 next hop 이 다른 문장이 여러 개면 먼저 나온 것을
+#                 쓰고 충돌로 보고한다 (ip route add 도 두 번째는 실패한다)
+#   3) 짝 합치기: next hop 이 같은 짝 (buddy) prefix 두 개 → 한 단계 짧은 prefix
+#                 (10.0.0.0/25 + 10.0.0.128/25 → 10.0.0.0/24)
+#   4) 덮임 제거: 가장 가까운 상위 prefix 와 next hop 이 같은 route 는 없어도
+#                 longest-prefix match 결과가 같으므로 버린다
+#
+# prefix 구조는 길이별 dict (net → next hop) 33 개. 3) 은 긴 prefix 부터 한 번씩,
+# 4) 는 (net, 길이) 정렬 후 조상 스택으로 훑으므로 전체 O(n log n) 이다.
+# 주소를 해석할 수 없는 route (문자열) 는 손대지 않고 그대로 둔다.
+
+import ir
+from ir import netmask, prefix_str
+
+
+class RouteConflict:
+    """같은 prefix, 다른 next hop. index 는 model 목록 안의 위치."""
+
+    __slots__ = ("net", "plen", "next_hop", "index", "other_hop", "other_index")
+
+    def __init__(self, net, plen, next_hop, index, other_hop, other_index):
+        self.net = net
+        self.plen = plen
+        self.next_hop = next_hop
+        self.index = index
+        self.other_hop = other_hop
+        self.other_index = other_index
+
+    @property
+    def prefix(self) -> str:
+        return prefix_str(self.net, self.plen)
+
+    def message(self) -> str:
+        return (
+            f"conflicting next hops for {self.prefix}: "
+            f"{ir.ip_str(self.next_hop)} (statement {self.index + 1}) vs "
+            f"{ir.ip_str(self.other_hop)} (statement {self.other_index + 1}), "
+            "using the first"
+        )
+
+
+class RoutePlan:
+    """
+    routes   : 최적화된 (net, plen, next hop) 목록, (net, plen) 순서
+    opaque   : 해석할 수 없어서 그대로 둔 Route model
+    conflicts: RouteConflict 목록
+    """
+
+    def __init__(self, before, routes, opaque, conflicts, counts):
+        self.before = before
+        self.routes = routes
+        self.opaque = opaque
+        self.conflicts = conflicts
+        self.counts = counts
+
+    def models(self) -> list:
+        """백엔드에 넘길 Route model (합친 것 + 그대로 둔 것)"""
+        out = [ir.Route(net, plen, hop) for net, plen, hop in self.routes]
+        out.extend(self.opaque)
+        return out
+
+    def stats(self) -> dict:
+        stats = {"routes": self.before}
+        stats.update(self.counts)
+        stats["conflicts"] = len(self.conflicts)
+        stats["routes_after"] = len(self.routes) + len(self.opaque)
+        return stats
+
+
+def is_route(model) -> bool:
+    return type(model) is ir.Route
+
+
+def _collect(models):
+    """길이별 dict (net → next hop) 로 모은다 → (levels, opaque, conflicts, counts)"""
+    levels = [{} for _ in range(33)]
+    first = {}  # (net, plen) -> 처음 나온 model 위치
+    opaque, conflicts = [], []
+    counts = {"duplicates": 0, "host_bits": 0}
+    for i, model in enumerate(models):
+        if type(model) is not ir.Route:
+            continue
+        net, plen, hop = model.net, model.plen, model.next_hop
+        if not isinstance(net, int):
+            opaque.append(model)
+            continue
+        if plen is None:
+            plen = 32
+        masked = net & netmask(plen)
+        if masked != net:
+            counts["host_bits"] += 1
+        level = levels[plen]
+        seen = level.get(masked)
+        if seen is None:
+            level[masked] = hop
+            first[(masked, plen)] = i
+        elif seen == hop:
+            counts["duplicates"] += 1
+        else:
+            conflicts.append(RouteConflict(masked, plen, seen, first[(masked, plen)], hop, i))
+    return levels, opaque, conflicts, counts
+
+
+_MISSING = object()
+
+
+def _merge_buddies(levels) -> int:
+    merged = 0
+    for plen in range(32, 0, -1):
+        level, parent = levels[plen], levels[plen - 1]
+        size = 1 << (32 - plen)
+        for net in [n for n in level if not n & size]:
+            hop = level[net]
+            if level.get(net | size, _MISSING) == hop:
+                # 상위 prefix 가 이미 있어도 두 짝에 완전히 가려지므로 덮어쓴다
+                del level[net], level[net | size]
+                parent[net] = hop
+                merged += 1
+    return merged
+
+
+def _drop_covered(levels):
+    routes = sorted(
+        (net, plen, hop) for plen, level in enumerate(levels) for net, hop in level.items()
+    )
+    kept, stack = [], []  # stack: 지금 route 를 포함하는 (남긴) 조상들
+    covered = 0
+    for net, plen, hop in routes:
+        while stack and (net & netmask(stack[-1][1])) != stack[-1][0]:
+            stack.pop()
+        if stack and stack[-1][2] == hop:
+            covered += 1
+            continue
+        entry = (net, plen, hop)
+        stack.append(entry)
+        kept.append(entry)
+    return kept, covered
+
+
+def aggregate_routes(models) -> RoutePlan:
+    levels, opaque, conflicts, counts = _collect(models)
+    before = sum(1 for m in models if type(m) is ir.Route)
+    counts["merged"] = _merge_buddies(levels)
+    routes, counts["covered"] = _drop_covered(levels)
+    return RoutePlan(before, routes, opaque, conflicts, counts)
+
+
+def passthrough_routes(models) -> RoutePlan:
+    """최적화 없이 문장 순서 그대로 (--no-optimize)"""
+    routes = [m for m in models if type(m) is ir.Route]
+    return RoutePlan(len(routes), [], routes, [], {})
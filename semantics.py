@@ -0,0 +1,433 @@
+# semantics.py
+#
+# 프로그램 전체 의미 검사 (--check): 백엔드 출력 전에 문장 사이의 충돌을 찾는다
+#
+#   duplicate            앞에 똑같은 문장이 있다 (범위 / 그룹이 겹치는 것도)
+#   vlan-conflict        같은 VLAN 을 다른 이름으로 다시 만든다
+#   vlan-contradiction   앞에서 만든 VLAN 을 지운다 (둘 다 없는 것과 같다)
+#   vlan-range           빈 범위, 1~4094 밖의 VLAN id
+#   qos-vlan             프로그램 끝에서 지워진 VLAN 에 QoS
+#   meter-conflict       같은 호스트에 다른 제한 (처음 것을 쓴다)
+#   acl-shadowed         앞의 반대 action 규칙들이 완전히 덮는다 (절대 적용되지 않음)
+#   acl-redundant        앞의 같은 action 규칙들이 완전히 덮는다
+#   route-conflict       같은 prefix 에 다른 next hop (처음 것을 쓴다)
+#   route-redundant      가장 가까운 상위 prefix 와 next hop 이 같다
+#   route-overlap (note) 상위 prefix 의 일부를 다른 next hop 으로 보낸다
+#   group-conflict       같은 이름의 그룹을 다른 원소로 다시 정의 (처음 것을 쓴다)
+#   unknown-group (error)
+#
+# 문장 쌍을 모두 비교하지 않고 색인을 만든다:
+#   VLAN  : id 마다 상태 한 칸 (bytearray 4096) + 처음 만든 문장
+#   주소  : 길이별 dict 로 된 prefix trie (route, ACL 주소). 조회는 들어 있는
+#           prefix 길이만 (보통 몇 개) 본다
+#   meter : 호스트 → (제한, 문장)
+# 그래서 문장 수에 선형이다 (그룹 ACL 은 원소 쌍 수, 범위는 VLAN 수만큼).
+
+from diagnostics import ERROR, NOTE, WARNING, Diagnostic
+import ir
+from ir import pack_prefix, prefix_str
+
+_MASKS = [ir.netmask(p) for p in range(33)]
+ANY = (0, 0)  # any 주소 = 0.0.0.0/0
+
+# Passes / write_configs 도 (줄 번호 없이) 찾는 것: --check 이면 여기서만 보고
+PROGRAM_CODES = ("route-conflict", "unknown-group")
+
+MAX_VLAN = 4094
+_CREATED = 1
+_DELETED = 2
+
+
+def vlan_range_error(first, last):
+    """VLAN 범위 first-last 가 틀렸으면 메시지, 맞으면 None (compiler 변환기도 쓴다)"""
+    if first > last:
+        return f"empty VLAN range {first}-{last}"
+    if not (isinstance(first, int) and 1 <= first and last <= MAX_VLAN):
+        return f"VLAN id out of range 1-{MAX_VLAN}"
+    return None
+
+
+def addr_key(addr):
+    """
+    주소 → 색인 키. None (any) 은 ANY, int 는 /32, (net, plen) 과 'a.b.c.d/n' 은
+    host 비트를 지운 (net, plen), 해석할 수 없는 이름은 문자열 그대로
+    """
+    if addr is None:
+        return ANY
+    if isinstance(addr, int):
+        return (addr, 32)
+    if isinstance(addr, tuple):
+        net, plen = addr
+    else:
+        net, plen = pack_prefix(addr)
+        if not isinstance(net, int):
+            return addr
+        if plen is None:
+            plen = 32
+    return (net & _MASKS[plen], plen)
+
+
+def key_str(key) -> str:
+    if isinstance(key, str):
+        return key
+    if key == ANY:
+        return "any"
+    return prefix_str(*key) if key[1] < 32 else ir.ip_str(key[0])
+
+
+class PrefixTrie:
+    """
+    키 (net, plen) 또는 이름 → 값. 길이별 dict 로 된 trie 라서 한 키를 덮는
+    prefix 는 들어 있는 길이마다 dict 한 번씩만 찾으면 된다.
+    이름은 자기 자신과 ANY 에만 덮인다.
+    """
+
+    __slots__ = ("levels", "lengths", "names")
+
+    def __init__(self):
+        self.levels = {}  # prefix 길이 -> {net: 값}
+        self.lengths = []  # 들어 있는 prefix 길이 (긴 것부터)
+        self.names = {}
+
+    def setdefault(self, key, value):
+        if isinstance(key, str):
+            return self.names.setdefault(key, value)
+        net, plen = key
+        level = self.levels.get(plen)
+        if level is None:
+            level = self.levels[plen] = {}
+            self.lengths.append(plen)
+            self.lengths.sort(reverse=True)
+        return level.setdefault(net, value)
+
+    def covering(self, key):
+        """key 를 덮는 (키, 값) — 자기 자신 포함, 긴 prefix 부터"""
+        if isinstance(key, str):
+            value = self.names.get(key)
+            if value is not None:
+                yield key, value
+            key = None  # 이름은 ANY 에만
+        for plen in self.lengths:
+            if key is None:
+                if plen:
+                    continue
+                net = 0
+            elif plen > key[1]:
+                continue
+            else:
+                net = key[0] & _MASKS[plen]
+            value = self.levels[plen].get(net)
+            if value is not None:
+                yield (net, plen), value
+
+    def items(self):
+        for plen in self.lengths:
+            for net, value in self.levels[plen].items():
+                yield (net, plen), value
+        yield from self.names.items()
+
+
+class _AclIndex:
+    """protocol 마다 src trie → (dst trie: 처음 넣은 규칙)"""
+
+    def __init__(self):
+        self.by_protocol = {}
+
+    def add(self, protocol, srcs, dsts, rule):
+        tries = self.by_protocol.setdefault(protocol, PrefixTrie())
+        for src in srcs:
+            dst_trie = tries.setdefault(src, PrefixTrie())
+            for dst in dsts:
+                dst_trie.setdefault(dst, rule)
+
+    def first_match(self, protocol, src, dst):
+        """(src, dst) 를 완전히 덮는 앞 규칙 중 가장 먼저 나온 것 (없으면 None)"""
+        tries = self.by_protocol.get(protocol)
+        if tries is None:
+            return None
+        best = None
+        for _, dst_trie in tries.covering(src):
+            for _, rule in dst_trie.covering(dst):
+                if best is None or rule[0] < best[0]:
+                    best = rule
+        return best
+
+
+class Analyzer:
+    """
+    models 를 한 번 훑으며 색인을 채우고 진단을 모은다.
+    lines / sources: model 마다 원문 줄 번호 / 원문 (없으면 "statement N" 으로 표시)
+    """
+
+    def __init__(self, models, lines=None, sources=None):
+        self.models = models
+        self.lines = lines
+        self.sources = sources
+        self.found = []  # (model 위치, Diagnostic)
+        self.groups = {}  # 이름 -> (HostGroup, 위치)
+        self.vlan_state = bytearray(MAX_VLAN + 1)
+        self.vlan_origin = [None] * (MAX_VLAN + 1)  # 만든 (위치, 이름)
+        self.qos = []  # (vlan, 위치)
+        self.meters = {}  # 호스트 키 -> (제한, 위치)
+        self.routes = PrefixTrie()  # (net, plen) -> (next hop, 위치)
+        self.acl = _AclIndex()
+        self._checks = {
+            ir.HostGroup: self.group,
+            ir.VlanCreate: self.vlan_create,
+            ir.VlanRangeCreate: self.vlan_create,
+            ir.VlanDelete: self.vlan_delete,
+            ir.VlanRangeDelete: self.vlan_delete,
+            ir.Qos: self.qos_vlan,
+            ir.Meter: self.meter,
+            ir.MeterEach: self.meter,
+            ir.Allow: self.acl_rule,
+            ir.GroupAllow: self.acl_rule,
+            ir.Block: self.acl_rule,
+            ir.Route: self.route,
+        }
+
+    # -----------------------------
+    # 보고
+    # -----------------------------
+    def where(self, i) -> str:
+        if self.lines is not None:
+            return f"line {self.lines[i]}"
+        return f"statement {i + 1}"
+
+    def report(self, i, code, message, severity=WARNING):
+        diag = Diagnostic(message, severity=severity, code=code)
+        if self.lines is not None:
+            diag.line = self.lines[i]
+        if self.sources is not None:
+            diag.source = self.sources[i]
+        self.found.append((i, diag))
+
+    def run(self) -> list:
+        seen = {}
+        # 그룹은 정의보다 앞에서 써도 되므로 먼저 모은다
+        for i, model in enumerate(self.models):
+            if type(model) is ir.HostGroup:
+                self.groups.setdefault(model.name, (model, i))
+        for i, model in enumerate(self.models):
+            first = seen.setdefault(model, i)
+            if first != i:
+                self.report(i, "duplicate", f"same statement as {self.where(first)}")
+                continue
+            check = self._checks.get(type(model))
+            if check is not None:
+                check(i, model)
+        self.finish()
+        self.found.sort(key=lambda item: item[0])
+        return [diag for _, diag in self.found]
+
+    # -----------------------------
+    # 그룹
+    # -----------------------------
+    def group(self, i, model):
+        _, at = self.groups[model.name]
+        if at != i:
+            self.report(
+                i,
+                "group-conflict",
+                f"group {model.name} is already defined on {self.where(at)} "
+                "with other members (the first definition is used)",
+            )
+
+    def members(self, i, value):
+        """ACL / meter 자리의 값 → 색인 키 목록 (없는 그룹이면 보고하고 None)"""
+        if type(value) is not ir.GroupRef:
+            return [addr_key(value)]
+        entry = self.groups.get(value.name)
+        if entry is None:
+            self.report(
+                i, "unknown-group", f"group {value.name} is used but not defined", ERROR
+            )
+            return None
+        return [addr_key(m) for m in entry[0].members]
+
+    # -----------------------------
+    # VLAN (id 마다 상태 한 칸)
+    # -----------------------------
+    def _vlan_ids(self, i, model):
+        if type(model) in (ir.VlanCreate, ir.VlanDelete, ir.Qos):
+            vid = model.vlan if type(model) is ir.Qos else model.id
+            first = last = vid
+        else:
+            first, last = model.first, model.last
+        error = vlan_range_error(first, last)
+        if error is not None:
+            self.report(i, "vlan-range", error)
+            return range(0)
+        return range(first, last + 1)
+
+    def vlan_create(self, i, model):
+        state, origin = self.vlan_state, self.vlan_origin
+        name = getattr(model, "name", None)
+        renamed, again = [], []
+        for vid in self._vlan_ids(i, model):
+            vlan_name = name or ir.default_vlan_name(vid)
+            if state[vid] == _CREATED:
+                (renamed if origin[vid][1] != vlan_name else again).append(vid)
+                continue
+            state[vid] = _CREATED
+            origin[vid] = (i, vlan_name)
+        if renamed:
+            at = origin[renamed[0]][0]
+            self.report(
+                i,
+                "vlan-conflict",
+                f"{_vlans(renamed)} already created on {self.where(at)} "
+                "with another name",
+            )
+        if again:
+            at = origin[again[0]][0]
+            self.report(i, "duplicate", f"{_vlans(again)} already created on {self.where(at)}")
+
+    def vlan_delete(self, i, model):
+        state, origin = self.vlan_state, self.vlan_origin
+        undone = []
+        for vid in self._vlan_ids(i, model):
+            if state[vid] == _CREATED:
+                undone.append(vid)
+            state[vid] = _DELETED
+        if undone:
+            at = origin[undone[0]][0]
+            self.report(
+                i,
+                "vlan-contradiction",
+                f"deletes {_vlans(undone)} created on {self.where(at)}",
+            )
+
+    def qos_vlan(self, i, model):
+        for vid in self._vlan_ids(i, model):
+            self.qos.append((vid, i))
+
+    # -----------------------------
+    # meter (호스트마다 한 칸)
+    # -----------------------------
+    def meter(self, i, model):
+        if type(model) is ir.MeterEach:
+            entry = self.groups.get(model.group.name)
+            if entry is None:
+                self.members(i, model.group)  # unknown-group
+                return
+            hosts = entry[0].hosts()
+        else:
+            hosts = (model.host,)
+        meters = self.meters
+        conflicts, first = 0, None
+        for host in hosts:
+            key = addr_key(host)
+            seen = meters.setdefault(key, (model.rate_mbps, i))
+            if seen[1] != i and seen[0] != model.rate_mbps:
+                conflicts += 1
+                if first is None:
+                    first = (key, seen)
+        if conflicts:
+            key, (rate, at) = first
+            more = f" (and {conflicts - 1} more hosts)" if conflicts > 1 else ""
+            self.report(
+                i,
+                "meter-conflict",
+                f"{key_str(key)} is already limited to {rate}Mbps on {self.where(at)}"
+                f"{more}; the first limit is used",
+            )
+
+    # -----------------------------
+    # ACL (protocol → src trie → dst trie)
+    # -----------------------------
+    def acl_rule(self, i, model):
+        srcs = self.members(i, getattr(model, "src", None))
+        dsts = self.members(i, getattr(model, "dst", None))
+        if not srcs or not dsts:
+            return
+        action = str(model.action)
+        protocol = str(model.protocol)
+        covers = []
+        for src in srcs:
+            for dst in dsts:
+                rule = self.acl.first_match(protocol, src, dst)
+                if rule is None:
+                    break
+                covers.append(rule)
+            else:
+                continue
+            break
+        else:
+            # 모든 (src, dst) 가 앞 규칙에 덮인다
+            opposite = [r for r in covers if r[1] != action]
+            if opposite:
+                at = opposite[0][0]
+                self.report(
+                    i,
+                    "acl-shadowed",
+                    f"never matches: {opposite[0][1]} rule on {self.where(at)} "
+                    "already covers it",
+                )
+            else:
+                at = covers[0][0]
+                self.report(
+                    i, "acl-redundant", f"already covered by the rule on {self.where(at)}"
+                )
+            return
+        self.acl.add(protocol, srcs, dsts, (i, action))
+
+    # -----------------------------
+    # route (prefix trie)
+    # -----------------------------
+    def route(self, i, model):
+        key = addr_key(model.net if model.plen is None else (model.net, model.plen))
+        if isinstance(key, str):
+            return
+        hop, at = self.routes.setdefault(key, (model.next_hop, i))
+        if at == i:
+            return
+        if hop == model.next_hop:
+            self.report(i, "duplicate", f"route {key_str(key)} already set on {self.where(at)}")
+        else:
+            self.report(
+                i,
+                "route-conflict",
+                f"conflicting next hops for {key_str(key)}: {ir.ip_str(hop)} "
+                f"({self.where(at)}) vs {ir.ip_str(model.next_hop)}; using the first",
+            )
+
+    def finish(self):
+        # route: 가장 가까운 상위 prefix 와 비교 (문장 순서와 무관하게 전부 설치되므로)
+        for key, (hop, i) in self.routes.items():
+            for parent, (parent_hop, at) in self.routes.covering(key):
+                if parent == key:
+                    continue
+                if parent_hop == hop:
+                    self.report(
+                        i,
+                        "route-redundant",
+                        f"route {key_str(key)} is covered by {key_str(parent)} "
+                        f"via the same next hop ({self.where(at)})",
+                    )
+                else:
+                    self.report(
+                        i,
+                        "route-overlap",
+                        f"route {key_str(key)} overrides part of {key_str(parent)} "
+                        f"({self.where(at)})",
+                        NOTE,
+                    )
+                break
+        # QoS: 프로그램 끝에서 지워진 VLAN
+        for vid, i in self.qos:
+            if self.vlan_state[vid] == _DELETED:
+                self.report(i, "qos-vlan", f"vlan {vid} is deleted by this program")
+
+
+def _vlans(ids) -> str:
+    if len(ids) == 1:
+        return f"vlan {ids[0]}"
+    if ids[-1] - ids[0] + 1 == len(ids):
+        return f"vlans {ids[0]}-{ids[-1]}"
+    return f"{len(ids)} vlans ({ids[0]}, ...)"
+
+
+def analyze(models, lines=None, sources=None) -> list:
+    """의미 검사 진단 목록 (문장 순서). lines / sources 는 model 마다 줄 번호 / 원문"""
+    return Analyzer(models, lines, sources).run()
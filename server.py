@@ -0,0 +1,364 @@
+# server.py
+#
+# 컴파일 데몬: 파서 / transformer / 백엔드를 한 번만 올려 두고 요청마다 컴파일
+#
+#   python server.py --port 8470                # 127.0.0.1:8470 (HTTP/1.1)
+#   python server.py --unix /tmp/intentlang.sock
+#
+#   curl -s localhost:8470/compile -d '{"code": "block icmp", "targets": ["linux"]}'
+#   curl -s --unix-socket /tmp/intentlang.sock http://x/stats
+#
+#   POST /compile  {"code": "...", "targets": ["linux", ...] (생략하면 전부), "fast": false}
+#                  (본문이 JSON 이 아니면 본문 전체를 code 로)
+#                  → {"ok", "statements": [{"no", "line", "intent", "outputs": {타깃: 출력}}],
+#                     "diagnostics": [...]}
+#   GET  /stats    요청/문장 수, batch 크기, latency p50/p99, 초당 처리량
+#   GET  /health
+#
+# 요청은 큐에 넣고 batch 작업 하나가 그때까지 쌓인 요청을 한꺼번에 처리한다
+# (--batch-window-ms 만큼 더 기다려 모을 수도 있다). batch 안에서 같은 줄은 한 번만
+# 컴파일/생성하고, 결과는 줄 단위 LRU (--memo) 에 남겨 다음 요청에도 쓴다.
+# 에러 난 줄은 남기지 않는다 (진단에 줄 번호가 들어가므로).
+
+from collections import OrderedDict, deque
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import backends
+import compiler
+from fastpath import FastRecognizer
+
+MAX_BODY = 16 * 2**20
+MAX_HEADER = 64 * 2**10  # 요청 줄 + 헤더 (StreamReader limit)
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def content_length(headers) -> int:
+    """Content-Length 값 (없으면 0). 숫자가 아니면 BadRequest"""
+    value = headers.get("content-length")
+    if value is None or value == "":
+        return 0
+    if not (value.isascii() and value.isdigit()):
+        raise BadRequest(f"bad Content-Length: {value!r}")
+    return int(value)
+
+
+class Stats:
+    def __init__(self, window=4096):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.statements = 0
+        self.errors = 0  # 400 등 처리하지 못한 요청
+        self.batches = 0
+        self.batched = 0  # batch 로 처리한 요청 수 (합)
+        self.max_batch = 0
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self.latencies = deque(maxlen=window)  # 최근 요청 latency (초)
+
+    def to_dict(self) -> dict:
+        uptime = time.perf_counter() - self.started
+        recent = sorted(self.latencies)
+
+        def pct(p):
+            if not recent:
+                return None
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000, 3)
+
+        return {
+            "uptime_s": round(uptime, 3),
+            "requests": self.requests,
+            "statements": self.statements,
+            "errors": self.errors,
+            "batches": self.batches,
+            "avg_batch": round(self.batched / self.batches, 2) if self.batches else 0,
+            "max_batch": self.max_batch,
+            "memo_hits": self.memo_hits,
+            "memo_misses": self.memo_misses,
+            "latency_p50_ms": pct(0.50),
+            "latency_p99_ms": pct(0.99),
+            "requests_per_s": round(self.requests / uptime, 1) if uptime else 0,
+            "statements_per_s": round(self.statements / uptime, 1) if uptime else 0,
+        }
+
+
+class _Request:
+    __slots__ = ("code", "targets", "fast", "future")
+
+    def __init__(self, code, targets, fast, future):
+        self.code = code
+        self.targets = targets
+        self.fast = fast
+        self.future = future
+
+
+class CompileServer:
+    def __init__(self, window_ms=0.0, max_batch=256, memo_size=65536):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.memo_size = memo_size
+        self.memo = OrderedDict()  # (타깃 tuple, 줄) -> [타깃별 출력 리스트]
+        self.stats = Stats()
+        self.queue = None
+        self.parser = None
+        self.recognizer = None
+
+    def warm_up(self):
+        """파서 (디스크 캐시), fastpath, 모든 타깃 백엔드를 미리 올린다"""
+        self.parser = compiler.get_parser(inline=True)
+        self.recognizer = FastRecognizer(compiler.IntentToJSON())
+        emitter = compiler.get_emitter()
+        for intent in compiler.INTENTS:
+            for model in self.parser.parse(intent):
+                emitter(model)
+
+    # -----------------------------
+    # 컴파일 (batch)
+    # -----------------------------
+    def _lookup(self, key, intent, lineno, recognizer, diagnostics):
+        memo = self.memo
+        found = memo.get(key)
+        if found is not None:
+            memo.move_to_end(key)
+            self.stats.memo_hits += 1
+            return found
+        self.stats.memo_misses += 1
+        before = len(diagnostics)
+        models = compiler.compile_line(intent, lineno, self.parser, recognizer, diagnostics)
+        emit = compiler.get_emitter(key[0])
+        outputs = [emit(model) for model in models]
+        if len(diagnostics) == before:
+            memo[key] = outputs
+            if len(memo) > self.memo_size:
+                memo.popitem(last=False)
+        return outputs
+
+    def compile_request(self, request, shared) -> dict:
+        """shared: 이 batch 안에서 이미 만든 (타깃, 줄) -> 출력 (에러 없는 것만)"""
+        emitter = compiler.get_emitter(request.targets)
+        names = [b.name for b in emitter.backends]
+        recognizer = self.recognizer if request.fast else None
+        diagnostics = []
+        statements = []
+        for lineno, line in enumerate(request.code.splitlines(), start=1):
+            intent = line.strip()
+            if not intent:
+                continue
+            key = (request.targets, intent)
+            outputs = shared.get(key)
+            if outputs is None:
+                before = len(diagnostics)
+                outputs = self._lookup(key, intent, lineno, recognizer, diagnostics)
+                if len(diagnostics) == before:
+                    shared[key] = outputs
+            for out in outputs:
+                statements.append(
+                    {
+                        "no": len(statements) + 1,
+                        "line": lineno,
+                        "intent": intent,
+                        "outputs": dict(zip(names, out)),
+                    }
+                )
+        self.stats.statements += len(statements)
+        return {
+            "ok": not diagnostics,
+            "statements": statements,
+            "diagnostics": [d.to_dict() for d in diagnostics],
+        }
+
+    async def _batcher(self):
+        queue = self.queue
+        while True:
+            batch = [await queue.get()]
+            if self.window:
+                await asyncio.sleep(self.window)
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            self.stats.batches += 1
+            self.stats.batched += len(batch)
+            self.stats.max_batch = max(self.stats.max_batch, len(batch))
+            shared = {}
+            for request in batch:
+                if request.future.done():  # 연결이 끊긴 요청
+                    continue
+                try:
+                    request.future.set_result(self.compile_request(request, shared))
+                except Exception as e:
+                    request.future.set_exception(e)
+
+    async def compile(self, code, targets=None, fast=False) -> dict:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put(_Request(code, targets, fast, future))
+        return await future
+
+    # -----------------------------
+    # HTTP
+    # -----------------------------
+    def _parse_body(self, body):
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            # JSON 객체가 아니면 본문 전체가 IntentLang
+            return body.decode("utf-8", "replace"), None, False
+        code = data.get("code")
+        if not isinstance(code, str):
+            raise BadRequest("'code' must be a string")
+        targets = data.get("targets")
+        if isinstance(targets, str):
+            targets = targets.split(",")
+        if targets is not None:
+            try:
+                targets = tuple(compiler.parse_targets(",".join(targets)))
+            except (TypeError, ValueError) as e:
+                raise BadRequest(str(e)) from None
+        return code, targets, bool(data.get("fast"))
+
+    async def _route(self, method, path, body):
+        if path == "/compile":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            code, targets, fast = self._parse_body(body)
+            return 200, await self.compile(code, targets, fast)
+        if path == "/stats" and method == "GET":
+            return 200, self.stats.to_dict()
+        if path == "/health" and method == "GET":
+            return 200, {"ok": True}
+        return 404, {"error": f"no route for {method} {path}"}
+
+    async def _reply(self, writer, status, result, keep):
+        payload = json.dumps(result).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep else 'close'}\r\n\r\n".encode("latin-1")
+            + payload
+        )
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    # 헤더가 MAX_HEADER 를 넘음: 남은 입력을 알 수 없으므로 답하고 닫는다
+                    self.stats.errors += 1
+                    await self._reply(writer, 431, {"error": "request header too large"}, False)
+                    return
+                t0 = time.perf_counter()
+                lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = (lines[0].split(" ") + ["", ""])[:3]
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                body = None
+                try:
+                    length = content_length(headers)
+                except BadRequest as e:
+                    # 본문 길이를 모르면 다음 요청의 시작도 모르므로 이 연결은 닫는다
+                    status, result = 400, {"error": str(e)}
+                else:
+                    if length > MAX_BODY:
+                        status, result = 413, {"error": "request body too large"}
+                    else:
+                        body = await reader.readexactly(length) if length else b""
+                if body is not None:
+                    try:
+                        status, result = await self._route(method, path.split("?")[0], body)
+                    except BadRequest as e:
+                        status, result = 400, {"error": str(e)}
+                if status == 200 and path.startswith("/compile"):
+                    self.stats.requests += 1
+                    self.stats.latencies.append(time.perf_counter() - t0)
+                elif status != 200:
+                    self.stats.errors += 1
+                keep = headers.get("connection", "").lower() != "close" and body is not None
+                await self._reply(writer, status, result, keep)
+                if not keep:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8470, unix=None, ready=None):
+        self.queue = asyncio.Queue()
+        batcher = asyncio.create_task(self._batcher())
+        if unix:
+            server = await asyncio.start_unix_server(self.handle, path=unix, limit=MAX_HEADER)
+        else:
+            server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER)
+        if ready is not None:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="IntentLang compile daemon")
+    ap.add_argument("--host", default="127.0.0.1", help="기본 127.0.0.1 (밖에 열지 않는다)")
+    ap.add_argument("--port", type=int, default=8470)
+    ap.add_argument("--unix", metavar="PATH", help="TCP 대신 Unix 소켓")
+    ap.add_argument(
+        "--batch-window-ms",
+        type=float,
+        default=0.0,
+        help="첫 요청 뒤 더 모을 시간 (기본 0: 그때까지 쌓인 것만 한꺼번에)",
+    )
+    ap.add_argument("--max-batch", type=int, default=256, help="batch 하나의 최대 요청 수")
+    ap.add_argument("--memo", type=int, default=65536, help="줄 단위 결과 LRU 크기 (0 이면 끔)")
+    ap.add_argument("--plugin", action="append", default=[], metavar="MODULE")
+    ap.add_argument("--inventory", metavar="PATH", help="호스트 인벤토리 (compiler.py 와 같음)")
+    args = ap.parse_args()
+
+    for name in args.plugin:
+        backends.load_plugin(name)
+    if args.inventory:
+        try:
+            compiler.set_inventory(args.inventory)
+        except (OSError, ValueError) as e:
+            ap.error(f"--inventory: {e}")
+    server = CompileServer(args.batch_window_ms, args.max_batch, args.memo)
+    server.warm_up()
+
+    def ready(srv):
+        if args.unix:
+            where = args.unix
+        else:
+            host, port = srv.sockets[0].getsockname()[:2]
+            where = f"http://{host}:{port}"
+        print(f"=== intentlang server === listening on {where}", file=sys.stderr)
+
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# stmt_cache.py
+#
+# 문장 단위 증분 컴파일 캐시 (sqlite)
+#
+#   key   = sha256(출력 타깃 목록 + 공백 정규화한 문장)
+#   value = 그 문장에서 나온 타깃별 출력 목록 (기본 [json, p4, cisco, linux])
+#
+# 문법/백엔드 소스/호스트 인벤토리/컴파일러 버전을 합친 fingerprint 가 바뀌면
+# 캐시 전체를 비운다. 항목 수가 max_entries 를 넘으면 오래 안 쓴 것부터
+# 지운다 (LRU).
+
+import hashlib
+import json
+import re
+import sqlite3
+
+# common.WS 와 같은 공백 집합 (다른 공백 문자는 lark 에서 에러이므로 유지)
+_WS = re.compile(r"[ \t\f\r\n]+")
+
+
+def statement_key(intent: str, namespace: str = "") -> str:
+    normalized = " ".join(_WS.split(intent.strip()))
+    return hashlib.sha256(f"{namespace}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class StatementCache:
+    FLUSH_EVERY = 10_000
+
+    def __init__(
+        self, path, fingerprint: str, max_entries: int = 1_000_000, namespace=""
+    ):
+        self.path = str(path)
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.invalidated = False
+
+        self._db = sqlite3.connect(self.path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, outputs TEXT, used INTEGER)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries(used)")
+
+        row = self._db.execute("SELECT v FROM meta WHERE k='fingerprint'").fetchone()
+        if row is None or row[0] != fingerprint:
+            # 문법이나 백엔드가 바뀜 → 전부 무효
+            self.invalidated = row is not None
+            self._db.execute("DELETE FROM entries")
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)", (fingerprint,)
+            )
+        row = self._db.execute("SELECT v FROM meta WHERE k='clock'").fetchone()
+        self._clock = int(row[0]) if row else 0
+
+        # 조회/저장은 모았다가 FLUSH_EVERY 개마다 한 번에 쓴다
+        self._touched = {}
+        self._new = {}
+
+    def get(self, intent: str):
+        key = statement_key(intent, self.namespace)
+        outputs = self._new.get(key)
+        if outputs is None:
+            row = self._db.execute(
+                "SELECT outputs FROM entries WHERE key=?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            outputs = json.loads(row[0])
+        self.hits += 1
+        self._clock += 1
+        self._touched[key] = self._clock
+        if len(self._touched) >= self.FLUSH_EVERY:
+            self._flush()
+        return outputs
+
+    def put(self, intent: str, outputs):
+        key = statement_key(intent, self.namespace)
+        self._clock += 1
+        self._new[key] = outputs
+        self._touched[key] = self._clock
+        if len(self._touched) >= self.FLUSH_EVERY:
+            self._flush()
+
+    def _flush(self):
+        db = self._db
+        db.executemany(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+            [(k, json.dumps(v), self._touched[k]) for k, v in self._new.items()],
+        )
+        db.executemany(
+            "UPDATE entries SET used=? WHERE key=?",
+            [(used, k) for k, used in self._touched.items() if k not in self._new],
+        )
+        self._new.clear()
+        self._touched.clear()
+
+    def close(self):
+        self._flush()
+        db = self._db
+        (count,) = db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count > self.max_entries:
+            self.evicted = count - self.max_entries
+            db.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY used LIMIT ?)",
+                (self.evicted,),
+            )
+        db.execute(
+            "INSERT OR REPLACE INTO meta VALUES ('clock', ?)", (str(self._clock),)
+        )
+        db.commit()
+        db.close()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evicted": self.evicted,
+            "invalidated": self.invalidated,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,196 @@
+# writers.py
+#
+# 표 / 설정 파일 출력
+#
+# 행마다 print() 를 부르지 않고 행을 모아 한 번에 쓴다. 파일이든 stdout 이든
+# 항상 UTF-8, 줄바꿈은 \n (셸 리다이렉트의 인코딩에 따라 출력이 바뀌지 않게).
+#
+#   python compiler.py site.intent -o table.tsv
+#   python compiler.py site.intent -o rows.jsonl --format jsonl --writer-thread
+#
+# 형식
+#   tsv  : 헤더 + 문장마다 한 줄 (여러 줄 출력은 \n 으로 표시)
+#   jsonl: 문장마다 {"no", "intent", "outputs": {타깃: 출력}} 한 줄
+# 타깃별 설정 파일 (linux.sh, cisco.cfg, p4.json, ...) 과 batch / delta 파일도
+# 같은 open_output() 으로 쓴다.
+#
+# ThreadedWriter 로 감싸면 실제 쓰기 (인코딩 + write) 는 별도 스레드가 하고
+# 호출한 쪽은 바로 다음 문장을 컴파일한다.
+
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import json
+import queue
+import sys
+import threading
+
+BUFFER_SIZE = 1 << 20
+CHUNK_ROWS = 4096  # 이만큼 모이면 한 번에 write
+
+FORMATS = ("tsv", "jsonl")
+
+
+@contextmanager
+def open_output(path=None, buffering=BUFFER_SIZE):
+    """path 가 None 이나 '-' 이면 stdout. 둘 다 UTF-8 / \\n, 큰 버퍼"""
+    if path not in (None, "-"):
+        with open(path, "w", encoding="utf-8", newline="\n", buffering=buffering) as f:
+            yield f
+        return
+    sys.stdout.flush()
+    try:
+        fd = sys.stdout.fileno()
+    except (AttributeError, OSError, ValueError):
+        # StringIO 등 (redirect_stdout) 은 그대로
+        yield sys.stdout
+        return
+    with open(
+        fd, "w", encoding="utf-8", newline="\n", buffering=buffering, closefd=False
+    ) as f:
+        yield f
+
+
+def tsv_row(no, intent, outputs) -> str:
+    # 여러 줄짜리 설정 (Cisco 등) 은 한 칸에 들어가도록 \n 으로 표시
+    # (칸 구분자 \t 에는 \n 이 없으므로 출력 전체를 이어 붙인 뒤 한 번에 바꾼다)
+    if not outputs:
+        return f"{no}\t{intent}"
+    return f"{no}\t{intent}\t" + "\t".join(outputs).replace("\n", "\\n")
+
+
+class TableWriter(ABC):
+    """(번호, 원문, 타깃별 출력) 행을 모아 CHUNK_ROWS 마다 한 번에 쓴다"""
+
+    def __init__(self, out, header, names):
+        self.out = out
+        self.header = header  # ["No.", "IntentLang", 열 이름...]
+        self.names = names  # 타깃 이름
+        self.rows = 0
+        self._pending = []
+
+    def begin(self):
+        pass
+
+    @abstractmethod
+    def format(self, no, intent, outputs) -> str:
+        """행 하나 (줄바꿈 없이)"""
+
+    def row(self, no, intent, outputs):
+        pending = self._pending
+        pending.append(self.format(no, intent, outputs))
+        self.rows += 1
+        if len(pending) >= CHUNK_ROWS:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._pending.append("")
+            self.out.write("\n".join(self._pending))
+            self._pending.clear()
+
+    def close(self):
+        self.flush()
+
+
+class TsvWriter(TableWriter):
+    def begin(self):
+        self.out.write("\t".join(self.header) + "\n")
+
+    def format(self, no, intent, outputs) -> str:
+        return tsv_row(no, intent, outputs)
+
+
+class JsonlWriter(TableWriter):
+    # json.dumps(..., ensure_ascii=False) 는 부를 때마다 encoder 를 새로 만든다
+    _encode = json.JSONEncoder(ensure_ascii=False).encode
+
+    def format(self, no, intent, outputs) -> str:
+        record = {"no": no, "intent": intent, "outputs": dict(zip(self.names, outputs))}
+        return self._encode(record)
+
+
+WRITERS = {
+    "tsv": TsvWriter,
+    "jsonl": JsonlWriter,
+}
+
+
+def table_writer(fmt, out, header, names) -> TableWriter:
+    cls = WRITERS.get(fmt)
+    if cls is None:
+        raise ValueError(f"unknown output format: {fmt!r} (one of {', '.join(FORMATS)})")
+    return cls(out, header, names)
+
+
+class ThreadedWriter:
+    """
+    write() 받은 문자열을 모아 큐로 넘기고 스레드 하나가 out 에 쓴다.
+    큐는 depth 개까지 (쓰기가 느리면 호출한 쪽이 기다린다).
+    스레드에서 난 에러는 다음 write() / close() 에서 다시 던진다.
+    """
+
+    def __init__(self, out, chunk=BUFFER_SIZE // 4, depth=8):
+        self.out = out
+        self.chunk = chunk
+        self._pending = []
+        self._size = 0
+        self._error = None
+        self._queue = queue.Queue(maxsize=depth)
+        self._thread = threading.Thread(target=self._run, name="writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            if self._error is None:
+                try:
+                    self.out.write(data)
+                except Exception as e:  # 호출한 쪽에서 다시 던진다
+                    self._error = e
+
+    def _check(self):
+        if self._error is not None:
+            raise self._error
+
+    def write(self, text):
+        self._check()
+        self._pending.append(text)
+        self._size += len(text)
+        if self._size >= self.chunk:
+            self._queue.put("".join(self._pending))
+            self._pending.clear()
+            self._size = 0
+        return len(text)
+
+    def flush(self):
+        # 큐에 넘기기만 한다 (파일 flush 는 close 에서)
+        if self._pending:
+            self._queue.put("".join(self._pending))
+            self._pending.clear()
+            self._size = 0
+
+    def close(self):
+        if self._thread.is_alive():
+            self.flush()
+            self._queue.put(None)
+            self._thread.join()
+        self._check()
+        self.out.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@contextmanager
+def threaded(out, enabled=True):
+    """enabled 이면 out 을 ThreadedWriter 로 감싸서, 아니면 그대로"""
+    if not enabled:
+        yield out
+        return
+    with ThreadedWriter(out) as writer:
+        yield writer